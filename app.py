@@ -3,13 +3,22 @@ import json
 import threading
 import time
 import logging
+import math
 import os
 import uuid
+from functools import lru_cache
 from datetime import datetime
-from flask import Flask, render_template, jsonify, request, session
+from flask import Flask, Response, render_template, jsonify, request, session
 
 # Import our bot
 from bot import ApesWinBot
+from metrics import rpc_metrics
+from indexer import get_indexer
+from strategy import DEFAULT_SETTINGS
+from dice import analyze_policy, outcome_summary
+from optimizer import Optimizer
+from backtest import backtest, load_rounds
+from config import ContractConfig
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -42,6 +51,13 @@ def handle_options(path):
 user_bots = {}
 user_threads = {}
 user_running = {}
+optimize_jobs = {}  # user_id -> settings search state and results
+
+# Keep dashboard-triggered searches to a few minutes
+OPTIMIZE_MAX_SAMPLES = 500
+OPTIMIZE_MAX_SESSIONS = 50000
+# Each search uses a process per core, so only one runs at a time across all sessions
+optimize_slot = threading.BoundedSemaphore(1)
 
 # Function to get user's session ID
 def get_user_id():
@@ -134,9 +150,17 @@ def update_balances(user_id=None):
         # Add a small delay to ensure contract calls are ready
         time.sleep(0.1)
         
+        # Fetch both balances in a single batched round trip, reusing the
+        # bot's snapshot when it is still fresh
+        try:
+            snapshot = current_bot.contract_manager.snapshot(use_cache=True)
+        except Exception as e:
+            logger.error(f"Error fetching balance snapshot: {e}")
+            snapshot = {}
+        
         try:
             # Get banana balance with error handling
-            raw_banana_balance = current_bot.contract_manager.get_banana_balance()
+            raw_banana_balance = snapshot['banana_balance']
             # Use the improved format_bananas method with 2 decimal places for dashboard display
             formatted_banana_balance = current_bot.format_bananas(raw_banana_balance, decimal_places=2)
         except Exception as e:
@@ -145,7 +169,7 @@ def update_balances(user_id=None):
         
         try:
             # Get S token balance with error handling
-            raw_s_balance = current_bot.contract_manager.get_native_balance()
+            raw_s_balance = snapshot['native_balance']
             
             # Use the contract manager's format_native method to correctly format S token balance
             if isinstance(raw_s_balance, (int, float)):
@@ -262,17 +286,20 @@ def bot_worker(user_id=None):
     
     # Get bot instance (initialize if needed)
     current_bot = get_bot(user_id=user_id)
+    current_bot.trace_stats.reset()
+    current_bot.session_stats.reset()
     
     # Store reference to user ID in bot for stopping checks
     current_bot._user_id = user_id
     current_bot._should_stop = False  # Initialize stop flag
     
-    # Get initial balances for session profit tracking
-    raw_banana_balance = current_bot.contract_manager.get_banana_balance()
+    # Get initial balances for session profit tracking in one batched call
+    snapshot = current_bot.contract_manager.snapshot()
+    raw_banana_balance = snapshot['banana_balance']
     formatted_banana_balance = current_bot.format_bananas(raw_banana_balance)
     
     # Get S token balance
-    raw_s_balance = current_bot.contract_manager.get_native_balance()
+    raw_s_balance = snapshot['native_balance']
     formatted_s_balance = f"{current_bot.contract_manager.format_native(raw_s_balance):.2f}"  # Limit to 2 decimal places
     
     # Store both raw and formatted balances
@@ -329,13 +356,15 @@ def bot_worker(user_id=None):
             # Remove the temporary logger to avoid memory leaks
             logging.getLogger().removeHandler(bet_logger)
             
-            # Get current banana balance
-            raw_banana_balance = current_bot.contract_manager.get_banana_balance()
+            # Get current banana and S token balances in one batched call;
+            # the cache was invalidated if this cycle moved any funds
+            snapshot = current_bot.contract_manager.snapshot(use_cache=True)
+            raw_banana_balance = snapshot['banana_balance']
             formatted_banana_balance = current_bot.format_bananas(raw_banana_balance)
             decimal_banana_balance = raw_banana_balance / 10**18
             
             # Get current S token balance
-            raw_s_balance = current_bot.contract_manager.get_native_balance()
+            raw_s_balance = snapshot['native_balance']
             formatted_s_balance = f"{current_bot.contract_manager.format_native(raw_s_balance):.2f}"  # Limit to 2 decimal places
             
             # Update statistics with properly formatted balances
@@ -352,11 +381,10 @@ def bot_worker(user_id=None):
             
             # Only count games that actually happened (result is not None)
             if result:
-                user_stats[user_id]['total_games'] += 1
-                if 'won' in result and result['won']:
-                    user_stats[user_id]['total_wins'] += 1
-                else:
-                    user_stats[user_id]['total_losses'] += 1
+                session = current_bot.session_stats
+                user_stats[user_id]['total_games'] = session.games
+                user_stats[user_id]['total_wins'] = session.wins
+                user_stats[user_id]['total_losses'] = session.losses
                 
                 # Log the current stats for debugging
                 logger.info(f"Stats update for user {user_id[:8]}... - Games: {user_stats[user_id]['total_games']}, Wins: {user_stats[user_id]['total_wins']}, Losses: {user_stats[user_id]['total_losses']}")
@@ -382,6 +410,10 @@ def bot_worker(user_id=None):
                 logger.info(f"⛔️ Bot stopping during wait cycle for user {user_id[:8]}...")
                 break
                 
+            # Prefetching bots bet again as soon as a round settles
+            if current_bot.prefetch and result:
+                continue
+                
             # Wait between games with periodic stop checks
             # Break the wait into smaller chunks so we can check for stop signals more frequently
             for _ in range(6):  # 6 x 0.5s = 3s total wait time
@@ -408,6 +440,8 @@ def bot_worker(user_id=None):
                     break
                 time.sleep(0.5)
     
+    # Bets still in the pipeline are recorded before the session ends
+    current_bot.shutdown()
     logger.info(f"Bot stopped for user {user_id[:8]}...")
     # Clean up session resources when bot stops
     if user_id in user_running:
@@ -431,12 +465,51 @@ def get_stats():
         # Add wallet connection status and address
         stats['wallet_connected'] = True
         stats['wallet_address'] = user_bots[user_id].contract_manager.account.address
+        stats['bet_phases'] = user_bots[user_id].trace_stats.summary()
+        stats['session'] = user_bots[user_id].session_stats.snapshot()
+        
+        # With the indexer running, history comes from the chain rather than this session
+        indexer = get_indexer()
+        if indexer is not None:
+            address = stats['wallet_address']
+            stats = dict(stats)
+            stats['recent_games'] = [
+                dict(game, time=f"block {game['block']}", balance_change=abs(game['balance_change'] or 0))
+                for game in indexer.history(address, limit=10)
+            ]
+            stats['history'] = indexer.stats(address)
     else:
         stats['wallet_connected'] = False
         stats['wallet_address'] = None
         
     return jsonify(stats)
 
+@app.route('/api/metrics')
+def get_metrics():
+    # Process-wide RPC usage in Prometheus text format
+    return Response(rpc_metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/history')
+def get_history():
+    indexer = get_indexer()
+    if indexer is None:
+        return jsonify({'status': 'error', 'message': 'History indexer is disabled, set INDEXER_DB'}), 503
+    
+    # Default to the connected wallet; user=all covers every player
+    user_id = get_user_id()
+    user = request.args.get('user')
+    if user is None and user_id in user_bots and user_bots[user_id].contract_manager.private_key:
+        user = user_bots[user_id].contract_manager.account.address
+    if user == 'all':
+        user = None
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    before = request.args.get('before', type=int)
+    
+    return jsonify({
+        'games': indexer.history(user, limit=limit, before=before),
+        'stats': indexer.stats(user)
+    })
+
 @app.route('/api/refresh_balances')
 def refresh_balances():
     user_id = get_user_id()
@@ -535,6 +608,9 @@ def stop_bot():
 def reset_stats():
     user_id = get_user_id()
     user_stats[user_id] = get_default_stats()
+    if user_id in user_bots and user_bots[user_id] is not None:
+        user_bots[user_id].trace_stats.reset()
+        user_bots[user_id].session_stats.reset()
     
     return jsonify({'status': 'stats_reset'})
 
@@ -552,10 +628,214 @@ def get_settings():
         'chase_69_multiplier': current_bot.chase_69_multiplier,
         'win_sensitivity': getattr(current_bot, 'win_sensitivity', 0.5),
         'loss_sensitivity': getattr(current_bot, 'loss_sensitivity', 0.5),
-        'max_track_games': getattr(current_bot, 'max_track_games', 20)
+        'max_track_games': getattr(current_bot, 'max_track_games', 20),
+        'pipeline_depth': getattr(current_bot, 'pipeline_depth', 1),
+        'prefetch_next_bet': getattr(current_bot, 'prefetch', False)
     }
     return jsonify(settings)
 
+def validate_settings(settings):
+    """Error message for settings outside what the bot accepts, or None"""
+    for name, value in settings.items():
+        if isinstance(value, float) and not math.isfinite(value):
+            return f'{name} must be a finite number'
+    if settings['min_bet_percentage'] >= settings['max_bet_percentage']:
+        return 'Minimum bet percentage must be less than maximum bet percentage'
+    if settings['min_bet_percentage'] < 0.01 or settings['max_bet_percentage'] > 0.5:
+        return 'Bet percentages must be between 1% and 50%'
+    if 'pipeline_depth' in settings:
+        depth = settings['pipeline_depth']
+        if isinstance(depth, bool) or not isinstance(depth, int) or not 1 <= depth <= ContractConfig.PIPELINE_MAX_DEPTH:
+            return f'Pipeline depth must be a whole number between 1 and {ContractConfig.PIPELINE_MAX_DEPTH}'
+    if 'prefetch_next_bet' in settings and not isinstance(settings['prefetch_next_bet'], bool):
+        return 'prefetch_next_bet must be true or false'
+    return None
+
+# The analysis runs inside the request; 128 bins stay within 0.1% of 256 at half the time
+ANALYTICS_MAX_GAMES = 500
+ANALYTICS_BINS = 128
+
+@lru_cache(maxsize=256)
+def cached_policy_analysis(settings_items, games, ruin_fraction):
+    # Dashboard sliders revisit the same settings, so keep recent answers
+    return analyze_policy(dict(settings_items), games=games, ruin_fraction=ruin_fraction, bins=ANALYTICS_BINS)
+
+# Outcome probabilities and bet-sizing analysis, for the saved or the posted settings
+@app.route('/api/analytics', methods=['GET', 'POST'])
+def analytics():
+    user_id = get_user_id()
+    current_bot = get_bot(user_id=user_id)
+    settings = current_bot.settings
+    options = request.get_json(silent=True) or {} if request.method == 'POST' else request.args
+    
+    try:
+        for name in DEFAULT_SETTINGS:
+            if name in options:
+                settings[name] = type(DEFAULT_SETTINGS[name])(options[name])
+        games = min(int(options.get('games', 200)), ANALYTICS_MAX_GAMES)
+        ruin_fraction = float(options.get('ruin_fraction', 0.1))
+        if not 0 < ruin_fraction < 1:
+            raise ValueError("ruin_fraction must be between 0 and 1")
+        error = validate_settings(settings)
+        if error:
+            raise ValueError(error)
+    except (TypeError, ValueError) as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    
+    return jsonify({
+        'settings': settings,
+        'outcomes': outcome_summary(),
+        'policy': cached_policy_analysis(tuple(sorted(settings.items())), games, ruin_fraction)
+    })
+
+BACKTEST_MAX_SETTINGS = 20
+backtest_jobs = {}  # user_id -> replay state and results
+# A replay over millions of rounds keeps a core busy for minutes, so only one runs at a time
+backtest_slot = threading.BoundedSemaphore(1)
+
+def backtest_worker(user_id, user, settings_list, balance, curve_points):
+    job = backtest_jobs[user_id]
+    try:
+        rounds = load_rounds(ContractConfig.INDEXER_DB, user)
+        if not len(rounds['multiplier']):
+            raise ValueError('No indexed rounds to replay')
+        started = time.time()
+        job['results'] = backtest(rounds, settings_list, balance, curve_points)
+        job['rounds'] = len(rounds['multiplier'])
+        job['elapsed'] = round(time.time() - started, 3)
+        job['status'] = 'done'
+        logger.info(f"📼 Backtest finished for user {user_id[:8]}... ({job['rounds']} rounds, {len(settings_list)} settings)")
+    except Exception as e:
+        logger.error(f"Backtest failed for user {user_id[:8]}...: {e}")
+        job['status'] = 'error'
+        job['message'] = str(e)
+    finally:
+        backtest_slot.release()
+    job['finished_at'] = time.time()
+
+# Replay indexed history with the saved settings and any posted alternatives, in the background
+@app.route('/api/backtest', methods=['GET', 'POST'])
+def run_backtest():
+    if get_indexer() is None:
+        return jsonify({'status': 'error', 'message': 'History indexer is disabled, set INDEXER_DB'}), 503
+    
+    user_id = get_user_id()
+    job = backtest_jobs.get(user_id)
+    if request.method == 'GET':
+        return jsonify(job or {'status': 'idle'})
+    if job is not None and job['status'] == 'running':
+        return jsonify({'status': 'already_running'})
+    
+    current_bot = get_bot(user_id=user_id)
+    options = request.get_json(silent=True) or {}
+    user = options.get('user')
+    if user is None and current_bot.contract_manager.private_key:
+        user = current_bot.contract_manager.account.address
+    if user == 'all':
+        user = None
+    
+    try:
+        # The saved settings always run first, as the baseline
+        settings_list = [current_bot.settings]
+        for overrides in options.get('settings', [])[:BACKTEST_MAX_SETTINGS - 1]:
+            settings = current_bot.settings
+            for name, value in overrides.items():
+                if name not in DEFAULT_SETTINGS:
+                    raise ValueError(f"Unknown setting {name}")
+                settings[name] = type(DEFAULT_SETTINGS[name])(value)
+            settings_list.append(settings)
+        balance = float(options.get('balance', 100.0))
+        if not 0 < balance < math.inf:
+            raise ValueError("balance must be a positive number")
+        curve_points = min(int(options.get('curve_points', 200)), 1000)
+    except (AttributeError, TypeError, ValueError) as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    
+    if not backtest_slot.acquire(blocking=False):
+        return jsonify({'status': 'busy', 'message': 'Another backtest is running, try again when it finishes'}), 429
+    backtest_jobs[user_id] = {'status': 'running', 'started_at': time.time(), 'settings': len(settings_list)}
+    threading.Thread(target=backtest_worker, args=(user_id, user, settings_list, balance, curve_points),
+                     daemon=True).start()
+    return jsonify({'status': 'started'})
+
+def optimize_worker(user_id, optimizer, method, samples, iterations):
+    job = optimize_jobs[user_id]
+    try:
+        if method == 'grid':
+            results = optimizer.grid(samples)
+        elif method == 'cem':
+            results = optimizer.cross_entropy(iterations, samples)
+        else:
+            results = optimizer.random(samples)
+        job['results'] = [{key: value for key, value in row.items() if key != 'report'} for row in results[:50]]
+        job['status'] = 'done'
+        logger.info(f"🔍 Settings search finished for user {user_id[:8]}... ({len(results)} candidates)")
+    except Exception as e:
+        logger.error(f"Settings search failed for user {user_id[:8]}...: {e}")
+        job['status'] = 'error'
+        job['message'] = str(e)
+    finally:
+        optimize_slot.release()
+    job['finished_at'] = time.time()
+
+# Search bot settings with Monte Carlo simulation in the background
+@app.route('/api/optimize', methods=['GET', 'POST'])
+def optimize():
+    user_id = get_user_id()
+    job = optimize_jobs.get(user_id)
+    
+    if request.method == 'GET':
+        return jsonify(job or {'status': 'idle'})
+    
+    if job is not None and job['status'] == 'running':
+        return jsonify({'status': 'already_running'})
+    
+    options = request.get_json(silent=True) or {}
+    current_bot = get_bot(user_id=user_id)
+    method = options.get('method', 'random')
+    job = {
+        'status': 'running',
+        'method': method,
+        'started_at': time.time(),
+        'done': 0,
+        'total': None,
+        'results': []
+    }
+    try:
+        samples = min(int(options.get('samples', 100)), OPTIMIZE_MAX_SAMPLES)
+        iterations = min(int(options.get('iterations', 5)), 10)
+        if options.get('start_balance') is not None:
+            start_balance = float(options['start_balance'])
+            if not 0 < start_balance < math.inf:
+                raise ValueError("start_balance must be a positive number")
+        else:
+            # An empty or unknown wallet balance falls back to 100 tokens
+            start_balance = float(get_user_stats().get('current_balance') or 0)
+            if not 0 < start_balance < math.inf:
+                start_balance = 100.0
+        optimizer = Optimizer(
+            params=options.get('params'),
+            objective=options.get('objective', 'median_profit'),
+            max_ruin=float(options.get('max_ruin', 0.05)),
+            base_settings={name: getattr(current_bot, name) for name in DEFAULT_SETTINGS},
+            on_progress=lambda done, total: job.update(done=done, total=total),
+            sessions=min(int(options.get('sessions', 10000)), OPTIMIZE_MAX_SESSIONS),
+            games=min(int(options.get('games', 500)), 2000),
+            start_balance=start_balance
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    if method == 'grid' and samples ** len(optimizer.params) > OPTIMIZE_MAX_SAMPLES:
+        # For a grid, samples is the number of points per setting
+        samples = max(2, int(OPTIMIZE_MAX_SAMPLES ** (1 / len(optimizer.params))))
+    
+    if not optimize_slot.acquire(blocking=False):
+        return jsonify({'status': 'busy', 'message': 'Another settings search is running, try again when it finishes'}), 429
+    optimize_jobs[user_id] = job
+    threading.Thread(target=optimize_worker, args=(user_id, optimizer, method, samples, iterations),
+                     daemon=True).start()
+    return jsonify({'status': 'started'})
+
 # Route to save new bot settings
 @app.route('/api/save_settings', methods=['POST'])
 def save_settings():
@@ -567,17 +847,12 @@ def save_settings():
         settings = request.get_json()
         
         # Validate settings
-        if settings['min_bet_percentage'] >= settings['max_bet_percentage']:
-            return jsonify({
-                'status': 'error',
-                'message': 'Minimum bet percentage must be less than maximum bet percentage'
-            })
-            
-        if settings['min_bet_percentage'] < 0.01 or settings['max_bet_percentage'] > 0.5:
+        error = validate_settings(settings)
+        if error:
             return jsonify({
                 'status': 'error',
-                'message': 'Bet percentages must be between 1% and 50%'
-            })
+                'message': error
+            }), 400
         
         # Update bot settings
         current_bot.min_bet_percentage = float(settings['min_bet_percentage'])
@@ -594,6 +869,10 @@ def save_settings():
             current_bot.loss_sensitivity = float(settings['loss_sensitivity'])
         if 'max_track_games' in settings:
             current_bot.max_track_games = int(settings['max_track_games'])
+        if 'pipeline_depth' in settings:
+            current_bot.pipeline_depth = settings['pipeline_depth']
+        if 'prefetch_next_bet' in settings:
+            current_bot.prefetch = settings['prefetch_next_bet']
         
         logger.info(f"Bot settings updated for user {user_id[:8]}...")
         return jsonify({'status': 'success'})
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from aiohttp import ClientSession, TCPConnector
+
+from async_contracts import AsyncContractManager
+from bot import ApesWinBot
+from config import ContractConfig
+from tracing import BetTrace
+
+
+class AsyncApesWinBot(ApesWinBot):
+    """ApesWinBot driven by an event loop instead of a thread
+
+    Bet sizing and result bookkeeping are the synchronous calculate_bet and
+    record_result; only the network waits are awaited. Pipelined mode is
+    not used here, concurrency comes from running many bots on one loop.
+    """
+
+    def __init__(self, private_key=None):
+        super().__init__(contract_manager=AsyncContractManager(private_key))
+
+    async def update_wallet(self, private_key):
+        """Update the wallet with a new private key"""
+        wallet_address = self.contract_manager.update_private_key(private_key)
+        self.win_streak = 0
+        self.loss_streak = 0
+        self.games_since_69 = 0
+        try:
+            balance = await self.contract_manager.get_banana_balance()
+            self.session_start_balance = float(self.contract_manager.format_bananas(balance))
+        except Exception as e:
+            logging.error(f"Error getting initial balance after wallet update: {e}")
+        return wallet_address
+
+    async def wait_for_game_result(self, game_id: int, initial_balance: int):
+        """Wait for game result and return (won, balance_change, dice_results)"""
+        result = await self.contract_manager.wait_for_game_round(
+            game_id,
+            timeout=60,
+            should_stop=lambda: getattr(self, '_should_stop', False)
+        )
+        if result is None:
+            if getattr(self, '_should_stop', False):
+                return False, 0, [0, 0, 0]
+            logging.warning(f"⚠️ Timed out waiting for game {game_id}, assuming loss")
+            return False, 0, [1, 1, 1]
+
+        balance_change = result['total_winnings'] - result['total_bet']
+        return balance_change > 0, balance_change, result['dice_results']
+
+    async def play_dice_game(self) -> Optional[Dict]:
+        """Execute one round of the dice game strategy"""
+        try:
+            trace = BetTrace()
+            with trace.phase('preflight'):
+                snapshot = await self.contract_manager.snapshot()
+                initial_balance = snapshot['banana_balance']
+                if getattr(self, '_should_stop', False):
+                    return None
+
+                actual_bet = self.calculate_bet(initial_balance)
+                if actual_bet is None or getattr(self, '_should_stop', False):
+                    return None
+
+            game_id = await self.contract_manager.place_dice_bet(actual_bet, snapshot, trace)
+            if game_id is None:
+                return None
+
+            with trace.phase('fulfillment'):
+                won, balance_change, dice_results = await self.wait_for_game_result(game_id, initial_balance)
+            self.record_trace(trace)
+            return self.record_result(game_id, initial_balance, actual_bet, balance_change, dice_results)
+        except Exception as e:
+            logging.error(f"Unexpected error: {e}")
+            await asyncio.sleep(1)
+
+    async def run(self, delay: float = 5):
+        """Main bot loop"""
+        while not getattr(self, '_should_stop', False):
+            try:
+                await self.play_dice_game()
+                await asyncio.sleep(delay)
+            except Exception as e:
+                logging.error(f"❌ {e}")
+                await asyncio.sleep(30)
+
+
+async def run_bots(bots: List[AsyncApesWinBot], stagger: float = 0.1, delay: float = 5):
+    """Run many bots concurrently on the current event loop
+
+    Args:
+        bots: Bots to run
+        stagger: Seconds between bot start times, spreads the first wave of RPC calls
+        delay: Seconds each bot waits between bets
+    """
+    # Size the loop's shared aiohttp pool before the first request creates a default one
+    web3 = ContractConfig.get_async_web3()
+    await web3.provider.cache_async_session(ClientSession(
+        connector=TCPConnector(limit=ContractConfig.RPC_POOL_SIZE),
+        raise_for_status=True
+    ))
+
+    async def start(index: int, bot: AsyncApesWinBot):
+        await asyncio.sleep(index * stagger)
+        await bot.run(delay)
+
+    await asyncio.gather(*(start(i, bot) for i, bot in enumerate(bots)))
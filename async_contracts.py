@@ -0,0 +1,260 @@
+import logging
+import os
+from typing import Dict, Optional, Tuple
+
+from eth_account.account import Account
+from eth_account.signers.local import LocalAccount
+from web3.logs import DISCARD
+
+from config import ContractConfig
+from fees import BET_GAS_KIND, FeeOracle, get_fee_oracle
+from fulfillment import get_async_watcher
+from nonce import NonceManager, get_nonce_manager
+from round_cache import round_cache
+from rpc import async_batch_request, decode_call_result, eth_call
+from tracing import BetTrace
+from tx_builder import bet_tx_builder
+from signing import get_signing_service
+
+
+class AsyncContractManager:
+    """asyncio counterpart of ContractManager built on AsyncWeb3
+
+    Every network call is a coroutine, so one event loop can drive many
+    wallets without a thread each. Nonces are shared with the synchronous
+    ContractManager through the same NonceManager registry.
+    """
+
+    def __init__(self, private_key=None):
+        self.web3 = ContractConfig.get_async_web3()
+        self.contract = ContractConfig.get_contract(self.web3)
+        self.private_key = None
+        self.current_game_id = None
+
+        # Use provided private key or get from environment variables
+        if not private_key:
+            private_key = os.getenv("PRIVATE_KEY")
+            if not private_key:
+                # Create a dummy account with no funds
+                self.account = Account.create()
+                return
+
+        self.private_key = private_key
+        self.account: LocalAccount = Account.from_key(private_key)
+        self._register_signing_key()
+
+    def update_private_key(self, private_key):
+        """Update the account with a new private key"""
+        if not private_key:
+            raise ValueError("Private key cannot be empty")
+
+        # Basic validation for private key format
+        if not private_key.startswith('0x') or len(private_key) != 66:
+            raise ValueError("Invalid private key format")
+
+        try:
+            new_account = Account.from_key(private_key)
+        except Exception as e:
+            logging.error(f"Error updating private key: {e}")
+            raise ValueError(f"Invalid private key: {e}")
+
+        self.private_key = private_key
+        self.account = new_account
+        self._register_signing_key()
+        logging.info(f"Wallet connected successfully: {self.account.address}")
+        return self.account.address
+
+    def _register_signing_key(self):
+        signer = get_signing_service()
+        if signer is not None:
+            signer.register(self.private_key)
+
+    async def sign_transaction(self, tx: Dict):
+        """Sign in the process pool when enabled; never blocks the event loop on it"""
+        signer = get_signing_service()
+        if signer is None or self.private_key is None:
+            return self.account.sign_transaction(tx)
+        return await signer.sign_async(self.account.address, tx)
+
+    @property
+    def nonces(self) -> NonceManager:
+        """Shared local nonce allocator for the current account"""
+        return get_nonce_manager(ContractConfig.get_web3(), self.account.address)
+
+    @property
+    def fees(self) -> FeeOracle:
+        """Fee oracle shared with the synchronous ContractManager"""
+        return get_fee_oracle(ContractConfig.get_web3())
+
+    def format_native(self, amount: int) -> float:
+        """Format native token amount from wei"""
+        return amount / 1e18
+
+    def format_bananas(self, amount: int) -> float:
+        """Format banana amount from wei to regular number"""
+        return amount / 10**18
+
+    async def get_native_balance(self) -> int:
+        """Get native token (S) balance"""
+        return await self.web3.eth.get_balance(self.account.address)
+
+    async def get_banana_balance(self) -> int:
+        """Get Banana balance"""
+        return await self.contract.functions.balanceOf(self.account.address).call()
+
+    async def get_last_game_info(self) -> Tuple[int, bool]:
+        """Get the last game ID and fulfillment status for the current user"""
+        try:
+            game_info = await self.contract.functions.getUserLastGameInfo(self.account.address).call()
+            return game_info[0], game_info[1][0]  # (id, round.fulfilled)
+        except Exception:
+            return 0, True  # No games yet
+
+    async def snapshot(self) -> Dict:
+        """Fetch balances, nonce and last game info in one JSON-RPC batch
+
+        Returns:
+            Dict: Same keys as ContractManager.snapshot()
+        """
+        address = self.account.address
+        balance_fn = self.contract.functions.balanceOf(address)
+        last_game_fn = self.contract.functions.getUserLastGameInfo(address)
+
+        banana_raw, native_raw, nonce_raw, last_game_raw = await async_batch_request(self.web3, [
+            eth_call(balance_fn),
+            ('eth_getBalance', [address, 'latest']),
+            ('eth_getTransactionCount', [address, 'pending']),
+            eth_call(last_game_fn)
+        ])
+
+        if banana_raw is None or native_raw is None or nonce_raw is None:
+            raise ValueError("Failed to fetch account snapshot")
+
+        last_game_id, last_round = 0, None
+        if last_game_raw is not None:
+            try:
+                last_game_id, last_round = decode_call_result(last_game_fn, last_game_raw)
+            except Exception as e:
+                logging.warning(f"Could not decode last game info: {e}")
+
+        return {
+            'banana_balance': decode_call_result(balance_fn, banana_raw),
+            'native_balance': int(native_raw, 16),
+            'nonce': int(nonce_raw, 16),
+            'last_game_id': last_game_id,
+            'last_game_fulfilled': last_round[0] if last_round else True,
+            'last_round': last_round
+        }
+
+    async def get_game_round(self, game_id: int) -> Optional[Dict]:
+        """Get a specific round by ID in get_game_result format"""
+        cached = round_cache.get(game_id)
+        if cached is not None:
+            return cached
+        try:
+            round_info = await self.contract.functions.getGameRoundInfo(game_id).call()
+        except Exception as e:
+            logging.error(f"Error getting round {game_id}: {e}")
+            return None
+        if not round_info[0]:
+            return {'fulfilled': False, 'game_id': game_id}
+        result = {
+            'fulfilled': round_info[0],
+            'user': round_info[1],
+            'total_bet': round_info[2],
+            'total_winnings': round_info[3],
+            'bet_amounts': round_info[4],
+            'dice_results': round_info[5]
+        }
+        round_cache.put(game_id, result)
+        return result
+
+    async def wait_for_game_round(self, game_id: int, timeout: float = 60,
+                                  should_stop=None) -> Optional[Dict]:
+        """Wait for a round to be fulfilled, woken by the loop's log watcher"""
+        return await get_async_watcher(self.web3).wait(self, game_id, timeout, should_stop)
+
+    async def place_dice_bet(self, bet_amount: int, snapshot: Optional[Dict] = None,
+                             trace: Optional[BetTrace] = None) -> Optional[int]:
+        """Place a bet on the dice game
+
+        Returns:
+            Optional[int]: Game ID if successful, None if failed
+        """
+        trace = trace or BetTrace()
+        with trace.phase('preflight'):
+            if snapshot is None:
+                snapshot = await self.snapshot()
+
+            # Games are fulfilled in order, finish the previous one first
+            if snapshot['last_game_id'] > 0 and not snapshot['last_game_fulfilled']:
+                logging.info(f"Found unfulfilled game {snapshot['last_game_id']}")
+                if await self.wait_for_game_round(snapshot['last_game_id']) is None:
+                    logging.error("Previous game not fulfilled after timeout")
+                    return None
+                snapshot = await self.snapshot()
+
+            if snapshot['banana_balance'] < bet_amount:
+                logging.error(f"Insufficient balance ({self.format_bananas(snapshot['banana_balance'])} Bananas) for bet ({self.format_bananas(bet_amount)} Bananas)")
+                return None
+
+            self.nonces.observe(snapshot['nonce'])
+        tx_hash = await self.send_dice_bet(bet_amount, trace)
+        if tx_hash is None:
+            return None
+        return await self.confirm_dice_bet(tx_hash, trace)
+
+    async def send_dice_bet(self, bet_amount: int, trace: Optional[BetTrace] = None) -> Optional[bytes]:
+        """Build, sign and broadcast a bet without waiting for it to be mined"""
+        trace = trace or BetTrace()
+        bet_per_dice = bet_amount // 3  # Split bet evenly across dice
+        try:
+            nonce = await self.nonces.next_nonce_async(self.web3)
+        except Exception as e:
+            logging.error(f"Error fetching nonce: {e}")
+            return None
+        try:
+            with trace.phase('build'):
+                await self.fees.refresh_async(self.web3)
+                tx = bet_tx_builder.build(
+                    [bet_per_dice] * 3,
+                    nonce,
+                    self.fees.gas_limit(BET_GAS_KIND, ContractConfig.BET_GAS_LIMIT),
+                    self.fees.fee_params(refresh=False)
+                )
+            with trace.phase('sign'):
+                signed_tx = await self.sign_transaction(tx)
+            with trace.phase('send'):
+                return await self.web3.eth.send_raw_transaction(signed_tx.rawTransaction)
+        except Exception as e:
+            logging.error(f"Error sending bet transaction: {e}")
+            self.nonces.resync()
+            return None
+
+    async def confirm_dice_bet(self, tx_hash, trace: Optional[BetTrace] = None) -> Optional[int]:
+        """Wait for a bet transaction to be mined and return its game ID"""
+        trace = trace or BetTrace()
+        try:
+            with trace.phase('receipt'):
+                receipt = await self.web3.eth.wait_for_transaction_receipt(tx_hash)
+            self.fees.observe_receipt(BET_GAS_KIND, receipt)
+            if not receipt['status']:
+                logging.error(f"Transaction failed: {tx_hash.hex()}")
+                self.nonces.resync()
+                return None
+
+            for event in self.contract.events.Bet().process_receipt(receipt, errors=DISCARD):
+                if event['args']['user'].lower() == self.account.address.lower():
+                    trace.game_id = event['args']['gameId']
+                    return trace.game_id
+
+            game_id, _ = await self.get_last_game_info()
+            if game_id > 0:
+                trace.game_id = game_id
+                return game_id
+            logging.error("Failed to get game ID after successful transaction")
+            return None
+        except Exception as e:
+            logging.error(f"Error confirming bet transaction: {e}")
+            self.nonces.resync()
+            return None
@@ -0,0 +1,264 @@
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from dice import OUTCOME_IS_69, roll_multiplier
+from montecarlo import TOKEN, parse_settings
+from strategy import DEFAULT_SETTINGS, StrategyState, balance_change, decide, settle
+
+# Field names accepted for each column, in order of preference: raw contract
+# results, GameIndexer.history() rows, then the bot's own game records
+DICE_FIELDS = ('dice_results', 'dice')
+BET_FIELDS = ('total_bet', 'amount', 'bet_amount')
+WINNINGS_FIELDS = ('total_winnings', 'winnings')
+
+
+def _first(record: Dict, fields) -> Optional[object]:
+    for field in fields:
+        if record.get(field) is not None:
+            return record[field]
+    return None
+
+
+def _columns(dice: np.ndarray, bets: np.ndarray, winnings: np.ndarray) -> Dict[str, np.ndarray]:
+    """Payout multiplier and 69 flag per round from dice, stakes and winnings
+
+    The recorded winnings are the truth for the multiplier; the placeholder
+    table in dice.py only fills in rounds without stakes. Dice outside 1-6
+    mark the 69 flag unknown (-1), which leaves the drought unchanged like
+    the live bot does.
+    """
+    valid = ((dice >= 1) & (dice <= 6)).all(axis=1)
+    index = np.where(valid, (dice[:, 0] - 1) * 36 + (dice[:, 1] - 1) * 6 + (dice[:, 2] - 1), 0)
+    is_69 = np.where(valid, OUTCOME_IS_69[index].astype(np.int8), -1).astype(np.int8)
+    known = np.isfinite(bets) & np.isfinite(winnings) & (bets > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        recorded = np.round(winnings / bets, 4)
+    fallback = np.array([roll_multiplier(roll) if ok else 0 for roll, ok in zip(dice.tolist(), valid)], dtype=float)
+    return {'multiplier': np.where(known, recorded, fallback), 'is_69': is_69}
+
+
+def _from_records(records) -> Dict[str, np.ndarray]:
+    dice, bets, winnings = [], [], []
+    for record in records:
+        roll = list(_first(record, DICE_FIELDS) or [])[:3]
+        dice.append([int(num) for num in roll] + [0] * (3 - len(roll)))
+        bet, won = _first(record, BET_FIELDS), _first(record, WINNINGS_FIELDS)
+        bets.append(float(bet) if bet is not None else np.nan)
+        winnings.append(float(won) if won is not None else np.nan)
+    return _columns(np.array(dice, dtype=np.int64).reshape(-1, 3), np.array(bets), np.array(winnings))
+
+
+def load_rounds(path: str, user: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """Read recorded rounds, oldest first
+
+    Args:
+        path: JSONL (one round per line), CSV (die1, die2, die3, total_bet, total_winnings),
+            .npz (as written by save_rounds) or a GameIndexer SQLite database
+        user: For a GameIndexer database, only this wallet's rounds
+
+    Returns:
+        Dict: 'multiplier' and 'is_69' arrays, one entry per round
+    """
+    if path.endswith('.npz'):
+        with np.load(path) as data:
+            if 'multiplier' in data:
+                return {'multiplier': data['multiplier'].astype(float), 'is_69': data['is_69'].astype(np.int8)}
+            size = len(data['dice'])
+            return _columns(data['dice'].astype(np.int64),
+                            data['total_bet'] if 'total_bet' in data else np.full(size, np.nan),
+                            data['total_winnings'] if 'total_winnings' in data else np.full(size, np.nan))
+
+    if path.endswith('.jsonl') or path.endswith('.json'):
+        with open(path) as f:
+            return _from_records(json.loads(line) for line in f if line.strip())
+
+    if path.endswith('.csv'):
+        with open(path, newline='') as f:
+            return _from_records(
+                dict(row, dice=[row.get('die1') or 0, row.get('die2') or 0, row.get('die3') or 0])
+                for row in csv.DictReader(f)
+            )
+
+    # Anything else is taken to be an indexer database; only fulfilled rounds count
+    where, params = "", []
+    if user:
+        where, params = "WHERE b.user = ?", [user.lower()]
+    with sqlite3.connect(path) as db:
+        rows = db.execute(
+            "SELECT r.die1, r.die2, r.die3, b.total_bet, r.total_winnings "
+            f"FROM rounds r JOIN bets b USING (game_id) {where} ORDER BY r.game_id", params
+        ).fetchall()
+    data = np.array(rows, dtype=float).reshape(-1, 5)
+    return _columns(np.nan_to_num(data[:, :3]).astype(np.int64), data[:, 3], data[:, 4])
+
+
+def save_rounds(path: str, rounds: Dict[str, np.ndarray]):
+    """Store loaded rounds as .npz, so repeated backtests skip parsing"""
+    np.savez(path, multiplier=rounds['multiplier'], is_69=rounds['is_69'])
+
+
+def _replay_pass(settings_list: List[Dict], multipliers: np.ndarray, is_69: np.ndarray,
+                 start_balance: int, curve_points: int) -> List[Dict]:
+    """Replay every settings dict over the rounds in one pass, through the live strategy engine"""
+    count = len(settings_list)
+    sample_every = max(1, len(multipliers) // max(curve_points, 1))
+    states = [StrategyState()] * count
+    balances = [start_balance] * count
+    active = [True] * count
+    peaks = [start_balance] * count
+    max_drawdowns = [0.0] * count
+    played = [0] * count
+    wins = [0] * count
+    wagered = [0] * count
+    longest_loss_streak = [0] * count
+    curves = [[(0, start_balance / TOKEN)] for _ in range(count)]
+
+    hits = [None if hit < 0 else bool(hit) for hit in is_69.tolist()]
+    for round_number, (multiplier, hit_69) in enumerate(zip(multipliers.tolist(), hits), 1):
+        for i in range(count):
+            if not active[i]:
+                continue
+            balance = balances[i]
+            state, decision = decide(settings_list[i], states[i], balance)
+            if decision.bet is None:
+                # Below the safety threshold the bot stops betting for good
+                active[i] = False
+                continue
+            change = balance_change(decision.bet, multiplier)
+            states[i] = state = settle(settings_list[i], state, balance, decision.bet, change, hit_69)
+            balance += change
+            balances[i] = balance
+            played[i] += 1
+            wagered[i] += (decision.bet // 3) * 3
+            if change > 0:
+                wins[i] += 1
+            longest_loss_streak[i] = max(longest_loss_streak[i], state.loss_streak)
+            if balance > peaks[i]:
+                peaks[i] = balance
+            elif peaks[i] > 0:
+                max_drawdowns[i] = max(max_drawdowns[i], (peaks[i] - balance) / peaks[i])
+            if round_number % sample_every == 0:
+                curves[i].append((round_number, balance / TOKEN))
+
+    results = []
+    for i, settings in enumerate(settings_list):
+        if curves[i][-1][0] != played[i]:
+            curves[i].append((played[i], balances[i] / TOKEN))
+        results.append({
+            'settings': settings,
+            'games': played[i],
+            'stopped': not active[i],
+            'final_balance': balances[i] / TOKEN,
+            'profit': (balances[i] - start_balance) / TOKEN,
+            'return': (balances[i] - start_balance) / start_balance,
+            'peak_balance': peaks[i] / TOKEN,
+            'max_drawdown': max_drawdowns[i],
+            'win_rate': wins[i] / played[i] if played[i] else 0.0,
+            'wagered': wagered[i] / TOKEN,
+            'longest_loss_streak': longest_loss_streak[i],
+            'curve': curves[i]
+        })
+    return results
+
+
+def backtest(rounds: Dict[str, np.ndarray], settings_list: List[Dict], start_balance: float = 100.0,
+             curve_points: int = 500, workers: int = 1) -> List[Dict]:
+    """How each settings dict would have done on the recorded rounds
+
+    Args:
+        rounds: Output of load_rounds
+        settings_list: Bot settings to compare; missing keys take the bot's defaults
+        start_balance: Starting balance in tokens
+        curve_points: Roughly how many balance samples to keep per curve
+        workers: Processes to split the settings across
+
+    Returns:
+        List[Dict]: One summary with balance curve per settings dict, in order
+    """
+    if start_balance <= 0:
+        raise ValueError("start_balance must be positive")
+    settings_list = [dict(DEFAULT_SETTINGS, **settings) for settings in settings_list]
+    start_wei = int(start_balance * TOKEN)
+    args = (rounds['multiplier'], rounds['is_69'], start_wei, curve_points)
+    if workers <= 1 or len(settings_list) <= 1:
+        return _replay_pass(settings_list, *args)
+
+    # Each worker makes its own pass over the rounds for a slice of the settings
+    slices = [settings_list[i::workers] for i in range(workers) if settings_list[i::workers]]
+    with ProcessPoolExecutor(max_workers=len(slices), mp_context=multiprocessing.get_context('spawn')) as pool:
+        parts = list(pool.map(_replay_pass, slices, *([arg] * len(slices) for arg in args)))
+    results = [None] * len(settings_list)
+    for offset, part in enumerate(parts):
+        results[offset::len(slices)] = part
+    return results
+
+
+def sweep(base: Dict, values: List[str]) -> List[Dict]:
+    """Every combination of NAME=v1,v2,... sweeps on top of `base`"""
+    axes = []
+    for spec in values or []:
+        name, options = spec.split('=', 1)
+        axes.append([(name, value) for value in options.split(',')])
+    return [dict(base, **parse_settings(f"{name}={value}" for name, value in combination))
+            for combination in itertools.product(*axes)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded rounds through ApesWinBot's strategy")
+    parser.add_argument('data', help="JSONL, CSV, .npz or GameIndexer SQLite file")
+    parser.add_argument('--user', default=None, help="wallet to replay from an indexer database")
+    parser.add_argument('--balance', type=float, default=100.0, help="starting balance in tokens")
+    parser.add_argument('--set', dest='settings', action='append', metavar='NAME=VALUE',
+                        help="override a bot setting for every run, may be repeated")
+    parser.add_argument('--sweep', action='append', metavar='NAME=V1,V2,...',
+                        help="compare several values of a setting, may be repeated for a grid")
+    parser.add_argument('--settings-file', default=None, help="JSON list of settings dicts to compare")
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--curve-points', type=int, default=500)
+    parser.add_argument('--save-npz', default=None, help="also store the parsed rounds as .npz")
+    parser.add_argument('--output', default=None, help="write results with balance curves as JSON")
+    args = parser.parse_args()
+
+    started = time.time()
+    rounds = load_rounds(args.data, args.user)
+    print(f"📂 {len(rounds['multiplier'])} rounds loaded in {time.time() - started:.2f}s")
+    if args.save_npz:
+        save_rounds(args.save_npz, rounds)
+
+    base = parse_settings(args.settings)
+    if args.settings_file:
+        with open(args.settings_file) as f:
+            settings_list = [dict(base, **settings) for settings in json.load(f)]
+    else:
+        settings_list = sweep(base, args.sweep)
+
+    started = time.time()
+    results = backtest(rounds, settings_list, args.balance, args.curve_points, args.workers)
+    elapsed = time.time() - started
+    replayed = sum(result['games'] for result in results)
+    print(f"✅ {len(results)} settings, {replayed} games in {elapsed:.2f}s ({replayed / max(elapsed, 1e-9) * 60:,.0f} games/min)\n")
+
+    varied = sorted({name for spec in args.sweep or [] for name in [spec.split('=', 1)[0]]})
+    for result in sorted(results, key=lambda row: row['final_balance'], reverse=True):
+        label = ", ".join(f"{name}={result['settings'][name]}" for name in varied) or "current settings"
+        print(f"   {label}: {result['final_balance']:.2f} 🍌 ({result['return']:+.1%}), "
+              f"{result['games']} games, max drawdown {result['max_drawdown']:.1%}"
+              f"{', stopped' if result['stopped'] else ''}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📄 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import threading
+import time
+from typing import Dict
+
+from config import ContractConfig
+
+
+class BalanceCache:
+    """Per-account cache of the latest balances and snapshot
+
+    Entries are dropped as soon as we know the account's balances moved
+    (a transaction was sent, a receipt or fulfillment was observed), and
+    expire after `ttl` seconds to pick up changes made from outside the bot.
+    """
+
+    def __init__(self, ttl: float = None):
+        self.ttl = ContractConfig.BALANCE_CACHE_TTL if ttl is None else ttl
+        self._entries: Dict[str, Dict[str, tuple]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, address: str, key: str):
+        """Cached value for an account if still fresh, else None"""
+        with self._lock:
+            entry = self._entries.get(address.lower(), {}).get(key)
+        if entry is None:
+            return None
+        value, stored_at = entry
+        if time.time() - stored_at > self.ttl:
+            return None
+        return value
+
+    def put(self, address: str, key: str, value):
+        with self._lock:
+            self._entries.setdefault(address.lower(), {})[key] = (value, time.time())
+
+    def put_snapshot(self, address: str, snapshot: Dict):
+        """Store a snapshot together with the balances it contains"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.setdefault(address.lower(), {})
+            entry['snapshot'] = (snapshot, now)
+            entry['banana'] = (snapshot['banana_balance'], now)
+            entry['native'] = (snapshot['native_balance'], now)
+
+    def invalidate(self, address: str):
+        """Forget everything cached for an account"""
+        with self._lock:
+            self._entries.pop(address.lower(), None)
+
+
+# Shared by every ContractManager so the dashboard sees the bot's fresh values
+balance_cache = BalanceCache()
@@ -0,0 +1,245 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import subprocess
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import requests
+from eth_account import Account
+
+from config import ContractConfig
+from metrics import percentile
+
+
+def _serve_simulator(conn, options: Dict):
+    # Runs in a child process so the bots and the chain don't share a GIL
+    from simulator import DiceSimulator, SimulatorServer
+    server = SimulatorServer(
+        DiceSimulator(fulfillment_delay=options['fulfillment_delay'], block_time=options['block_time'],
+                      seed=options['seed']),
+        latency=options['latency'], error_rate=options['error_rate']
+    )
+    conn.send(server.url)
+    server.serve_forever()
+
+
+def start_simulator_process(options: Dict):
+    """Start simulator.py in a child process
+
+    Returns:
+        Tuple[multiprocessing.Process, str]: The process and its endpoint URL
+    """
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_serve_simulator, args=(child, options), daemon=True)
+    process.start()
+    return process, parent.recv()
+
+
+def simulator_stats(url: str) -> Dict:
+    response = requests.post(url, json={'jsonrpc': '2.0', 'id': 1, 'method': 'simulator_stats', 'params': []},
+                             timeout=30)
+    return response.json()['result']
+
+
+class _Session:
+    """Timing for one wallet's bet cycles"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.latencies: List[float] = []
+        self.bets = 0
+        self.failed = 0
+        self.deadline = None
+
+    def timed(self, play):
+        def play_dice_game():
+            start = time.time()
+            result = play()
+            end = time.time()
+            # Cycles cut short by the stop signal at the end of the run don't count
+            if end <= self.deadline:
+                if result:
+                    self.bets += 1
+                    self.latencies.append(end - start)
+                else:
+                    self.failed += 1
+            return result
+        return play_dice_game
+
+
+def _run_cycles(session: _Session):
+    while time.time() < session.deadline and not session.bot._should_stop:
+        session.bot.play_dice_game()
+
+
+def run_level(sessions: int, mode: str, duration: float, url: str, pipeline_depth: int = 1) -> Dict:
+    """Run `sessions` concurrent wallets for `duration` seconds
+
+    Args:
+        sessions: Number of concurrent wallets
+        mode: "cycle" calls ApesWinBot.play_dice_game in a loop, "worker" runs app.bot_worker
+        duration: Measurement window in seconds
+        url: Simulator endpoint, used for RPC counters
+        pipeline_depth: Bets in flight per wallet
+
+    Returns:
+        Dict: Throughput, RPC usage and cycle latency for this level
+    """
+    from bot import ApesWinBot
+    if mode == 'worker':
+        import app
+
+    runs = []
+    for _ in range(sessions):
+        bot = ApesWinBot(Account.create().key.hex())
+        bot.pipeline_depth = pipeline_depth
+        bot._should_stop = False
+        session = _Session(bot)
+        bot.play_dice_game = session.timed(bot.play_dice_game)
+        runs.append(session)
+
+    before = simulator_stats(url)
+    start = time.time()
+    threads = []
+    user_ids = []
+    for session in runs:
+        session.deadline = start + duration
+        if mode == 'worker':
+            user_id = str(uuid.uuid4())
+            app.user_bots[user_id] = session.bot
+            app.user_running[user_id] = True
+            user_ids.append(user_id)
+            thread = threading.Thread(target=app.bot_worker, args=(user_id,), daemon=True)
+        else:
+            thread = threading.Thread(target=_run_cycles, args=(session,), daemon=True)
+        thread.start()
+        threads.append(thread)
+
+    time.sleep(max(0, start + duration - time.time()))
+    after = simulator_stats(url)
+
+    # Stop everything and let in-flight cycles wind down
+    for session in runs:
+        session.bot._should_stop = True
+    if mode == 'worker':
+        for user_id in user_ids:
+            app.user_running[user_id] = False
+    for thread in threads:
+        thread.join(timeout=max(1, start + duration + 90 - time.time()))
+    for session in runs:
+        session.bot.shutdown()
+    if mode == 'worker':
+        for user_id in user_ids:
+            app.user_bots.pop(user_id, None)
+            app.user_running.pop(user_id, None)
+            app.user_stats.pop(user_id, None)
+
+    latencies = sorted(latency for session in runs for latency in session.latencies)
+    bets = sum(session.bets for session in runs)
+    minutes = duration / 60
+    # Leave out the benchmark's own simulator_stats request
+    requests_made = after['requests'] - before['requests'] - 1
+    calls_made = after['calls'] - before['calls'] - 1
+    methods = {
+        method: count - before['methods'].get(method, 0)
+        for method, count in after['methods'].items()
+        if count - before['methods'].get(method, 0) > 0 and method != 'simulator_stats'
+    }
+    return {
+        'sessions': sessions,
+        'mode': mode,
+        'pipeline_depth': pipeline_depth,
+        'duration': duration,
+        'bets': bets,
+        'failed_cycles': sum(session.failed for session in runs),
+        'bets_per_minute': round(bets / minutes, 2),
+        'bets_per_minute_per_wallet': round(bets / minutes / sessions, 3),
+        'rpc_requests_per_bet': round(requests_made / bets, 2) if bets else None,
+        'rpc_calls_per_bet': round(calls_made / bets, 2) if bets else None,
+        'rpc_calls_by_method': methods,
+        'latency_p50': percentile(latencies, 50),
+        'latency_p95': percentile(latencies, 95),
+        'latency_p99': percentile(latencies, 99)
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bet cycle throughput benchmark against the local simulator")
+    parser.add_argument('--sessions', default="1,10,50,100,250,500",
+                        help="comma separated concurrency levels")
+    parser.add_argument('--mode', choices=['cycle', 'worker'], default='cycle',
+                        help="cycle drives ApesWinBot.play_dice_game, worker drives app.bot_worker")
+    parser.add_argument('--duration', type=float, default=60, help="seconds measured per level")
+    parser.add_argument('--pipeline-depth', type=int, default=1)
+    parser.add_argument('--pool-size', type=int, default=None, help="override ContractConfig.RPC_POOL_SIZE")
+    parser.add_argument('--url', default=None, help="use a running simulator instead of starting one")
+    parser.add_argument('--fulfillment-delay', type=float, default=2.0)
+    parser.add_argument('--block-time', type=float, default=1.0)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', default="benchmark_results.json")
+    parser.add_argument('--verbose', action='store_true', help="keep the bot's INFO logging")
+    args = parser.parse_args()
+
+    import bot  # noqa: F401, installs the bot's log formatting
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+    simulator_options = {
+        'fulfillment_delay': args.fulfillment_delay,
+        'block_time': args.block_time,
+        'latency': args.latency,
+        'error_rate': args.error_rate,
+        'seed': args.seed
+    }
+    process = None
+    url = args.url
+    if url is None:
+        process, url = start_simulator_process(simulator_options)
+    ContractConfig.SONIC_RPC_URL = url
+    ContractConfig.SONIC_RPC_URLS = []
+    if args.pool_size:
+        ContractConfig.RPC_POOL_SIZE = args.pool_size
+
+    report = {
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'simulator': simulator_options if args.url is None else {'url': url},
+        'rpc_pool_size': ContractConfig.RPC_POOL_SIZE,
+        'results': []
+    }
+    try:
+        for sessions in [int(level) for level in args.sessions.split(',')]:
+            print(f"🏁 {sessions} session(s), {args.mode} mode, {args.duration:.0f}s...", flush=True)
+            result = run_level(sessions, args.mode, args.duration, url, args.pipeline_depth)
+            report['results'].append(result)
+            p50 = result['latency_p50'] or 0
+            p95 = result['latency_p95'] or 0
+            p99 = result['latency_p99'] or 0
+            print(f"   {result['bets_per_minute']:.1f} bets/min "
+                  f"({result['bets_per_minute_per_wallet']:.2f}/wallet), "
+                  f"{result['rpc_calls_per_bet'] or 0:.1f} RPC calls/bet, "
+                  f"p50/p95/p99 {p50:.2f}/{p95:.2f}/{p99:.2f}s", flush=True)
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2)
+    finally:
+        if process is not None:
+            process.terminate()
+    print(f"📄 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
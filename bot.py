@@ -4,9 +4,17 @@ import signal
 import schedule
 from web3 import Web3
 from contracts import ContractManager
+from dice import is_69
+import strategy
+from strategy import DEFAULT_SETTINGS, StrategyState
+from backtest import backtest as replay_rounds
 from config import ContractConfig
+from pipeline import BetPipeline
+from prefetch import NextBetPrefetch
+from tracing import BetTrace, TraceStats
+from streaming import RollingWindow, SessionStats
 import logging
-from typing import Tuple, Optional
+from typing import Dict, Tuple, Optional
 
 # Configure logging with colors
 class ColorFormatter(logging.Formatter):
@@ -45,8 +53,8 @@ logger.handlers = [handler]  # Remove any existing handlers
 
 
 class ApesWinBot:
-    def __init__(self, private_key=None):
-        self.contract_manager = ContractManager(private_key)
+    def __init__(self, private_key=None, contract_manager=None):
+        self.contract_manager = contract_manager or ContractManager(private_key)
         self.base_bet_amount = None  # Will be set on first run
         self.win_streak = 0  # Track consecutive wins for win streak strategy
         self.loss_streak = 0  # Track consecutive losses
@@ -62,8 +70,8 @@ class ApesWinBot:
         self.chase_69_multiplier = 1.1  # Increase bet by 10% for each game over threshold
         
         # Advanced win/loss tracking
-        self.win_amounts = []  # Track actual win amounts
-        self.loss_amounts = []  # Track actual loss amounts
+        self.win_amounts = RollingWindow(20)  # Last max_track_games wins as a multiple of the bet
+        self.loss_amounts = RollingWindow(20)  # Last max_track_games losses as a multiple of the bet
         self.avg_win_amount = 0  # Average win amount as percentage of bet
         self.avg_loss_amount = 0  # Average loss amount as percentage of bet
         self.profit_factor = 0  # Win-to-loss ratio
@@ -76,6 +84,20 @@ class ApesWinBot:
         self.session_start_balance = 0  # Will be set on first run
         self.session_games = 0  # Total games this session
         
+        # Pipelined submission (opt-in): number of bets allowed in flight at once
+        self.pipeline_depth = 1
+        self._pipeline = None
+        
+        # Prepare the next bet during fulfillment and bet again as soon as a round settles
+        self.prefetch = ContractConfig.PREFETCH_NEXT_BET
+        self._prefetch = None
+        
+        # Per-phase timing of every bet this session
+        self.trace_stats = TraceStats()
+        
+        # Running win/loss statistics for the dashboard
+        self.session_stats = SessionStats()
+        
     def update_wallet(self, private_key):
         """Update the wallet with a new private key"""
         try:
@@ -130,61 +152,35 @@ class ApesWinBot:
         
         # Set maximum wait time to prevent infinite waiting
         max_wait_time = 60  # seconds
-        start_time = time.time()
-        
-        # Add backoff strategy for retries
-        retry_count = 0
-        max_retries = 5
-        error_logged = False
-        
-        while time.time() - start_time < max_wait_time:
-            # Check for stop signal
-            if hasattr(self, '_should_stop') and self._should_stop:
-                logging.info("🛑 Stop signal detected while waiting for game result")
-                logging.info("Game in progress will complete but no new bets will be placed")
-                # Return a signal that indicates we should stop but still wait for the result
-                return False, 0, [0, 0, 0]  # placeholder values
+        
+        # The shared log watcher wakes us as soon as the round is fulfilled
+        result = self.contract_manager.wait_for_game_round(
+            game_id,
+            timeout=max_wait_time,
+            should_stop=lambda: getattr(self, '_should_stop', False)
+        )
+        
+        # Check for stop signal
+        if result is None and getattr(self, '_should_stop', False):
+            logging.info("🛑 Stop signal detected while waiting for game result")
+            logging.info("Game in progress will complete but no new bets will be placed")
+            # Return a signal that indicates we should stop but still wait for the result
+            return False, 0, [0, 0, 0]  # placeholder values
+        
+        if result is not None:
+            balance_change = result['total_winnings'] - result['total_bet']
+            won = balance_change > 0
             
-            try:
-                # Get game result with retries
-                result = self.contract_manager.get_game_result(game_id)
-                
-                # Reset error flag if we got a response
-                if result is not None and not error_logged:
-                    retry_count = 0  # Reset retry counter on successful response
-                
-                if result and result.get('fulfilled', False):
-                    balance_change = result['total_winnings'] - result['total_bet']
-                    won = balance_change > 0
-                    
-                    # Log the result with improved formatting
-                    dice_str = ", ".join(str(d) for d in result['dice_results'])
-                    logging.info(f"\n🎲 DICE RESULTS: [{dice_str}]")
-                    
-                    if won:
-                        logging.info(f"✨ RESULT: WIN! +{self.format_bananas(balance_change)} 🍌")
-                    else:
-                        logging.info(f"📉 RESULT: LOSS -{self.format_bananas(abs(balance_change))} 🍌")
-                        
-                    # Display updated balance with visual indicator of change
-                    new_balance = initial_balance + balance_change
-                    percent_change = (balance_change / initial_balance) * 100 if initial_balance > 0 else 0
-                    
-                    return won, balance_change, result['dice_results']
-            except Exception as e:
-                # Only log the first error to avoid spamming
-                if not error_logged:
-                    logging.error(f"Error getting game result (will retry): {e}")
-                    error_logged = True
-                
-                retry_count += 1
-                if retry_count >= max_retries:
-                    logging.error(f"Max retries ({max_retries}) reached when getting game result")
-                    # Don't return yet, just continue waiting until max_wait_time
-                    retry_count = 0  # Reset for next attempt cycle
+            # Log the result with improved formatting
+            dice_str = ", ".join(str(d) for d in result['dice_results'])
+            logging.info(f"\n🎲 DICE RESULTS: [{dice_str}]")
+            
+            if won:
+                logging.info(f"✨ RESULT: WIN! +{self.format_bananas(balance_change)} 🍌")
+            else:
+                logging.info(f"📉 RESULT: LOSS -{self.format_bananas(abs(balance_change))} 🍌")
             
-            # Break waiting into smaller intervals to check for stop signal more frequently
-            time.sleep(0.5)
+            return won, balance_change, result['dice_results']
             
         # If we get here, we timed out waiting for a result but we'll continue anyway
         logging.warning(f"⚠️ Timed out waiting for game result after {max_wait_time} seconds")
@@ -194,252 +190,58 @@ class ApesWinBot:
     
     def play_dice_game(self):
         """Execute dice game strategy"""
+        if self.pipeline_depth > 1 or self._pipeline is not None:
+            return self.play_pipelined()
         try:
-            # Get initial balance before bet
-            initial_balance = self.contract_manager.get_banana_balance()
-            
-            # Check stop signal again before proceeding
-            if hasattr(self, '_should_stop') and self._should_stop:
-                logging.info("🛑 Stop signal detected before bet calculation, halting transactions")
-                return None
+            trace = BetTrace()
+            with trace.phase('preflight'):
+                # Use what was prepared while the last round was pending, if anything
+                snapshot, planned = None, None
+                if self._prefetch is not None:
+                    snapshot, planned = self._prefetch.take(self.settings)
+                if snapshot is None:
+                    # Get initial balance, nonce and last game state in one round trip
+                    snapshot = self.contract_manager.snapshot()
+                initial_balance = snapshot['banana_balance']
                 
-            # Initialize session data on first run
-            if self.session_start_balance is None:
-                self.session_start_balance = initial_balance
-                self.all_time_high = initial_balance
-            else:
-                # Update all-time high if we have a new high
-                self.all_time_high = max(self.all_time_high, initial_balance)
-            
-            if initial_balance < ContractConfig.SAFETY_THRESHOLD:
-                logging.info(f"⚠️ Balance below safety threshold ({self.format_bananas(ContractConfig.SAFETY_THRESHOLD)} 🍌), skipping bet")
-                return
-            
-            # Set initial base bet on first run
-            if self.base_bet_amount is None:
-                self.base_bet_amount = max(
-                    ContractConfig.MIN_BET_AMOUNT,
-                    int(initial_balance * self.min_bet_percentage)  # Start with minimum percentage
-                )
-                logging.info(f"🎯 Initial bet set to {self.format_bananas(self.base_bet_amount)} 🍌 ({(self.base_bet_amount / initial_balance * 100):.1f}% of balance)")
-            
-            # Safety check - if balance is too low for base bet
-            if initial_balance < self.base_bet_amount:
-                logging.warning("⚠️ Balance too low for current bet! Resetting...")
-                self.base_bet_amount = max(
-                    ContractConfig.MIN_BET_AMOUNT,
-                    int(initial_balance * ContractConfig.MAX_BET_PERCENTAGE)
-                )
-                logging.info(f"🎯 New bet amount: {self.format_bananas(self.base_bet_amount)} 🍌")
-            
-            # Place bet using base amount
-            logging.info("\n" + "="*50)
-            logging.info(f"🎲 PLACING BET 🎲")
-            logging.info("-"*50)
-            logging.info(f"💰 BALANCE")
-            logging.info(f"   Current:  {self.format_bananas(initial_balance):>10} 🍌")
-            logging.info(f"   All-Time: {self.format_bananas(max(initial_balance, self.all_time_high)):>10} 🍌 {'📈 NEW HIGH!' if initial_balance > self.all_time_high else ''}")
-            logging.info(f"\n📊 STRATEGY")
-            logging.info(f"   Win Streak:   {self.win_streak}x {'🔥' * min(self.win_streak, 5)}")
-            logging.info(f"   Loss Streak:  {self.loss_streak}x {'📉' * min(self.loss_streak, 5)}")
-            logging.info(f"   69 Drought:   {self.games_since_69}x {'🌟' if self.games_since_69 >= self.chase_69_threshold else ''}")
-            # Calculate multipliers
-            win_bonus = 1.0
-            recovery = 1.0
-            chase_bonus = 1.0
-            variable_bonus = 1.0
-            
-            # Apply win streak bonus
-            if self.win_streak > 0:
-                win_bonus = min(1.0 + (self.win_streak * self.win_streak_rate), 2.0)  # Cap at 2x
-                logging.info(f"   Win Streak:   {self.win_streak}x (Bonus: {win_bonus:.2f}x) 🔥")
-            
-            # Apply loss recovery
-            if self.loss_streak > 0:
-                recovery = min(1.0 + (self.loss_streak * self.loss_recovery_rate), 2.0)  # Cap at 2x
-                logging.info(f"   Recovery:     {recovery:.2f}x")
-                
-            # Add 69 pattern chasing bonus if we're in a drought
-            if self.games_since_69 >= self.chase_69_threshold:
-                games_over = self.games_since_69 - self.chase_69_threshold + 1
-                chase_bonus = min(self.chase_69_multiplier ** games_over, 3.0)  # Cap at 3x
-                logging.info(f"   69 Chase:     {chase_bonus:.2f}x 🌟")
-            
-            # Apply variable win/loss ratio adjustments if we have enough data
-            if len(self.win_amounts) > 2 and len(self.loss_amounts) > 2:
-                # Risk-reward adjustment based on profit factor
-                if self.profit_factor > 1.0:
-                    # If we're winning more than losing, adjust based on win sensitivity
-                    variable_bonus = 1.0 + ((self.profit_factor - 1.0) * self.win_sensitivity)
-                    variable_bonus = min(variable_bonus, 1.5)  # Cap at 1.5x
-                else:
-                    # If we're losing more than winning, reduce bet based on loss sensitivity
-                    variable_bonus = max(1.0 - ((1.0 - self.profit_factor) * self.loss_sensitivity), 0.5)  # Floor at 0.5x
+                # Check stop signal again before proceeding
+                if hasattr(self, '_should_stop') and self._should_stop:
+                    logging.info("🛑 Stop signal detected before bet calculation, halting transactions")
+                    return None
+                    
+                actual_bet = self.calculate_bet(initial_balance, planned)
+                if actual_bet is None:
+                    return None
                 
-                logging.info(f"   Win Avg:      {self.avg_win_amount:.2f}x")
-                logging.info(f"   Loss Avg:     {self.avg_loss_amount:.2f}x")
-                logging.info(f"   Profit Factor: {self.profit_factor:.2f}")
-                logging.info(f"   Risk Adjust:   {variable_bonus:.2f}x")
+                # Final stop check before placing the actual blockchain transaction
+                if hasattr(self, '_should_stop') and self._should_stop:
+                    logging.info("🛑 Stop signal detected just before blockchain transaction, cancelling bet")
+                    return None
                 
-            # Calculate the actual current bet amount with all modifiers
-            actual_bet = int(self.base_bet_amount * win_bonus * recovery * chase_bonus * variable_bonus)
-            
-            # Cap the bet at max percentage
-            max_allowed_bet = int(initial_balance * self.max_bet_percentage)
-            if actual_bet > max_allowed_bet:
-                logging.info(f"   ⚠️ Bet capped at {self.max_bet_percentage*100}% of balance")
-                actual_bet = max_allowed_bet
-            
-            # Store the current bet amount for real-time tracking
-            self.current_bet_amount = actual_bet
-            
-            # Make the current bet amount available for the UI to read
-            # Instead of directly accessing user_stats (which is not available here),
-            # we'll just log and rely on app.py to read this value
-            logging.info(f"CURRENT_BET_SET: {self.format_bananas(self.current_bet_amount, decimal_places=2)} 🍌")
-            
-            logging.info(f"\n🎯 BET DETAILS")
-            logging.info(f"   Base Amount:  {self.format_bananas(self.base_bet_amount):>10} 🍌")
-            logging.info(f"   Final Amount: {self.format_bananas(self.current_bet_amount):>10} 🍌")
-            logging.info(f"   Percentage:   {(self.current_bet_amount / initial_balance * 100):>9.1f}%")
-            logging.info("="*50)
-            
-            # Final stop check before placing the actual blockchain transaction
-            if hasattr(self, '_should_stop') and self._should_stop:
-                logging.info("🛑 Stop signal detected just before blockchain transaction, cancelling bet")
-                return None
-                
-            game_id = self.contract_manager.place_dice_bet(actual_bet)
+            game_id = self.contract_manager.place_dice_bet(actual_bet, snapshot, trace)
             
             # If bet failed, return None to trigger delay
             if game_id is None:
                 return None
+            
+            if self.prefetch:
+                if self._prefetch is None:
+                    self._prefetch = NextBetPrefetch(self.contract_manager)
+                self._prefetch.start(self.settings, self.strategy_state, initial_balance, actual_bet)
                 
             # Wait for game result
-            won, balance_change, dice_results = self.wait_for_game_result(game_id, initial_balance)
+            with trace.phase('fulfillment'):
+                won, balance_change, dice_results = self.wait_for_game_result(game_id, initial_balance)
+            if self._prefetch is not None:
+                with trace.phase('prefetch'):
+                    self._prefetch.settle(game_id)
+            self.record_trace(trace)
             
             # If result is None, something went wrong
             if dice_results is None:
                 return None
                 
-            # Track win/loss amount relative to bet size for better strategy adjustment
-            if won:
-                # Calculate win as percentage of bet (e.g., 2x, 3x, etc.)
-                win_ratio = balance_change / self.current_bet_amount
-                self.win_amounts.append(win_ratio)
-                # Keep only last N games
-                if len(self.win_amounts) > self.max_track_games:
-                    self.win_amounts.pop(0)
-                # Update average win amount
-                self.avg_win_amount = sum(self.win_amounts) / len(self.win_amounts) if self.win_amounts else 1.0
-            else:
-                # Calculate loss as percentage of bet (usually 1.0 for full loss, but can be partial)
-                loss_ratio = abs(balance_change) / self.current_bet_amount
-                self.loss_amounts.append(loss_ratio)
-                # Keep only last N games
-                if len(self.loss_amounts) > self.max_track_games:
-                    self.loss_amounts.pop(0)
-                # Update average loss amount
-                self.avg_loss_amount = sum(self.loss_amounts) / len(self.loss_amounts) if self.loss_amounts else 1.0
-            
-            # Calculate profit factor (win-to-loss ratio)
-            if self.avg_loss_amount > 0 and self.avg_win_amount > 0:
-                self.profit_factor = self.avg_win_amount / self.avg_loss_amount
-            else:
-                self.profit_factor = 1.0
-                
-            # Get dice result first
-            dice_result = []
-            if dice_results and len(dice_results) == 3:
-                # Create bitmask like contract
-                bit_dice = 0
-                double3 = False
-                for num in dice_results:
-                    # Check for double 3
-                    if num == 3 and (bit_dice & (1 << num)) != 0:
-                        double3 = True
-                    bit_dice |= (1 << num)
-                    dice_result.append(num)
-                
-                # Check for 69 pattern: combinations of 6,9 or 6,3 (without double 3)
-                # First handle: 6+9 pattern (note: dice go from 1-6)
-                has_six = 6 in dice_result
-                has_nine = False  # Since dice are 1-6, we check for combinations that add to 9
-                
-                # Check for combinations that sum to 9 (like 3+6, 4+5)
-                for i in range(len(dice_result)):
-                    for j in range(i+1, len(dice_result)):
-                        if dice_result[i] + dice_result[j] == 9:
-                            has_nine = True
-                
-                # Also check standard contract patterns: (bitDice == 72 && !double3) || bitDice == 112
-                # 72 = 64 (bit 6) + 8 (bit 3) = pattern with 6,3,3
-                # 112 = 64 (bit 6) + 32 (bit 5) + 16 (bit 4) = pattern with 6,5,4 (includes 69)
-                contract_pattern = (bit_dice == 72 and not double3) or bit_dice == 112
-                
-                if has_six and has_nine or contract_pattern:
-                    is_69_win = True
-                    logging.info(f"\n🌟 69 PATTERN!")
-                    self.games_since_69 = 0
-                else:
-                    self.games_since_69 += 1
-            
-            # Log dice results
-            logging.info(f"\n🎲 DICE RESULTS: {dice_result}")
-            
-            # Update win/loss streaks based on balance change
-            if balance_change > 0:
-                self.win_streak += 1
-                self.loss_streak = 0  # Reset loss streak
-                win_bonus = min(1.0 + (self.win_streak * self.win_streak_rate), 2.0)  # Cap at 2x
-                logging.info(f"✨ WIN: +{self.format_bananas(balance_change)} 🍌")
-                logging.info(f"🔥 WIN STREAK: {self.win_streak}x (Next bonus: {win_bonus:.2f}x)")
-            else:
-                self.loss_streak += 1
-                self.win_streak = 0  # Reset win streak
-                recovery_multiplier = min(1.0 + (self.loss_streak * self.loss_recovery_rate), 2.0)  # Cap at 2x
-                logging.info(f"📉 LOSS: -{self.format_bananas(abs(balance_change))} 🍌")
-                logging.info(f"📉 LOSS STREAK: {self.loss_streak}x (Next recovery: {recovery_multiplier:.2f}x)")
-            
-            # Calculate next bet
-            new_balance = initial_balance + balance_change
-            
-            # Initialize multipliers for next betting round
-            recovery_multiplier = 1.0
-            chase_bonus = 1.0
-            
-            # Apply 69 chase bonus
-            if self.games_since_69 >= self.chase_69_threshold:
-                games_over = self.games_since_69 - self.chase_69_threshold + 1
-                chase_bonus = min(self.chase_69_multiplier ** games_over, 3.0)  # Cap at 3x
-                logging.info(f"🌟 69 DROUGHT: {self.games_since_69}x (Chase: {chase_bonus:.2f}x)")
-            
-            # Combine multipliers and cap at max percentage
-            bet_percentage = min(
-                self.min_bet_percentage * 
-                recovery_multiplier * 
-                chase_bonus, 
-                self.max_bet_percentage
-            )
-            
-            # Calculate next bet
-            self.base_bet_amount = max(
-                ContractConfig.MIN_BET_AMOUNT,
-                int(new_balance * bet_percentage)
-            )
-            
-            logging.info(f"🎯 NEXT BET: {self.format_bananas(self.base_bet_amount)} 🍌 ({(self.base_bet_amount / new_balance * 100):.1f}%)")
-            
-            # Return game information for dashboard
-            return {
-                'game_id': game_id,
-                'dice': dice_result,
-                'won': balance_change > 0,
-                'bet_amount': self.format_bananas(self.current_bet_amount or self.base_bet_amount),
-                'current_bet': self.format_bananas(self.current_bet_amount or self.base_bet_amount, decimal_places=2),
-                'balance_change': self.format_bananas(abs(balance_change)),
-                'is_69': is_69_win if 'is_69_win' in locals() else False
-            }
+            return self.record_result(game_id, initial_balance, actual_bet, balance_change, dice_results)
                 
         except ValueError as e:
             if "Failed to approve" in str(e):
@@ -452,12 +254,255 @@ class ApesWinBot:
             logging.error(f"Unexpected error: {e}")
             time.sleep(1)
     
+    def play_pipelined(self):
+        """Keep up to pipeline_depth bets in flight and settle the oldest one
+
+        Bets are sized from the balance at submission time, so outcomes of
+        bets still in flight are not reflected in the next bet's size.
+        Results are settled in game order, matching fulfillment order. When
+        pipeline_depth changes, the bets in flight are settled first and the
+        pipeline is rebuilt at the new depth, or dropped for depth 1.
+        """
+        try:
+            pipeline = self._pipeline
+            if pipeline is not None and pipeline.depth != max(1, self.pipeline_depth):
+                if len(pipeline):
+                    return self._settle_next(pipeline)
+                pipeline.shutdown()
+                self._pipeline = pipeline = None
+                if self.pipeline_depth <= 1:
+                    return self.play_dice_game()
+            if pipeline is None:
+                self._pipeline = pipeline = BetPipeline(self.contract_manager, self.pipeline_depth,
+                                                        on_trace=self.record_trace)
+
+            # Top up the pipeline unless we're stopping
+            while pipeline.has_capacity() and not getattr(self, '_should_stop', False):
+                trace = BetTrace()
+                with trace.phase('preflight'):
+                    snapshot = self.contract_manager.snapshot()
+                    initial_balance = snapshot['banana_balance']
+                    actual_bet = self.calculate_bet(initial_balance)
+                if actual_bet is None:
+                    break
+                if not pipeline.submit(actual_bet, initial_balance, snapshot, trace):
+                    break
+
+            return self._settle_next(pipeline)
+        except Exception as e:
+            logging.error(f"Unexpected error: {e}")
+            time.sleep(1)
+
+    def _settle_next(self, pipeline: BetPipeline):
+        """Wait for the oldest bet in the pipeline and record its result"""
+        settled = pipeline.next_result()
+        if settled is None:
+            return None
+
+        game_id, initial_balance, bet_amount, result = settled
+        if game_id is None:
+            return None
+        if result is None or not result.get('fulfilled', False):
+            logging.warning(f"⚠️ Game {game_id} did not settle, assuming loss")
+            return self.record_result(game_id, initial_balance, bet_amount, 0, [1, 1, 1])
+
+        balance_change = result['total_winnings'] - result['total_bet']
+        dice_str = ", ".join(str(d) for d in result['dice_results'])
+        logging.info(f"\n🎲 DICE RESULTS: [{dice_str}]")
+        return self.record_result(game_id, initial_balance, bet_amount, balance_change, result['dice_results'])
+
+    def shutdown(self):
+        """Record the bets still in the pipeline, then release its threads and the prefetcher's"""
+        if self._pipeline is not None:
+            while len(self._pipeline):
+                try:
+                    self._settle_next(self._pipeline)
+                except Exception as e:
+                    logging.error(f"Error settling pipelined bet: {e}")
+            self._pipeline.shutdown()
+            self._pipeline = None
+        if self._prefetch is not None:
+            self._prefetch.shutdown()
+            self._prefetch = None
+
+    def record_trace(self, trace: BetTrace):
+        """Add a finished bet's phase timings to the session stats and log them"""
+        self.trace_stats.record(trace)
+        logging.info(f"⏱️ Bet timing: {trace.summary()}")
+
+    @property
+    def settings(self) -> Dict:
+        """Current strategy tunables, keyed as in strategy.DEFAULT_SETTINGS"""
+        return {name: getattr(self, name) for name in DEFAULT_SETTINGS}
+
+    @property
+    def strategy_state(self) -> StrategyState:
+        return StrategyState(
+            base_bet=self.base_bet_amount,
+            win_streak=self.win_streak,
+            loss_streak=self.loss_streak,
+            games_since_69=self.games_since_69,
+            win_ratios=self.win_amounts,
+            loss_ratios=self.loss_amounts,
+            avg_win=self.avg_win_amount,
+            avg_loss=self.avg_loss_amount,
+            profit_factor=self.profit_factor
+        )
+
+    @strategy_state.setter
+    def strategy_state(self, state: StrategyState):
+        self.base_bet_amount = state.base_bet
+        self.win_streak = state.win_streak
+        self.loss_streak = state.loss_streak
+        self.games_since_69 = state.games_since_69
+        self.win_amounts = state.win_ratios
+        self.loss_amounts = state.loss_ratios
+        self.avg_win_amount = state.avg_win
+        self.avg_loss_amount = state.avg_loss
+        self.profit_factor = state.profit_factor
+
+    def backtest(self, rounds: Dict, start_balance: float = 100.0) -> Dict:
+        """Replay recorded rounds (see backtest.load_rounds) with this bot's settings
+
+        Runs the same strategy engine as live betting, without RPC, sleeps or logging.
+        """
+        return replay_rounds(rounds, [self.settings], start_balance)[0]
+
+    def calculate_bet(self, initial_balance: int, planned: Optional[strategy.BetDecision] = None) -> Optional[int]:
+        """Size the next bet from the current balance and strategy state
+
+        Args:
+            initial_balance: Current banana balance
+            planned: Decision the prefetcher sized for this balance and state when the last round settled
+
+        Returns:
+            Optional[int]: Bet amount, or None if the balance is below the safety threshold
+        """
+        # Initialize session data on first run
+        if self.session_start_balance is None:
+            self.session_start_balance = initial_balance
+            self.all_time_high = initial_balance
+        else:
+            # Update all-time high if we have a new high
+            self.all_time_high = max(self.all_time_high, initial_balance)
+        
+        if initial_balance < ContractConfig.SAFETY_THRESHOLD:
+            logging.info(f"⚠️ Balance below safety threshold ({self.format_bananas(ContractConfig.SAFETY_THRESHOLD)} 🍌), skipping bet")
+            return None
+        
+        # Size the bet with the strategy engine; everything below is reporting
+        first_bet = self.base_bet_amount is None
+        if planned is not None:
+            state, decision = self.strategy_state._replace(base_bet=planned.base_bet), planned
+        else:
+            state, decision = strategy.decide(self.settings, self.strategy_state, initial_balance)
+        self.strategy_state = state
+        if decision.reset:
+            logging.warning("⚠️ Balance too low for current bet! Resetting...")
+            logging.info(f"🎯 New bet amount: {self.format_bananas(self.base_bet_amount)} 🍌")
+        elif first_bet:
+            logging.info(f"🎯 Initial bet set to {self.format_bananas(self.base_bet_amount)} 🍌 ({(self.base_bet_amount / initial_balance * 100):.1f}% of balance)")
+        
+        # Place bet using base amount
+        logging.info("\n" + "="*50)
+        logging.info(f"🎲 PLACING BET 🎲")
+        logging.info("-"*50)
+        logging.info(f"💰 BALANCE")
+        logging.info(f"   Current:  {self.format_bananas(initial_balance):>10} 🍌")
+        logging.info(f"   All-Time: {self.format_bananas(max(initial_balance, self.all_time_high)):>10} 🍌 {'📈 NEW HIGH!' if initial_balance > self.all_time_high else ''}")
+        logging.info(f"\n📊 STRATEGY")
+        logging.info(f"   Win Streak:   {self.win_streak}x {'🔥' * min(self.win_streak, 5)}")
+        logging.info(f"   Loss Streak:  {self.loss_streak}x {'📉' * min(self.loss_streak, 5)}")
+        logging.info(f"   69 Drought:   {self.games_since_69}x {'🌟' if self.games_since_69 >= self.chase_69_threshold else ''}")
+        if self.win_streak > 0:
+            logging.info(f"   Win Streak:   {self.win_streak}x (Bonus: {decision.win_bonus:.2f}x) 🔥")
+        if self.loss_streak > 0:
+            logging.info(f"   Recovery:     {decision.recovery:.2f}x")
+        if self.games_since_69 >= self.chase_69_threshold:
+            logging.info(f"   69 Chase:     {decision.chase_bonus:.2f}x 🌟")
+        if len(self.win_amounts) > 2 and len(self.loss_amounts) > 2:
+            logging.info(f"   Win Avg:      {self.avg_win_amount:.2f}x")
+            logging.info(f"   Loss Avg:     {self.avg_loss_amount:.2f}x")
+            logging.info(f"   Profit Factor: {self.profit_factor:.2f}")
+            logging.info(f"   Risk Adjust:   {decision.variable_bonus:.2f}x")
+        
+        actual_bet = decision.bet
+        if decision.capped:
+            logging.info(f"   ⚠️ Bet capped at {self.max_bet_percentage*100}% of balance")
+        
+        # Store the current bet amount for real-time tracking
+        self.current_bet_amount = actual_bet
+        
+        # Make the current bet amount available for the UI to read
+        # Instead of directly accessing user_stats (which is not available here),
+        # we'll just log and rely on app.py to read this value
+        logging.info(f"CURRENT_BET_SET: {self.format_bananas(self.current_bet_amount, decimal_places=2)} 🍌")
+        
+        logging.info(f"\n🎯 BET DETAILS")
+        logging.info(f"   Base Amount:  {self.format_bananas(self.base_bet_amount):>10} 🍌")
+        logging.info(f"   Final Amount: {self.format_bananas(self.current_bet_amount):>10} 🍌")
+        logging.info(f"   Percentage:   {(self.current_bet_amount / initial_balance * 100):>9.1f}%")
+        logging.info("="*50)
+        
+        return actual_bet
+
+    def record_result(self, game_id: int, initial_balance: int, bet_amount: int,
+                      balance_change: int, dice_results: list) -> Dict:
+        """Update streaks, averages and next base bet from a settled game
+
+        Returns:
+            Dict: Game information for the dashboard
+        """
+        # Get dice result first
+        dice_result = []
+        is_69_win = False
+        hit_69 = None  # Unknown dice leave the 69 drought unchanged
+        if dice_results and len(dice_results) == 3:
+            dice_result = list(dice_results)
+            is_69_win = hit_69 = is_69(dice_result)
+        
+        self.strategy_state = strategy.settle(self.settings, self.strategy_state, initial_balance,
+                                              bet_amount, balance_change, hit_69)
+        self.session_stats.record(balance_change, bet_amount, initial_balance + balance_change)
+        
+        if is_69_win:
+            logging.info(f"\n🌟 69 PATTERN!")
+        
+        # Log dice results
+        logging.info(f"\n🎲 DICE RESULTS: {dice_result}")
+        
+        if balance_change > 0:
+            logging.info(f"✨ WIN: +{self.format_bananas(balance_change)} 🍌")
+            logging.info(f"🔥 WIN STREAK: {self.win_streak}x (Next bonus: {strategy.win_bonus(self.settings, self.win_streak):.2f}x)")
+        else:
+            logging.info(f"📉 LOSS: -{self.format_bananas(abs(balance_change))} 🍌")
+            logging.info(f"📉 LOSS STREAK: {self.loss_streak}x (Next recovery: {strategy.recovery_bonus(self.settings, self.loss_streak):.2f}x)")
+        
+        if self.games_since_69 >= self.chase_69_threshold:
+            chase_bonus = strategy.chase_bonus(self.settings, self.games_since_69)
+            logging.info(f"🌟 69 DROUGHT: {self.games_since_69}x (Chase: {chase_bonus:.2f}x)")
+        
+        new_balance = initial_balance + balance_change
+        logging.info(f"🎯 NEXT BET: {self.format_bananas(self.base_bet_amount)} 🍌 ({(self.base_bet_amount / new_balance * 100):.1f}%)")
+        
+        # Return game information for dashboard
+        return {
+            'game_id': game_id,
+            'dice': dice_result,
+            'won': balance_change > 0,
+            'bet_amount': self.format_bananas(bet_amount or self.base_bet_amount),
+            'current_bet': self.format_bananas(bet_amount or self.base_bet_amount, decimal_places=2),
+            'balance_change': self.format_bananas(abs(balance_change)),
+            'is_69': is_69_win
+        }
+    
     def run(self):
         """Main bot loop"""
         logging.info("\n🎲 APES.WIN DICE BOT")
         
-        initial_balance = self.contract_manager.get_banana_balance()
-        native_balance = self.contract_manager.get_native_balance()
+        snapshot = self.contract_manager.snapshot()
+        initial_balance = snapshot['banana_balance']
+        native_balance = snapshot['native_balance']
         
         logging.info(f"\n💰 🍌 {self.format_bananas(initial_balance)} | 💎 {self.contract_manager.format_native(native_balance):.4f} S")
         
@@ -466,8 +511,9 @@ class ApesWinBot:
                 # Play a game
                 result = self.play_dice_game()
                 
-                # Normal delay between bets
-                time.sleep(5)
+                # Normal delay between bets; prefetching bets again as soon as a round settles
+                if not self.prefetch or result is None:
+                    time.sleep(5)
                     
             except Exception as e:
                 logging.error(f"❌ {e}")
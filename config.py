@@ -1,8 +1,17 @@
+import os
 from typing import Dict, ClassVar
 from web3 import Web3
+import metrics
+from providers import registry
 
 class ContractConfig:
-    SONIC_RPC_URL = "https://rpc.soniclabs.com"
+    # Override with SONIC_RPC_URL, e.g. to run against simulator.py
+    SONIC_RPC_URL = os.getenv("SONIC_RPC_URL", "https://rpc.soniclabs.com")
+    # Optional comma-separated endpoints to route between; empty means SONIC_RPC_URL only
+    SONIC_RPC_URLS: ClassVar[list] = [url.strip() for url in os.getenv("SONIC_RPC_URLS", "").split(",") if url.strip()]
+    RPC_HEDGE_FULFILLMENT = False  # race fulfillment checks across the two fastest endpoints
+    RPC_POOL_SIZE = 32  # keep-alive connections shared by all bots
+    RPC_TIMEOUT = 10  # seconds
     
     # Contract Address - Season 2 Dice Game Contract
     CONTRACT_ADDRESS = "0x40A94AB8Aac840Be65B22Ac857A78ac56447db5f"
@@ -10,6 +19,56 @@ class ContractConfig:
     BANANA_TOKEN_ADDRESS = CONTRACT_ADDRESS
     CHAIN_ID = 146
     
+    # Multicall3 is deployed at the same address on every EVM chain
+    MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+    MULTICALL_ENABLED = True
+    MULTICALL_WINDOW = 0.05  # seconds to collect reads before sending one aggregate3
+    MULTICALL_MAX_BATCH = 200  # calls per aggregate3 request
+    
+    # Fulfillment watching: one shared eth_getLogs poll per endpoint
+    FULFILLMENT_POLL_INTERVAL = 0.5  # seconds between log polls
+    FULFILLMENT_FALLBACK_INTERVAL = 5  # seconds between direct round checks per game
+    
+    # Balances are re-read after our own transactions; this TTL catches outside changes
+    BALANCE_CACHE_TTL = 10  # seconds
+    
+    # Fulfilled rounds are immutable and cached by game ID
+    ROUND_CACHE_SIZE = 10000  # rounds kept in memory
+    ROUND_CACHE_DB = os.getenv("ROUND_CACHE_DB")  # optional SQLite path, e.g. "rounds.db"
+    
+    # Fees are sampled once per block and shared; gas limits are learned from receipts
+    FEE_REFRESH_INTERVAL = 1.0  # seconds, about one Sonic block
+    BASE_FEE_HEADROOM = 2  # maxFeePerGas = base fee * headroom + priority fee
+    MIN_PRIORITY_FEE = 0  # wei
+    MAX_GAS_PRICE = 1000000000000  # 1000 gwei, never offer more than this
+    FALLBACK_GAS_PRICE = 55000000000  # 55 gwei until the first fee sample
+    BET_GAS_LIMIT = 300000  # until a bet receipt has been seen
+    GAS_LIMIT_BUFFER = 1.2  # learned limit = highest recent gasUsed * buffer
+    
+    # Bets the pipelined loop keeps in flight per wallet, each holding a nonce
+    PIPELINE_MAX_DEPTH = 8
+    
+    # Prepare the next bet while the current one waits for fulfillment, and skip the pause between bets
+    PREFETCH_NEXT_BET = os.getenv("PREFETCH_NEXT_BET", "0") == "1"
+    PREFETCH_MAX_AGE = 30  # seconds a prefetched snapshot may be used after it was read
+    
+    # Sign in a process pool instead of the bot's thread; 0 signs in-thread
+    SIGNING_WORKERS = int(os.getenv("SIGNING_WORKERS", "0"))
+    
+    # Event indexer behind /api/history; off unless INDEXER_DB names a SQLite file
+    INDEXER_DB = os.getenv("INDEXER_DB")
+    INDEXER_START_BLOCK = int(os.getenv("INDEXER_START_BLOCK", "0"))
+    INDEXER_PARALLEL_RANGES = 4  # eth_getLogs ranges per batch
+    INDEXER_INITIAL_SPAN = 2000  # blocks per range, adapted to what the node accepts
+    INDEXER_MAX_SPAN = 100000
+    INDEXER_POLL_INTERVAL = 2  # seconds between syncs once caught up
+    
+    # orchestrator.py: many wallets' bet cycles on one shared thread pool
+    ORCHESTRATOR_MAX_CONCURRENT = int(os.getenv("ORCHESTRATOR_MAX_CONCURRENT", "32"))  # cycles in flight
+    ORCHESTRATOR_STAGGER = 0.2  # seconds between wallet start times
+    ORCHESTRATOR_DELAY = 5  # seconds each wallet waits between bets
+    ORCHESTRATOR_MAX_BACKOFF = 120  # seconds, after repeated failed cycles
+    
     # Contract ABIs - Note: This is a combined contract that handles both dice game and token functionality
     DICE_GAME_ABI: ClassVar[list] = [
         {
@@ -151,7 +210,23 @@ class ContractConfig:
     MAX_BET_PERCENTAGE = 0.10  # 10% of balance
     SAFETY_THRESHOLD = 1000  # Minimum balance to maintain
     
-    # Initialize Web3
+    # Initialize Web3 (shared, pooled instance per endpoint)
     @staticmethod
     def get_web3():
-        return Web3(Web3.HTTPProvider(ContractConfig.SONIC_RPC_URL))
+        registry.configure(pool_size=ContractConfig.RPC_POOL_SIZE, timeout=ContractConfig.RPC_TIMEOUT)
+        if len(ContractConfig.SONIC_RPC_URLS) > 1:
+            web3 = registry.get_routed_web3(ContractConfig.SONIC_RPC_URLS)
+        else:
+            web3 = registry.get_web3((ContractConfig.SONIC_RPC_URLS or [ContractConfig.SONIC_RPC_URL])[0])
+        return metrics.install(web3)
+
+    @staticmethod
+    def get_async_web3():
+        registry.configure(pool_size=ContractConfig.RPC_POOL_SIZE, timeout=ContractConfig.RPC_TIMEOUT)
+        return metrics.install(registry.get_async_web3(ContractConfig.SONIC_RPC_URL), async_web3=True)
+
+    @staticmethod
+    def get_contract(web3=None):
+        """Get the shared dice game contract instance"""
+        web3 = web3 or ContractConfig.get_web3()
+        return registry.get_contract(web3, ContractConfig.CONTRACT_ADDRESS, ContractConfig.DICE_GAME_ABI)
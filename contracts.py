@@ -1,9 +1,21 @@
 import time
 from web3 import Web3
+from web3.logs import DISCARD
+from web3._utils.abi import abi_to_signature
 from eth_account.account import Account
 from eth_account.signers.local import LocalAccount
 from eth_abi import encode
 from config import ContractConfig
+from rpc import batch_request, eth_call, decode_call_result, hedged_request
+from multicall import get_aggregator
+from nonce import NonceManager, get_nonce_manager
+from fulfillment import get_watcher
+from balance_cache import balance_cache
+from fees import BET_GAS_KIND, FeeOracle, get_fee_oracle
+from round_cache import round_cache
+from tracing import BetTrace
+from tx_builder import bet_tx_builder
+from signing import get_signing_service
 import os
 from dotenv import load_dotenv
 from typing import Dict, Tuple, Optional
@@ -23,10 +35,7 @@ class ContractManager:
                 # Create a dummy account with no funds
                 self.account = Account.create()
                 # Initialize contract (combined dice game and token contract)
-                self.contract = self.web3.eth.contract(
-                    address=ContractConfig.CONTRACT_ADDRESS,
-                    abi=ContractConfig.DICE_GAME_ABI
-                )
+                self.contract = ContractConfig.get_contract(self.web3)
                 # Track current game ID
                 self.current_game_id = None
                 return
@@ -36,12 +45,10 @@ class ContractManager:
             
         # Initialize account with private key
         self.account: LocalAccount = Account.from_key(private_key)
+        self._register_signing_key()
         
         # Initialize contract (combined dice game and token contract)
-        self.contract = self.web3.eth.contract(
-            address=ContractConfig.CONTRACT_ADDRESS,
-            abi=ContractConfig.DICE_GAME_ABI
-        )
+        self.contract = ContractConfig.get_contract(self.web3)
         
         # Track current game ID
         self.current_game_id = None
@@ -62,12 +69,10 @@ class ContractManager:
             # If we get here, the private key is valid
             self.private_key = private_key
             self.account = new_account
+            self._register_signing_key()
             
             # Re-initialize the contract with the new account
-            self.contract = self.web3.eth.contract(
-                address=ContractConfig.CONTRACT_ADDRESS,
-                abi=ContractConfig.DICE_GAME_ABI
-            )
+            self.contract = ContractConfig.get_contract(self.web3)
             
             logging.info(f"Wallet connected successfully: {self.account.address}")
             return self.account.address
@@ -75,22 +80,141 @@ class ContractManager:
             logging.error(f"Error updating private key: {e}")
             raise ValueError(f"Invalid private key: {e}")
     
+    def _register_signing_key(self):
+        signer = get_signing_service()
+        if signer is not None:
+            signer.register(self.private_key)
+    
+    def sign_transaction(self, tx: Dict):
+        """Sign with the process-pool signer when enabled, otherwise in this thread"""
+        signer = get_signing_service()
+        if signer is None or self.private_key is None:
+            return self.account.sign_transaction(tx)
+        return signer.sign(self.account.address, tx)
+    
+    @property
+    def nonces(self) -> NonceManager:
+        """Shared local nonce allocator for the current account"""
+        return get_nonce_manager(self.web3, self.account.address)
+
+    @property
+    def fees(self) -> FeeOracle:
+        """Shared fee oracle for this endpoint"""
+        return get_fee_oracle(self.web3)
+
+    def _read(self, contract_function):
+        """Run a view call, sharing one Multicall3 request with other wallets when enabled"""
+        if ContractConfig.MULTICALL_ENABLED:
+            try:
+                return get_aggregator(self.web3).call(contract_function, caller=self.account.address)
+            except Exception as e:
+                logging.debug(f"Multicall read failed, calling directly: {e}")
+        return contract_function.call()
+
     def get_native_balance(self) -> int:
-        """Get native token (S) balance"""
-        return self.web3.eth.get_balance(self.account.address)
+        """Get native token (S) balance, served from the balance cache when fresh"""
+        cached = balance_cache.get(self.account.address, 'native')
+        if cached is not None:
+            return cached
+        balance = self.web3.eth.get_balance(self.account.address)
+        balance_cache.put(self.account.address, 'native', balance)
+        return balance
 
     def format_native(self, amount: int) -> float:
         """Format native token amount from wei"""
         return amount / 1e18
 
     def get_banana_balance(self) -> int:
-        """Get Banana balance"""
-        return self.contract.functions.balanceOf(self.account.address).call()
+        """Get Banana balance, served from the balance cache when fresh"""
+        cached = balance_cache.get(self.account.address, 'banana')
+        if cached is not None:
+            return cached
+        balance = self._read(self.contract.functions.balanceOf(self.account.address))
+        balance_cache.put(self.account.address, 'banana', balance)
+        return balance
         
     def format_bananas(self, amount: int) -> float:
         """Format banana amount from wei to regular number"""
         return amount / 10**18
     
+    def snapshot(self, use_cache: bool = False) -> Dict:
+        """Fetch balances, nonce and last game info in one JSON-RPC batch
+
+        While other wallets are reading through the shared Multicall3
+        aggregator, the two contract reads join its aggregate3 instead and
+        only the native balance and nonce, which aggregate3 can't read, go
+        in this wallet's batch. Alone, one batch is a single round trip.
+
+        Args:
+            use_cache: Return the cached snapshot if it is still fresh. Bet
+                preflight always fetches; display paths should pass True.
+
+        Returns:
+            Dict: banana_balance, native_balance, nonce, last_game_id,
+            last_game_fulfilled and the raw last_round tuple
+        """
+        address = self.account.address
+        if use_cache:
+            cached = balance_cache.get(address, 'snapshot')
+            if cached is not None:
+                return cached
+
+        balance_fn = self.contract.functions.balanceOf(address)
+        last_game_fn = self.contract.functions.getUserLastGameInfo(address)
+
+        shared = None
+        if ContractConfig.MULTICALL_ENABLED:
+            aggregator = get_aggregator(self.web3)
+            if aggregator.should_share(address):
+                shared = aggregator.submit(balance_fn, address), aggregator.submit(last_game_fn, address)
+
+        banana_balance, last_game_info = None, None
+        if shared is not None:
+            native_raw, nonce_raw = batch_request(self.web3, [
+                ('eth_getBalance', [address, 'latest']),
+                ('eth_getTransactionCount', [address, 'pending'])
+            ])
+            balance_future, last_game_future = shared
+            try:
+                banana_balance = balance_future.result(timeout=ContractConfig.RPC_TIMEOUT)
+            except Exception as e:
+                logging.debug(f"Multicall balance read failed, calling directly: {e}")
+                banana_balance = balance_fn.call()
+            try:
+                last_game_info = last_game_future.result(timeout=ContractConfig.RPC_TIMEOUT)
+            except Exception:
+                pass  # reverts for accounts that never played
+        else:
+            banana_raw, native_raw, nonce_raw, last_game_raw = batch_request(self.web3, [
+                eth_call(balance_fn),
+                ('eth_getBalance', [address, 'latest']),
+                ('eth_getTransactionCount', [address, 'pending']),
+                eth_call(last_game_fn)
+            ])
+            if banana_raw is not None:
+                banana_balance = decode_call_result(balance_fn, banana_raw)
+            # getUserLastGameInfo reverts for accounts that never played
+            if last_game_raw is not None:
+                try:
+                    last_game_info = decode_call_result(last_game_fn, last_game_raw)
+                except Exception as e:
+                    logging.warning(f"Could not decode last game info: {e}")
+
+        if banana_balance is None or native_raw is None or nonce_raw is None:
+            raise ValueError("Failed to fetch account snapshot")
+
+        last_game_id, last_round = last_game_info or (0, None)
+        snapshot = {
+            'banana_balance': banana_balance,
+            'native_balance': int(native_raw, 16),
+            'nonce': int(nonce_raw, 16),
+            'last_game_id': last_game_id,
+            'last_game_fulfilled': last_round[0] if last_round else True,
+            'last_round': last_round
+        }
+        balance_cache.put_snapshot(address, snapshot)
+        return snapshot
+
     def get_unfulfilled_games(self) -> list:
         """Get list of unfulfilled games in order
         
@@ -116,24 +240,30 @@ class ContractManager:
         
         Args:
             game_id: Game ID to wait for
-            max_attempts: Maximum number of attempts to check fulfillment
+            max_attempts: Kept for compatibility, the wait lasts max_attempts * 2 seconds
             
         Returns:
             bool: True if game was fulfilled, False if timed out
         """
-        for attempt in range(max_attempts):
-            try:
-                # Check if any games before this one are unfulfilled
-                unfulfilled = self.get_unfulfilled_games()
-                if not unfulfilled or unfulfilled[0] > game_id:
-                    # All games before this one are fulfilled, check this one
-                    result = self.get_game_result(game_id)
-                    if result and result['fulfilled']:
-                        return True
-                time.sleep(2)  # Wait longer between checks
-            except Exception as e:
-                time.sleep(2)
-        return False
+        return self.wait_for_game_round(game_id, timeout=max_attempts * 2) is not None
+
+    def wait_for_game_round(self, game_id: int, timeout: float = 60,
+                            should_stop=None) -> Optional[Dict]:
+        """Wait for a round to be fulfilled, woken by the shared contract log watcher
+
+        Args:
+            game_id: Game ID to wait for
+            timeout: Maximum seconds to wait
+            should_stop: Optional callable returning True to abort the wait
+
+        Returns:
+            Optional[Dict]: Fulfilled round in get_game_round format, None on timeout or stop
+        """
+        result = get_watcher(self.web3).wait(self, game_id, timeout, should_stop)
+        if result is not None:
+            # Winnings were paid out
+            balance_cache.invalidate(self.account.address)
+        return result
     
     def get_last_game_info(self) -> Tuple[int, bool]:
         """Get the last game ID and fulfillment status for the current user
@@ -142,7 +272,7 @@ class ContractManager:
             Tuple[int, bool]: (game_id, fulfilled)
         """
         try:
-            game_info = self.contract.functions.getUserLastGameInfo(self.account.address).call()
+            game_info = self._read(self.contract.functions.getUserLastGameInfo(self.account.address))
             return game_info[0], game_info[1][0]  # (id, round.fulfilled)
         except Exception as e:
             return 0, True  # No games yet
@@ -156,6 +286,11 @@ class ContractManager:
         Returns:
             Optional[Dict]: Game result info or None if not found/fulfilled
         """
+        # Fulfilled rounds never change, skip the RPC entirely if we have it
+        cached = round_cache.get(game_id)
+        if cached is not None:
+            return cached
+        
         # Retry mechanism for blockchain calls
         max_retries = 3
         backoff_time = 0.5  # Start with 0.5 second backoff
@@ -169,7 +304,7 @@ class ContractManager:
                     logging.info(f"Retry {attempt}/{max_retries} for game result (game_id: {game_id})")
                 
                 # Get game info directly
-                game_info = self.contract.functions.getUserLastGameInfo(self.account.address).call()
+                game_info = self._read(self.contract.functions.getUserLastGameInfo(self.account.address))
                 
                 # Handle case where game_id doesn't match
                 if game_info[0] != game_id:
@@ -184,7 +319,7 @@ class ContractManager:
                     return {'fulfilled': False, 'game_id': game_id}  # Return partial result
                 
                 # Successfully got the result
-                return {
+                result = {
                     'fulfilled': round_info[0],  # fulfilled
                     'user': round_info[1],       # user address
                     'total_bet': round_info[2],  # totalBet
@@ -192,6 +327,8 @@ class ContractManager:
                     'bet_amounts': round_info[4],    # betAmounts
                     'dice_results': round_info[5]    # diceRollResult
                 }
+                round_cache.put(game_id, result)
+                return result
             except Exception as e:
                 if attempt == max_retries - 1:  # Only log detailed error on last retry
                     logging.error(f"Error getting game result (attempt {attempt+1}/{max_retries}): {e}")
@@ -215,93 +352,135 @@ class ContractManager:
         """
         try:
             # Check current balance
-            balance = self.contract.functions.balanceOf(self.account.address).call()
+            balance = self.get_banana_balance()
             return balance >= amount
         except Exception as e:
             logging.error(f"Error checking balance: {e}")
             return False
     
-    def place_dice_bet(self, bet_amount: int) -> Optional[int]:
+    def place_dice_bet(self, bet_amount: int, snapshot: Optional[Dict] = None,
+                       trace: Optional[BetTrace] = None) -> Optional[int]:
         """Place a bet on the dice game
-        
+
+        Args:
+            bet_amount: Total amount to bet
+            snapshot: Fresh result of snapshot(), fetched here if not given
+            trace: Trace to record phase timings in
+
         Returns:
             Optional[int]: Game ID if successful, None if failed
         """
-        # Check for any unfulfilled games
-        logging.info("Checking for unfulfilled games...")
-        unfulfilled = self.get_unfulfilled_games()
-        if unfulfilled:
-            # Must wait for oldest unfulfilled game since they must be fulfilled in order
-            oldest_game = unfulfilled[0]  # Already sorted in ascending order
-            if not self.wait_for_game_fulfillment(oldest_game):
-                logging.error("Previous game not fulfilled after timeout")
+        trace = trace or BetTrace()
+        with trace.phase('preflight'):
+            if snapshot is None:
+                snapshot = self.snapshot()
+
+            # Check for any unfulfilled games
+            logging.info("Checking for unfulfilled games...")
+            if snapshot['last_game_id'] > 0 and not snapshot['last_game_fulfilled']:
+                # Must wait for oldest unfulfilled game since they must be fulfilled in order
+                oldest_game = snapshot['last_game_id']
+                logging.info(f"Found unfulfilled game {oldest_game}")
+                if not self.wait_for_game_fulfillment(oldest_game):
+                    logging.error("Previous game not fulfilled after timeout")
+                    return None
+                # Balance and nonce moved while we waited
+                snapshot = self.snapshot()
+
+            # Check if we have enough balance for the bet
+            banana_balance = snapshot['banana_balance']
+            if banana_balance < bet_amount:
+                logging.error(f"Insufficient balance ({self.format_bananas(banana_balance)} Bananas) for bet ({self.format_bananas(bet_amount)} Bananas)")
                 return None
-        
+
+            self.nonces.observe(snapshot['nonce'])
+            native_balance = snapshot['native_balance']
+            logging.info(f"💎 S Balance: {self.format_native(native_balance):.4f} S")
+
+        tx_hash = self.send_dice_bet(bet_amount, trace)
+        if tx_hash is None:
+            return None
+        return self.confirm_dice_bet(tx_hash, trace)
+
+    def send_dice_bet(self, bet_amount: int, trace: Optional[BetTrace] = None) -> Optional[bytes]:
+        """Build, sign and broadcast a bet without waiting for it to be mined
+
+        Args:
+            bet_amount: Total amount to bet, split evenly across the three dice
+            trace: Trace to record build/sign/send timings in
+
+        Returns:
+            Optional[bytes]: Transaction hash if broadcast, None if failed
+        """
         # Place bet (split bet amount across three dice)
         bet_per_dice = bet_amount // 3  # Split bet evenly across dice
         bet_amounts = [bet_per_dice] * 3
         
-        # Optimized transaction parameters from Apes.Win interface
-        gas_price = 55000000000  # 55 Gwei (from example transaction)
-        gas_limit = 300000  # Keep our current limit, it's already lower than example
+        trace = trace or BetTrace()
+        with trace.phase('build'):
+            # Fees come from the shared once-per-block sample and the gas
+            # limit from past bet receipts, so no estimate_gas round trip
+            fee_params = self.fees.fee_params()
+            gas_limit = self.fees.gas_limit(BET_GAS_KIND, ContractConfig.BET_GAS_LIMIT)
         
         # Calculate optimal value to send (from example transaction)
-        tx_value = 19250000000000000  # 0.01925 S (from example transaction)
+        tx_value = bet_tx_builder.value  # 0.01925 S (from example transaction)
         
         logging.info(f"\n📈 Gas Info:")
-        logging.info(f"   Gas Price: {gas_price} wei ({gas_price / 1e9:.2f} gwei)")
+        if 'maxFeePerGas' in fee_params:
+            logging.info(f"   Max Fee: {fee_params['maxFeePerGas'] / 1e9:.2f} gwei (tip {fee_params['maxPriorityFeePerGas'] / 1e9:.2f} gwei)")
+        else:
+            logging.info(f"   Gas Price: {fee_params['gasPrice']} wei ({fee_params['gasPrice'] / 1e9:.2f} gwei)")
         logging.info(f"   Value to Send: {self.format_native(tx_value):.10f} S")
         logging.info(f"   Gas Limit: {gas_limit:,}")
-        
-        # Check if we have enough balance for the bet
-        if not self.check_bet_amount(bet_amount):
-            banana_balance = self.get_banana_balance()
-            logging.error(f"Insufficient balance ({self.format_bananas(banana_balance)} Bananas) for bet ({self.format_bananas(bet_amount)} Bananas)")
-            return None
             
-        # Build transaction
-        nonce = self.web3.eth.get_transaction_count(self.account.address)
+        # Build transaction with a locally allocated nonce
+        nonce = self.nonces.next_nonce()
         
-        # Estimate gas for the transaction
-        logging.info("Estimating gas for bet transaction...")
         try:
-            # Use the regular bet function with an array of bet amounts
-            # This matches the function signature in the ABI: bet(uint256[])
-            transaction = self.contract.functions.bet(bet_amounts)
-            
-            # Use optimized gas parameters from Apes.Win interface
-            gas_price = 55000000000  # 55 Gwei 
-            gas_limit = 300000  # Fixed gas limit
-            
-            # Build transaction with the contract function
-            signed_txn = transaction.build_transaction({
-                'from': self.account.address,
-                'value': tx_value,
-                'gas': 300000,  # Fixed gas limit
-                'gasPrice': gas_price,
-                'nonce': nonce,
-                'chainId': ContractConfig.CHAIN_ID
-            })
+            with trace.phase('build'):
+                # Encode bet(uint256[]) directly; only amounts, nonce and fees change per bet
+                unsigned_tx = bet_tx_builder.build(bet_amounts, nonce, gas_limit, fee_params)
             
+            with trace.phase('sign'):
+                signed_tx = self.sign_transaction(unsigned_tx)
+            with trace.phase('send'):
+                tx_hash = self.web3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            # The stake and gas leave the account with this transaction
+            balance_cache.invalidate(self.account.address)
+            return tx_hash
         except Exception as e:
-            logging.error(f"Failed to estimate gas: {str(e)}")
+            logging.error(f"Error sending bet transaction: {e}")
+            # The nonce may or may not have been consumed, ask the node again
+            self.nonces.resync()
             return None
-        
-        # Sign and send transaction
-        native_balance = self.get_native_balance()
-        logging.info(f"💎 S Balance: {self.format_native(native_balance):.4f} S")
+
+    def confirm_dice_bet(self, tx_hash, trace: Optional[BetTrace] = None) -> Optional[int]:
+        """Wait for a bet transaction to be mined and return its game ID
+
+        Args:
+            tx_hash: Hash returned by send_dice_bet
+            trace: Trace to record the receipt wait in
+
+        Returns:
+            Optional[int]: Game ID if the bet was mined successfully, None if failed
+        """
+        tx_value = bet_tx_builder.value  # must match send_dice_bet
+        trace = trace or BetTrace()
         try:
-            signed_tx = self.web3.eth.account.sign_transaction(signed_txn, self.account.key)
-            tx_hash = self.web3.eth.send_raw_transaction(signed_tx.rawTransaction)
-            
             # Wait for receipt
-            receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
+            with trace.phase('receipt'):
+                receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
+            balance_cache.invalidate(self.account.address)
+            self.fees.observe_receipt(BET_GAS_KIND, receipt)
             if not receipt['status']:
                 logging.error(f"Transaction failed: {tx_hash.hex()}")
+                self.nonces.resync()
                 return None
                 
             # Log actual costs
             gas_used = receipt['gasUsed']
+            gas_price = receipt.get('effectiveGasPrice', ContractConfig.FALLBACK_GAS_PRICE)
             actual_tx_fee = gas_used * gas_price
             value_sent = tx_value  # Value sent with transaction
             total_cost = actual_tx_fee + value_sent
@@ -316,58 +495,110 @@ class ContractManager:
             
             logging.info(f"\n🟢 Transaction Success:")
             logging.info(f"   Gas Used: {gas_used:,}")
+            logging.info(f"   Gas Price: {gas_price / 1e9:.2f} gwei")
             logging.info(f"   Gas Cost: {self.format_native(actual_tx_fee):.4f} S")
             logging.info(f"   Value Sent: {self.format_native(value_sent):.4f} S")
             logging.info(f"   Total Cost: {self.format_native(total_cost):.4f} S")
             logging.info(f"   Saved: ~{savings:.4f} S compared to old settings")
-                
-            # Get game ID from last game info
-            game_id, _ = self.get_last_game_info()
+
+            # The Bet event carries the game ID, so pipelined bets don't
+            # depend on getUserLastGameInfo pointing at this particular game
+            game_id = self.get_game_id_from_receipt(receipt)
+            if game_id is None:
+                game_id, _ = self.get_last_game_info()
             if game_id > 0:
+                trace.game_id = game_id
                 return game_id
                 
             logging.error("Failed to get game ID after successful transaction")
             return None
                 
         except Exception as e:
-            logging.error(f"Error sending bet transaction: {e}")
+            logging.error(f"Error confirming bet transaction: {e}")
+            self.nonces.resync()
             return None
 
-    
+    def get_game_id_from_receipt(self, receipt) -> Optional[int]:
+        """Extract our game ID from the Bet event in a bet receipt"""
+        try:
+            for event in self.contract.events.Bet().process_receipt(receipt, errors=DISCARD):
+                if event['args']['user'].lower() == self.account.address.lower():
+                    return event['args']['gameId']
+        except Exception as e:
+            logging.debug(f"Could not decode Bet event: {e}")
+        return None
+
+    def get_game_round(self, game_id: int) -> Optional[Dict]:
+        """Get a specific round by ID, unlike get_game_result which only sees the last game
+
+        Returns:
+            Optional[Dict]: Game result info in the same shape as get_game_result
+        """
+        cached = round_cache.get(game_id)
+        if cached is not None:
+            return cached
+        
+        round_fn = self.contract.functions.getGameRoundInfo(game_id)
+        try:
+            if ContractConfig.RPC_HEDGE_FULFILLMENT:
+                # Fulfillment checks gate the next bet, so take the fastest endpoint's answer
+                method, params = eth_call(round_fn)
+                round_info = decode_call_result(round_fn, hedged_request(self.web3, method, params))
+            else:
+                round_info = self._read(round_fn)
+        except Exception as e:
+            logging.error(f"Error getting round {game_id}: {e}")
+            return None
+        if not round_info[0]:
+            return {'fulfilled': False, 'game_id': game_id}
+        result = {
+            'fulfilled': round_info[0],
+            'user': round_info[1],
+            'total_bet': round_info[2],
+            'total_winnings': round_info[3],
+            'bet_amounts': round_info[4],
+            'dice_results': round_info[5]
+        }
+        round_cache.put(game_id, result)
+        return result
+
     def build_and_send_tx(self, contract_tx, value: int = 0) -> Dict:
         """Helper to build and send a transaction"""
         try:
-            # Use optimized gas price from Apes.Win interface
-            gas_price = 55000000000  # 55 Gwei
+            kind = abi_to_signature(contract_tx.abi)
+            learned_gas = self.fees.gas_limit(kind)
             
-            # Build transaction with Season 2 parameters
-            tx = contract_tx.buildTransaction({
+            # Build transaction with Season 2 parameters and the shared fee sample
+            tx = contract_tx.build_transaction({
                 'from': self.account.address,
                 'chainId': ContractConfig.CHAIN_ID,
-                'nonce': self.web3.eth.get_transaction_count(self.account.address),
-                'gasPrice': gas_price,
-                'gas': 300000,  # Fixed gas limit from successful tx
-                'value': value
+                'nonce': self.nonces.next_nonce(),
+                'gas': learned_gas or 300000,  # Fixed gas limit from successful tx
+                'value': value,
+                **self.fees.fee_params()
             })
             
-            # Estimate gas with 50% buffer
-            try:
-                gas_estimate = int(self.web3.eth.estimate_gas(tx) * 1.5)
-                tx['gas'] = gas_estimate
-            except Exception as e:
-                print(f"Gas estimation failed: {e}, using default gas limit")
-                tx['gas'] = 500000  # Default gas limit
+            # Only estimate (with 50% buffer) until a receipt has taught us this function's gas
+            if learned_gas is None:
+                try:
+                    gas_estimate = int(self.web3.eth.estimate_gas(tx) * 1.5)
+                    tx['gas'] = gas_estimate
+                except Exception as e:
+                    logging.warning(f"Gas estimation failed: {e}, using default gas limit")
+                    tx['gas'] = 500000  # Default gas limit
             
             # Sign and send transaction
-            signed_tx = self.web3.eth.account.sign_transaction(tx, self.account.key)
+            signed_tx = self.sign_transaction(tx)
             tx_hash = self.web3.eth.send_raw_transaction(signed_tx.rawTransaction)
             
+            balance_cache.invalidate(self.account.address)
+            
             # Wait for receipt
             receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
+            balance_cache.invalidate(self.account.address)
+            self.fees.observe_receipt(kind, receipt)
             return receipt
         except Exception as e:
-            print(f"Error in transaction: {e}")
+            logging.error(f"Error in transaction: {e}")
+            self.nonces.resync()
             return None
-        
-        # Wait for receipt and return
-        return self.web3.eth.wait_for_transaction_receipt(tx_hash)
@@ -0,0 +1,283 @@
+import itertools
+import math
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from strategy import bet_fraction
+
+# Payout per banana staked, by roll. The real multipliers live in the
+# contract; these are placeholders close to its observed return.
+PATTERN_69_MULTIPLIER = 10
+TRIPLE_MULTIPLIER = 3
+PAIR_MULTIPLIER = 1.2
+
+
+def dice_bitmask(dice: Sequence[int]) -> Tuple[int, bool]:
+    """The contract's (bitDice, double3) for a roll"""
+    bit_dice = 0
+    double3 = False
+    for num in dice:
+        if num == 3 and (bit_dice & (1 << num)) != 0:
+            double3 = True
+        bit_dice |= (1 << num)
+    return bit_dice, double3
+
+
+def _describe(dice: Tuple[int, int, int]) -> Dict:
+    bit_dice, double3 = dice_bitmask(dice)
+    contract_69 = (bit_dice == 72 and not double3) or bit_dice == 112
+    # The bot also counts any six with a pair summing to 9 when tracking 69 droughts
+    has_nine = any(a + b == 9 for a, b in itertools.combinations(dice, 2))
+    if contract_69:
+        multiplier = PATTERN_69_MULTIPLIER
+    elif len(set(dice)) == 1:
+        multiplier = TRIPLE_MULTIPLIER
+    elif len(set(dice)) == 2:
+        multiplier = PAIR_MULTIPLIER
+    else:
+        multiplier = 0
+    return {
+        'dice': dice,
+        'bit_dice': bit_dice,
+        'double3': double3,
+        'contract_69': contract_69,
+        'is_69': contract_69 or (6 in dice and has_nine),
+        'multiplier': multiplier
+    }
+
+
+# Every ordered roll of three dice is equally likely; a roll's index is (d1-1)*36 + (d2-1)*6 + (d3-1)
+OUTCOMES: List[Tuple[int, int, int]] = list(itertools.product(range(1, 7), repeat=3))
+OUTCOME_TABLE: List[Dict] = [_describe(dice) for dice in OUTCOMES]
+OUTCOME_MULTIPLIERS = np.array([outcome['multiplier'] for outcome in OUTCOME_TABLE], dtype=np.float64)
+OUTCOME_IS_69 = np.array([outcome['is_69'] for outcome in OUTCOME_TABLE], dtype=bool)
+
+
+def outcome_index(dice: Sequence[int]) -> Optional[int]:
+    """Index into OUTCOME_TABLE, or None for anything but three dice from 1 to 6"""
+    if len(dice) != 3 or any(not 1 <= num <= 6 for num in dice):
+        return None
+    return (dice[0] - 1) * 36 + (dice[1] - 1) * 6 + (dice[2] - 1)
+
+
+def lookup(dice: Sequence[int]) -> Optional[Dict]:
+    """Precomputed bitmask, patterns and multiplier for a roll"""
+    index = outcome_index(dice)
+    return OUTCOME_TABLE[index] if index is not None else None
+
+
+def is_69(dice: Sequence[int]) -> bool:
+    """Whether a roll ends a 69 drought for the bot; placeholder rolls like [0, 0, 0] never do"""
+    outcome = lookup(dice)
+    return outcome is not None and outcome['is_69']
+
+
+def roll_multiplier(dice: Sequence[int]) -> float:
+    """Payout multiplier for a roll of three dice, see the constants above"""
+    outcome = lookup(dice)
+    return outcome['multiplier'] if outcome is not None else 0
+
+
+def outcome_classes() -> List[Dict]:
+    """Rolls grouped by what matters to the bot: payout multiplier and 69 drought reset"""
+    classes: Dict[Tuple[float, bool], Dict] = {}
+    for outcome in OUTCOME_TABLE:
+        key = (outcome['multiplier'], outcome['is_69'])
+        if key not in classes:
+            classes[key] = {'multiplier': key[0], 'is_69': key[1], 'rolls': 0}
+        classes[key]['rolls'] += 1
+    for entry in classes.values():
+        entry['probability'] = entry['rolls'] / len(OUTCOMES)
+    return sorted(classes.values(), key=lambda entry: (-entry['multiplier'], not entry['is_69']))
+
+
+def outcome_summary() -> Dict:
+    """Exact probabilities of each kind of roll and the return per banana staked"""
+    count = len(OUTCOMES)
+    return {
+        'p_contract_69': sum(outcome['contract_69'] for outcome in OUTCOME_TABLE) / count,
+        'p_69': float(OUTCOME_IS_69.mean()),
+        'p_triple': sum(len(set(outcome['dice'])) == 1 for outcome in OUTCOME_TABLE) / count,
+        'p_pair': sum(outcome['multiplier'] == PAIR_MULTIPLIER for outcome in OUTCOME_TABLE) / count,
+        'p_win': float((OUTCOME_MULTIPLIERS > 1).mean()),
+        'return_to_player': float(OUTCOME_MULTIPLIERS.mean()),
+        'classes': outcome_classes()
+    }
+
+
+def _streak_cap(rate: float) -> int:
+    # First streak length whose bonus hits the 2x cap; longer streaks behave the same
+    return max(1, math.ceil(1.0 / rate - 1e-9)) if rate > 0 else 1
+
+
+def _drought_cap(threshold: int, multiplier: float) -> int:
+    # First drought at which the chase bonus hits its 3x cap (or stays at 1x)
+    if multiplier <= 1.0:
+        return max(threshold, 0)
+    return max(threshold, 0) + math.ceil(math.log(3.0) / math.log(multiplier) - 1e-9)
+
+
+class PolicyChain:
+    """The bot's bet sizing as a finite Markov chain over (win streak, loss streak, 69 drought)
+
+    Streaks and droughts past the point where their bonus is capped are
+    merged, so the chain stays small. The profit-factor adjustment depends
+    on the last max_track_games results and is left out. Bets are modelled
+    as fractions of the balance: MIN_BET_AMOUNT, flooring to whole wei and
+    to multiples of three, and SAFETY_THRESHOLD are ignored, which matters
+    only for balances close to the minimum bet. Payouts are the placeholder
+    multipliers above, not the contract's.
+    """
+
+    def __init__(self, settings: Dict):
+        self.settings = settings
+        win_cap = _streak_cap(settings['win_streak_rate'])
+        loss_cap = _streak_cap(settings['loss_recovery_rate'])
+        drought_cap = _drought_cap(int(settings['chase_69_threshold']), settings['chase_69_multiplier'])
+        streaks = [(0, 0)] + [(n, 0) for n in range(1, win_cap + 1)] + [(0, n) for n in range(1, loss_cap + 1)]
+        self.states = [(wins, losses, drought) for wins, losses in streaks for drought in range(drought_cap + 1)]
+        index = {state: i for i, state in enumerate(self.states)}
+        self.start = index[(0, 0, 0)]
+
+        self.classes = outcome_classes()
+        self.probabilities = np.array([entry['probability'] for entry in self.classes])
+        self.fractions = np.array([bet_fraction(settings, *state) for state in self.states])
+        # factors[s, c]: balance multiplier, next_state[s, c]: state after class c from state s
+        multipliers = np.array([entry['multiplier'] for entry in self.classes], dtype=np.float64)
+        self.factors = 1.0 + self.fractions[:, None] * (multipliers[None, :] - 1.0)
+        self.next_state = np.zeros((len(self.states), len(self.classes)), dtype=np.int64)
+        for s, (wins, losses, drought) in enumerate(self.states):
+            for c, entry in enumerate(self.classes):
+                next_drought = 0 if entry['is_69'] else min(drought + 1, drought_cap)
+                if entry['multiplier'] > 1:
+                    following = (min(wins + 1, win_cap), 0, next_drought)
+                else:
+                    following = (0, min(losses + 1, loss_cap), next_drought)
+                self.next_state[s, c] = index[following]
+
+    def step(self, distribution: np.ndarray, weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """Push a distribution (or a weighted measure, per class) over states one game forward"""
+        flow = distribution[:, None] * self.probabilities[None, :]
+        if weights is not None:
+            flow = flow * weights
+        return np.bincount(self.next_state.ravel(), flow.ravel(), minlength=len(self.states))
+
+    def stationary(self) -> np.ndarray:
+        """Long-run share of games played in each state"""
+        size = len(self.states)
+        transitions = np.zeros((size, size))
+        np.add.at(transitions, (np.repeat(np.arange(size), len(self.classes)), self.next_state.ravel()),
+                  np.tile(self.probabilities, size))
+        # pi (P - I) = 0 with sum(pi) = 1; states the chain never returns to get zero weight
+        system = np.vstack([(transitions - np.eye(size)).T, np.ones(size)])
+        target = np.zeros(size + 1)
+        target[-1] = 1.0
+        return np.linalg.lstsq(system, target, rcond=None)[0]
+
+    def ruin_and_outcomes(self, games: int, ruin_fraction: float, bins: int, upper: float) -> Dict:
+        """Distribution of the log balance over `games` on a grid, with ruin as an absorbing state"""
+        low, high = math.log(ruin_fraction), math.log(upper)
+        width = (high - low) / (bins - 1)
+        count = len(self.states) * bins
+        ruin_slot = count
+
+        # Precompute where each (state, bin) sends its mass for every class: split between the
+        # two nearest bins so the mean is kept, or all to ruin once it lands below the bottom bin
+        targets = []
+        weights = []
+        position = np.arange(bins)
+        for c in range(len(self.classes)):
+            shift = np.log(self.factors[:, c]) / width
+            whole = np.floor(shift).astype(np.int64)
+            part = shift - whole
+            landing = position[None, :] + whole[:, None]
+            for offset, share in ((0, 1.0 - part), (1, part)):
+                target = np.where(landing < 0, ruin_slot,
+                                  self.next_state[:, c][:, None] * bins + np.minimum(landing + offset, bins - 1))
+                targets.append(target.ravel())
+                weights.append(np.repeat(self.probabilities[c] * share, bins))
+        targets = np.concatenate(targets)
+        weights = np.stack(weights)
+
+        mass = np.zeros(count)
+        start = -low / width
+        start_bin = int(math.floor(start))
+        mass[self.start * bins + start_bin] = 1.0 - (start - start_bin)
+        mass[self.start * bins + min(start_bin + 1, bins - 1)] += start - start_bin
+        ruined = 0.0
+        for _ in range(games):
+            moved = np.bincount(targets, (mass[None, :] * weights).ravel(), minlength=count + 1)
+            ruined += moved[ruin_slot]
+            mass = moved[:count]
+
+        by_bin = mass.reshape(len(self.states), bins).sum(axis=0)
+        log_balance = low + width * position
+        cumulative = np.cumsum(by_bin) + ruined
+
+        def quantile(q: float) -> float:
+            # Ruined sessions stop at the bottom of the grid and count as a balance of 0
+            if q <= ruined:
+                return 0.0
+            i = min(int(np.searchsorted(cumulative, q)), bins - 1)
+            return float(math.exp(log_balance[i]))
+
+        return {
+            'risk_of_ruin': float(ruined),
+            'prob_profit': float(by_bin[log_balance > 1e-12].sum()),
+            'median_balance': quantile(0.5),
+            'balance_p5': quantile(0.05),
+            'balance_p95': quantile(0.95)
+        }
+
+
+def analyze_policy(settings: Dict, games: int = 500, ruin_fraction: float = 0.1,
+                   bins: int = 256, upper: float = 20.0) -> Dict:
+    """Growth and risk figures for a bot's bet sizing, without sampling
+
+    With both sensitivities 0 the figures match montecarlo.simulate up to
+    sampling error, the log-balance grid and the rounding PolicyChain leaves
+    out; otherwise the profit-factor adjustment is left out too and the
+    report is marked approximate. Ruined sessions are absorbed, so quantiles
+    below the risk of ruin are 0.
+
+    Args:
+        settings: Every ApesWinBot tunable (see montecarlo.DEFAULT_SETTINGS)
+        games: Session length in bets
+        ruin_fraction: Ruin is the balance falling below this fraction of the start
+        bins: Log-balance grid points for the ruin and quantile figures
+        upper: Balance multiple treated as the top of the grid
+
+    Returns:
+        Dict: Balances are multiples of the starting balance
+    """
+    started = time.time()
+    chain = PolicyChain(settings)
+    log_factors = np.log(chain.factors)
+
+    # Expected balance and expected log balance follow directly from the state distribution
+    distribution = np.zeros(len(chain.states))
+    distribution[chain.start] = 1.0
+    expected_balance = distribution.copy()
+    expected_log = 0.0
+    for _ in range(games):
+        expected_log += float((distribution[:, None] * chain.probabilities[None, :] * log_factors).sum())
+        expected_balance = chain.step(expected_balance, chain.factors)
+        distribution = chain.step(distribution)
+
+    stationary = chain.stationary()
+    growth = float((stationary[:, None] * chain.probabilities[None, :] * log_factors).sum())
+    report = {
+        'games': games,
+        'approximate': bool(settings['win_sensitivity'] or settings['loss_sensitivity']),
+        'states': len(chain.states),
+        'expected_balance': float(expected_balance.sum()),
+        'expected_log_growth': expected_log,
+        'growth_per_game': growth,
+        'mean_bet_fraction': float((stationary * chain.fractions).sum()),
+        'max_bet_fraction': float(chain.fractions.max())
+    }
+    report.update(chain.ruin_and_outcomes(games, ruin_fraction, bins, upper))
+    report['elapsed'] = round(time.time() - started, 3)
+    return report
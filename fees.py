@@ -0,0 +1,154 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from config import ContractConfig
+from rpc import async_batch_request, batch_request
+
+BET_GAS_KIND = 'bet(uint256[])'  # gas limits are learned per function signature
+
+FEE_CALLS = [
+    ('eth_getBlockByNumber', ['latest', False]),
+    ('eth_maxPriorityFeePerGas', []),
+    ('eth_gasPrice', [])
+]
+
+
+class FeeOracle:
+    """Fee and gas limit estimates shared by every wallet on an endpoint
+
+    Base fee and priority fee are sampled with one batched request at most
+    once per `refresh_interval` (about a block). Gas limits are learned per
+    transaction kind from the gasUsed of successful receipts, so bets don't
+    need an eth_estimateGas round trip. Only one sample is in flight at a
+    time and it is taken outside the lock, so while it runs other wallets
+    keep using the last sample.
+    """
+
+    def __init__(self, web3, refresh_interval: float = None):
+        self.web3 = web3
+        self.refresh_interval = ContractConfig.FEE_REFRESH_INTERVAL if refresh_interval is None else refresh_interval
+        self.block_number: Optional[int] = None
+        self.base_fee: Optional[int] = None  # None on chains without EIP-1559
+        self.priority_fee = 0
+        self.gas_price = ContractConfig.FALLBACK_GAS_PRICE
+        self.sampled_at = 0.0
+        self._gas_used: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()  # held by the one sample in flight
+
+    @property
+    def stale(self) -> bool:
+        return time.time() - self.sampled_at >= self.refresh_interval
+
+    def refresh(self, force: bool = False):
+        """Sample fees from the node if the cached values are older than a block"""
+        if not force and not self.stale:
+            return
+        # Only wait for a sample in flight if there is nothing cached to use meanwhile
+        if not self._refresh_lock.acquire(blocking=not self.sampled_at):
+            return
+        try:
+            if force or self.stale:
+                sample = batch_request(self.web3, FEE_CALLS)
+                with self._lock:
+                    self._apply_sample(*sample)
+        except Exception as e:
+            # Keep using the last sample, the next caller will try again
+            logging.warning(f"Fee sampling failed, using cached fees: {e}")
+        finally:
+            self._refresh_lock.release()
+
+    async def refresh_async(self, async_web3, force: bool = False):
+        """refresh() for AsyncWeb3 callers; never waits for a sample already in flight"""
+        if not force and not self.stale:
+            return
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            sample = await async_batch_request(async_web3, FEE_CALLS)
+            with self._lock:
+                self._apply_sample(*sample)
+        except Exception as e:
+            logging.warning(f"Fee sampling failed, using cached fees: {e}")
+        finally:
+            self._refresh_lock.release()
+
+    def _apply_sample(self, block: Optional[Dict], priority_fee: Optional[str], gas_price: Optional[str]):
+        if block is None and gas_price is None:
+            raise ValueError("node returned no fee data")
+        if block is not None:
+            self.block_number = int(block['number'], 16)
+            base_fee = block.get('baseFeePerGas')
+            self.base_fee = int(base_fee, 16) if base_fee is not None else None
+        if gas_price is not None:
+            self.gas_price = int(gas_price, 16)
+        if priority_fee is not None:
+            self.priority_fee = int(priority_fee, 16)
+        elif self.base_fee is not None:
+            self.priority_fee = max(0, self.gas_price - self.base_fee)
+        self.sampled_at = time.time()
+
+    def fee_params(self, refresh: bool = True) -> Dict[str, int]:
+        """Fee fields for a transaction dict
+
+        With a base fee this is an EIP-1559 pair: we pay base fee plus tip,
+        and maxFeePerGas only sets how much base fee growth we tolerate.
+
+        Args:
+            refresh: Sample the node first if the cached fees are stale; async
+                callers pass False after refresh_async() so nothing blocks the event loop
+        """
+        if refresh:
+            self.refresh()
+        if self.base_fee is None:
+            return {'gasPrice': min(self.gas_price, ContractConfig.MAX_GAS_PRICE)}
+        priority_fee = max(self.priority_fee, ContractConfig.MIN_PRIORITY_FEE)
+        max_fee = self.base_fee * ContractConfig.BASE_FEE_HEADROOM + priority_fee
+        max_fee = min(max_fee, ContractConfig.MAX_GAS_PRICE)
+        return {
+            'maxFeePerGas': max_fee,
+            'maxPriorityFeePerGas': min(priority_fee, max_fee)
+        }
+
+    def gas_limit(self, kind: str, default: Optional[int] = None) -> Optional[int]:
+        """Gas limit learned for a transaction kind, or `default` before any receipt"""
+        with self._lock:
+            used = self._gas_used.get(kind)
+            if not used:
+                return default
+            return int(max(used) * ContractConfig.GAS_LIMIT_BUFFER)
+
+    def observe_receipt(self, kind: str, receipt):
+        """Learn from a mined transaction; failed ones may have run out of gas and are skipped"""
+        if not receipt['status']:
+            return
+        with self._lock:
+            if kind not in self._gas_used:
+                self._gas_used[kind] = deque(maxlen=50)
+            self._gas_used[kind].append(receipt['gasUsed'])
+
+    def as_dict(self) -> Dict:
+        return {
+            'block': self.block_number,
+            'base_fee': self.base_fee,
+            'priority_fee': self.priority_fee,
+            'gas_price': self.gas_price,
+            'gas_limits': {kind: self.gas_limit(kind) for kind in list(self._gas_used)}
+        }
+
+
+# One oracle per RPC endpoint shared by every wallet
+_oracles: Dict[str, FeeOracle] = {}
+_oracles_lock = threading.Lock()
+
+
+def get_fee_oracle(web3) -> FeeOracle:
+    """Get the process-wide fee oracle for web3's endpoint"""
+    key = web3.provider.endpoint_uri
+    with _oracles_lock:
+        if key not in _oracles:
+            _oracles[key] = FeeOracle(web3)
+        return _oracles[key]
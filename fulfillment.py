@@ -0,0 +1,275 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from eth_abi import decode
+from eth_utils import event_abi_to_log_topic
+
+from config import ContractConfig
+from rpc import async_batch_request, batch_request
+
+# Non-indexed argument types for the dice contract events we understand
+EVENT_TYPES = {
+    event['name']: [arg['type'] for arg in event['inputs']]
+    for event in ContractConfig.DICE_GAME_ABI if event['type'] == 'event'
+}
+EVENT_TOPICS = {
+    '0x' + event_abi_to_log_topic(event).hex(): event['name']
+    for event in ContractConfig.DICE_GAME_ABI if event['type'] == 'event'
+}
+
+
+def decode_log(log: Dict) -> Optional[Dict]:
+    """Decode a raw eth_getLogs entry from the dice contract
+
+    Returns:
+        Optional[Dict]: {'event': name, 'args': tuple} or None for events not in the ABI
+    """
+    topics = log.get('topics') or []
+    name = EVENT_TOPICS.get(topics[0].lower()) if topics else None
+    if name is None:
+        return None
+    data = log.get('data', '0x')
+    args = decode(EVENT_TYPES[name], bytes.fromhex(data[2:]))
+    return {'event': name, 'args': args}
+
+
+def users_in_log(log: Dict) -> Set[str]:
+    """Lowercase addresses a log refers to
+
+    Known events are decoded; for anything else (the VRF callback may emit
+    events missing from our ABI) every 32-byte word that looks like a
+    left-padded address is treated as a candidate user.
+    """
+    decoded = decode_log(log)
+    if decoded is not None:
+        return {arg.lower() for arg in decoded['args'] if isinstance(arg, str)}
+
+    users = set()
+    words = list(log.get('topics') or [])[1:]
+    data = log.get('data', '0x')[2:]
+    words += ['0x' + data[i:i + 64] for i in range(0, len(data), 64)]
+    for word in words:
+        if len(word) == 66 and word[2:26] == '0' * 24:
+            users.add('0x' + word[26:].lower())
+    return users
+
+
+def users_in_logs(logs: list) -> Tuple[int, Set[str]]:
+    """Highest block number and every user referenced by a batch of raw logs"""
+    last_block = 0
+    users = set()
+    for log in logs:
+        last_block = max(last_block, int(log['blockNumber'], 16))
+        users |= users_in_log(log)
+    return last_block, users
+
+
+class _Waiter:
+    def __init__(self, user: str):
+        self.user = user
+        self.event = threading.Event()
+
+
+class FulfillmentWatcher:
+    """Wakes games waiting for fulfillment when the dice contract logs activity for their user
+
+    One background thread per endpoint polls eth_blockNumber and eth_getLogs
+    in a single batch for every waiting wallet, instead of each wallet
+    polling getUserLastGameInfo. A woken waiter confirms with one
+    getGameRoundInfo read; a slow direct check covers rounds whose
+    fulfillment emits nothing we can attribute to the user.
+    """
+
+    def __init__(self, web3, poll_interval: float = None, fallback_interval: float = None):
+        self.web3 = web3
+        self.poll_interval = poll_interval or ContractConfig.FULFILLMENT_POLL_INTERVAL
+        self.fallback_interval = fallback_interval or ContractConfig.FULFILLMENT_FALLBACK_INTERVAL
+        self.address = ContractConfig.DICE_GAME_ADDRESS
+        self._waiters: Dict[int, _Waiter] = {}
+        self._next_block: Optional[int] = None
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._poll_loop, daemon=True)
+        self._thread.start()
+
+    def wait(self, contract_manager, game_id: int, timeout: float,
+             should_stop: Optional[Callable[[], bool]] = None) -> Optional[Dict]:
+        """Block until a game is fulfilled
+
+        Args:
+            contract_manager: ContractManager owning the game
+            game_id: Game ID to wait for
+            timeout: Maximum seconds to wait
+            should_stop: Optional callable checked twice a second to abort early
+
+        Returns:
+            Optional[Dict]: Fulfilled round in get_game_round format, None on timeout or stop
+        """
+        waiter = _Waiter(contract_manager.account.address.lower())
+        with self._condition:
+            self._waiters[game_id] = waiter
+            self._condition.notify()
+
+        try:
+            deadline = time.time() + timeout
+            next_direct_check = time.time()  # the round may already be done
+            while True:
+                now = time.time()
+                if now >= deadline or (should_stop and should_stop()):
+                    return None
+                if waiter.event.is_set() or now >= next_direct_check:
+                    waiter.event.clear()
+                    result = contract_manager.get_game_round(game_id)
+                    if result and result.get('fulfilled', False):
+                        return result
+                    next_direct_check = time.time() + self.fallback_interval
+                waiter.event.wait(min(0.5, max(0, deadline - now)))
+        finally:
+            with self._condition:
+                self._waiters.pop(game_id, None)
+
+    def _poll_loop(self):
+        while True:
+            with self._condition:
+                while not self._waiters:
+                    # Nothing to watch; restart from the chain head next time
+                    self._next_block = None
+                    self._condition.wait()
+            try:
+                self._poll_once()
+            except Exception as e:
+                logging.debug(f"Fulfillment log poll failed: {e}")
+            time.sleep(self.poll_interval)
+
+    def _poll_once(self):
+        if self._next_block is None:
+            self._next_block = self.web3.eth.block_number + 1
+            return
+
+        head, logs = batch_request(self.web3, [
+            ('eth_blockNumber', []),
+            ('eth_getLogs', [{
+                'address': self.address,
+                'fromBlock': hex(self._next_block),
+                'toBlock': 'latest'
+            }])
+        ])
+        if head is None or logs is None:
+            return
+
+        last_block, users = users_in_logs(logs)
+        self._next_block = max(self._next_block, int(head, 16) + 1, last_block + 1)
+
+        if users:
+            with self._condition:
+                for waiter in self._waiters.values():
+                    if waiter.user in users:
+                        waiter.event.set()
+
+
+class AsyncFulfillmentWatcher:
+    """asyncio counterpart of FulfillmentWatcher for AsyncContractManager
+
+    A single polling task per event loop serves every waiting coroutine.
+    """
+
+    def __init__(self, web3, poll_interval: float = None, fallback_interval: float = None):
+        self.web3 = web3
+        self.poll_interval = poll_interval or ContractConfig.FULFILLMENT_POLL_INTERVAL
+        self.fallback_interval = fallback_interval or ContractConfig.FULFILLMENT_FALLBACK_INTERVAL
+        self.address = ContractConfig.DICE_GAME_ADDRESS
+        self._waiters: Dict[int, Tuple[str, asyncio.Event]] = {}
+        self._next_block: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def wait(self, contract_manager, game_id: int, timeout: float,
+                   should_stop: Optional[Callable[[], bool]] = None) -> Optional[Dict]:
+        """Wait until a game is fulfilled, see FulfillmentWatcher.wait"""
+        event = asyncio.Event()
+        self._waiters[game_id] = (contract_manager.account.address.lower(), event)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._poll_loop())
+
+        loop = asyncio.get_running_loop()
+        try:
+            deadline = loop.time() + timeout
+            next_direct_check = loop.time()
+            while True:
+                now = loop.time()
+                if now >= deadline or (should_stop and should_stop()):
+                    return None
+                if event.is_set() or now >= next_direct_check:
+                    event.clear()
+                    result = await contract_manager.get_game_round(game_id)
+                    if result and result.get('fulfilled', False):
+                        return result
+                    next_direct_check = loop.time() + self.fallback_interval
+                try:
+                    await asyncio.wait_for(event.wait(), min(0.5, max(0, deadline - now)))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._waiters.pop(game_id, None)
+
+    async def _poll_loop(self):
+        # Exit when nobody is waiting; the next wait() restarts the task
+        while self._waiters:
+            try:
+                await self._poll_once()
+            except Exception as e:
+                logging.debug(f"Fulfillment log poll failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+        self._next_block = None
+
+    async def _poll_once(self):
+        if self._next_block is None:
+            self._next_block = await self.web3.eth.block_number + 1
+            return
+
+        head, logs = await async_batch_request(self.web3, [
+            ('eth_blockNumber', []),
+            ('eth_getLogs', [{
+                'address': self.address,
+                'fromBlock': hex(self._next_block),
+                'toBlock': 'latest'
+            }])
+        ])
+        if head is None or logs is None:
+            return
+
+        last_block, users = users_in_logs(logs)
+        self._next_block = max(self._next_block, int(head, 16) + 1, last_block + 1)
+        for user, event in list(self._waiters.values()):
+            if user in users:
+                event.set()
+
+
+# One watcher per RPC endpoint shared by every wallet
+_watchers: Dict[str, FulfillmentWatcher] = {}
+_watchers_lock = threading.Lock()
+
+
+def get_watcher(web3) -> FulfillmentWatcher:
+    """Get the process-wide fulfillment watcher for web3's endpoint"""
+    key = web3.provider.endpoint_uri
+    with _watchers_lock:
+        if key not in _watchers:
+            _watchers[key] = FulfillmentWatcher(web3)
+        return _watchers[key]
+
+
+# Async watchers are bound to the event loop that created them; closed loops are dropped
+_async_watchers: Dict[Tuple[str, int], Tuple[asyncio.AbstractEventLoop, AsyncFulfillmentWatcher]] = {}
+
+
+def get_async_watcher(web3) -> AsyncFulfillmentWatcher:
+    """Get the fulfillment watcher for web3's endpoint on the running event loop"""
+    loop = asyncio.get_running_loop()
+    for key in [key for key, (other, _) in _async_watchers.items() if other.is_closed()]:
+        del _async_watchers[key]
+    key = (web3.provider.endpoint_uri, id(loop))
+    if key not in _async_watchers:
+        _async_watchers[key] = (loop, AsyncFulfillmentWatcher(web3))
+    return _async_watchers[key][1]
@@ -0,0 +1,428 @@
+import logging
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from eth_abi import decode, encode
+from eth_utils import function_abi_to_4byte_selector
+from web3._utils.abi import get_abi_output_types
+
+from config import ContractConfig
+from fulfillment import EVENT_TOPICS, decode_log
+from multicall import decode_aggregate3, encode_aggregate3
+from rpc import batch_request
+from round_cache import round_cache
+
+INDEXED_EVENTS = ('Bet', 'MintPoints', 'BurnPoints')
+TOKEN = 10 ** 18  # amounts are stored in tokens so SQL aggregates stay in floating point
+LOGS_PER_RANGE_TARGET = 5000  # shrink ranges that come back this full; many nodes cap at 10000
+ROUND_BATCH = 200  # getGameRoundInfo reads per aggregate3
+ALL_USERS = '*'  # users row holding the totals over every wallet
+FACES = range(1, 7)
+
+_ROUND_ABI = next(item for item in ContractConfig.DICE_GAME_ABI
+                  if item['type'] == 'function' and item['name'] == 'getGameRoundInfo')
+_ROUND_SELECTOR = function_abi_to_4byte_selector(_ROUND_ABI)
+_ROUND_OUTPUT_TYPES = get_abi_output_types(_ROUND_ABI)
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS bets ("
+    "game_id INTEGER PRIMARY KEY, user TEXT NOT NULL, total_bet REAL, block INTEGER, tx_hash TEXT)",
+    "CREATE INDEX IF NOT EXISTS bets_user ON bets (user, game_id)",
+    "CREATE TABLE IF NOT EXISTS rounds ("
+    "game_id INTEGER PRIMARY KEY, total_winnings REAL, "
+    "bet1 REAL, bet2 REAL, bet3 REAL, die1 INTEGER, die2 INTEGER, die3 INTEGER)",
+    "CREATE TABLE IF NOT EXISTS points ("
+    "block INTEGER, log_index INTEGER, user TEXT, kind TEXT, amount REAL, PRIMARY KEY (block, log_index))",
+    "CREATE INDEX IF NOT EXISTS points_user ON points (user, block)",
+    "CREATE TABLE IF NOT EXISTS users ("
+    "user TEXT PRIMARY KEY, bets INTEGER NOT NULL DEFAULT 0, wagered REAL NOT NULL DEFAULT 0, "
+    "returned REAL NOT NULL DEFAULT 0, first_block INTEGER, last_block INTEGER)",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)"
+)
+
+# Running totals over fulfilled games, kept per user at insert time so stats() is one row lookup
+AGGREGATE_COLUMNS = ('games', 'games_wagered', 'wins', 'triples') + tuple(f'face{face}' for face in FACES)
+
+# Recomputes a users row from the bets and rounds tables, for databases indexed before the totals existed
+_REBUILD_USERS = (
+    "INSERT OR REPLACE INTO users (user, bets, wagered, returned, first_block, last_block, "
+    + ", ".join(AGGREGATE_COLUMNS) + ") "
+    "SELECT {key}, COUNT(*), COALESCE(SUM(b.total_bet), 0), COALESCE(SUM(r.total_winnings), 0), "
+    "MIN(b.block), MAX(b.block), COUNT(r.game_id), "
+    "COALESCE(SUM(CASE WHEN r.game_id IS NOT NULL THEN b.total_bet END), 0), "
+    "COALESCE(SUM(r.total_winnings > b.total_bet), 0), COALESCE(SUM(r.die1 = r.die2 AND r.die2 = r.die3), 0), "
+    + ", ".join(f"SUM((r.die1 IS {face}) + (r.die2 IS {face}) + (r.die3 IS {face}))" for face in FACES)
+    + " FROM bets b LEFT JOIN rounds r USING (game_id) {group}"
+)
+
+
+def _three(values) -> list:
+    # Rounds always have three dice, but don't fail the whole batch on an odd one
+    values = list(values)[:3]
+    return values + [None] * (3 - len(values))
+
+
+class GameIndexer:
+    """Backfills and follows the dice contract's events into SQLite
+
+    Bet, MintPoints and BurnPoints logs are pulled with eth_getLogs over
+    several block ranges per JSON-RPC batch. The range size adapts to the
+    node: a refused range halves it, a full one shrinks it and a clean
+    batch doubles it again. A failed batch ends the sync, so the next
+    attempt waits for the poll interval. Dice rolls are not in any event, so
+    rounds for new bets are read with batched getGameRoundInfo calls and
+    retried until fulfilled. Sonic blocks are final, so there is no reorg
+    handling.
+    """
+
+    def __init__(self, web3, db_path: str = None, start_block: int = None,
+                 parallel: int = None, span: int = None):
+        self.web3 = web3
+        self.address = ContractConfig.DICE_GAME_ADDRESS
+        self.parallel = parallel or ContractConfig.INDEXER_PARALLEL_RANGES
+        self.span = span or ContractConfig.INDEXER_INITIAL_SPAN
+        self.max_span = max(self.span, ContractConfig.INDEXER_MAX_SPAN)
+        self.topics = [topic for topic, name in EVENT_TOPICS.items() if name in INDEXED_EVENTS]
+        self._db = sqlite3.connect(db_path or ContractConfig.INDEXER_DB, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        with self._lock:
+            for statement in SCHEMA:
+                self._db.execute(statement)
+            self._add_aggregate_columns()
+            self._db.commit()
+        if self.last_block is None:
+            first = ContractConfig.INDEXER_START_BLOCK if start_block is None else start_block
+            self._set_last_block(first - 1)
+
+    def _add_aggregate_columns(self):
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(users)")}
+        missing = [column for column in AGGREGATE_COLUMNS if column not in columns]
+        if not missing:
+            return
+        for column in missing:
+            kind = 'REAL' if column == 'games_wagered' else 'INTEGER'
+            self._db.execute(f"ALTER TABLE users ADD COLUMN {column} {kind} NOT NULL DEFAULT 0")
+        logging.info("📚 Building per-user totals for an existing index...")
+        self._db.execute(_REBUILD_USERS.format(key="b.user", group="GROUP BY b.user"))
+        self._db.execute(_REBUILD_USERS.format(key=f"'{ALL_USERS}'", group=""))
+
+    @property
+    def last_block(self) -> Optional[int]:
+        """Highest block whose logs are stored"""
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'last_block'").fetchone()
+        return row[0] if row else None
+
+    def _set_last_block(self, block: int):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_block', ?)", (block,))
+            self._db.commit()
+
+    # Indexing
+
+    def start(self, poll_interval: float = None):
+        """Backfill and then keep following new blocks in a background thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        poll_interval = poll_interval or ContractConfig.INDEXER_POLL_INTERVAL
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(poll_interval,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, poll_interval: float):
+        logging.info(f"📚 Indexer starting from block {self.last_block + 1}")
+        while not self._stop.is_set():
+            try:
+                self.sync()
+            except Exception as e:
+                logging.error(f"Indexer sync failed: {e}")
+            self._stop.wait(poll_interval)
+
+    def sync(self, to_block: Optional[int] = None) -> int:
+        """Index logs up to `to_block` (default: chain head) and read rounds for new bets
+
+        Returns:
+            int: Number of bets added
+        """
+        head = self.web3.eth.block_number if to_block is None else to_block
+        added = 0
+        next_block = self.last_block + 1
+        while next_block <= head and not self._stop.is_set():
+            span = self.span
+            covered, logs = self._fetch_logs(next_block, head)
+            if covered < next_block:
+                if self.span < span:
+                    continue  # the node refused the first range, retry it smaller
+                break  # the batch failed, try again after the poll interval
+            added += self._store_logs(logs)
+            self._set_last_block(covered)
+            if covered - next_block > 10 * self.span:
+                logging.info(f"📚 Indexed up to block {covered} of {head}")
+            next_block = covered + 1
+        self._fill_rounds()
+        return added
+
+    def _fetch_logs(self, start: int, head: int) -> Tuple[int, List[Dict]]:
+        """Fetch up to `parallel` consecutive ranges in one batch
+
+        Returns:
+            Tuple[int, List[Dict]]: (last block of the contiguous successful prefix, its logs)
+        """
+        ranges = []
+        block = start
+        while block <= head and len(ranges) < self.parallel:
+            end = min(block + self.span - 1, head)
+            ranges.append((block, end))
+            block = end + 1
+        calls = [
+            ('eth_getLogs', [{
+                'address': self.address,
+                'fromBlock': hex(first),
+                'toBlock': hex(last),
+                'topics': [self.topics]
+            }])
+            for first, last in ranges
+        ]
+        try:
+            results = batch_request(self.web3, calls)
+        except Exception as e:
+            logging.warning(f"eth_getLogs batch failed, retrying after the poll interval: {e}")
+            return start - 1, []
+
+        covered = start - 1
+        logs = []
+        for (first, last), result in zip(ranges, results):
+            if result is None:
+                break
+            covered = last
+            logs.extend(result)
+
+        if covered < ranges[-1][1]:
+            # The node refused a range (too many blocks or results), later ranges are refetched
+            self.span = max(1, self.span // 2)
+        elif any(len(result) >= LOGS_PER_RANGE_TARGET for result in results):
+            self.span = max(1, self.span // 2)
+        else:
+            # Clean batches win back what refusals and full ranges took
+            self.span = min(self.span * 2, self.max_span)
+        return covered, logs
+
+    def _store_logs(self, logs: List[Dict]) -> int:
+        added = 0
+        with self._lock:
+            for log in logs:
+                decoded = decode_log(log)
+                if decoded is None:
+                    continue
+                block = int(log['blockNumber'], 16)
+                if decoded['event'] == 'Bet':
+                    game_id, user, total_bet = decoded['args']
+                    user = user.lower()
+                    cursor = self._db.execute(
+                        "INSERT OR IGNORE INTO bets (game_id, user, total_bet, block, tx_hash) VALUES (?, ?, ?, ?, ?)",
+                        (game_id, user, total_bet / TOKEN, block, log.get('transactionHash'))
+                    )
+                    if cursor.rowcount:
+                        added += 1
+                        for key in (user, ALL_USERS):
+                            self._db.execute(
+                                "INSERT INTO users (user, bets, wagered, first_block, last_block) VALUES (?, 1, ?, ?, ?) "
+                                "ON CONFLICT (user) DO UPDATE SET bets = bets + 1, wagered = wagered + excluded.wagered, "
+                                "last_block = MAX(last_block, excluded.last_block)",
+                                (key, total_bet / TOKEN, block, block)
+                            )
+                else:
+                    user, amount = decoded['args']
+                    self._db.execute(
+                        "INSERT OR IGNORE INTO points (block, log_index, user, kind, amount) VALUES (?, ?, ?, ?, ?)",
+                        (block, int(log['logIndex'], 16), user.lower(),
+                         'mint' if decoded['event'] == 'MintPoints' else 'burn', amount / TOKEN)
+                    )
+            self._db.commit()
+        return added
+
+    def _fill_rounds(self):
+        """Read dice results for bets that don't have a fulfilled round yet"""
+        with self._lock:
+            pending = [row[0] for row in self._db.execute(
+                "SELECT b.game_id FROM bets b LEFT JOIN rounds r USING (game_id) "
+                "WHERE r.game_id IS NULL ORDER BY b.game_id"
+            )]
+        rounds = {}
+        to_read = []
+        for game_id in pending:
+            cached = round_cache.get(game_id)
+            if cached is not None:
+                rounds[game_id] = cached
+            else:
+                to_read.append(game_id)
+
+        group = ROUND_BATCH * self.parallel
+        for i in range(0, len(to_read), group):
+            rounds.update(self._read_rounds(to_read[i:i + group]))
+            if len(rounds) >= group:
+                self._store_rounds(rounds)
+                rounds = {}
+        self._store_rounds(rounds)
+
+    def _read_rounds(self, game_ids: List[int]) -> Dict[int, Dict]:
+        chunks = [game_ids[i:i + ROUND_BATCH] for i in range(0, len(game_ids), ROUND_BATCH)]
+        calls = [
+            ('eth_call', [{
+                'to': ContractConfig.MULTICALL3_ADDRESS,
+                'data': '0x' + encode_aggregate3([
+                    (self.address, _ROUND_SELECTOR + encode(['uint256'], [game_id])) for game_id in chunk
+                ]).hex()
+            }, 'latest'])
+            for chunk in chunks
+        ]
+        try:
+            results = batch_request(self.web3, calls)
+        except Exception as e:
+            logging.warning(f"Round reads failed, will retry: {e}")
+            return {}
+
+        rounds = {}
+        for chunk, raw in zip(chunks, results):
+            if raw is None:
+                continue
+            for game_id, (success, data) in zip(chunk, decode_aggregate3(bytes.fromhex(raw[2:]))):
+                if not success:
+                    continue
+                fulfilled, user, total_bet, total_winnings, bet_amounts, dice_results = decode(_ROUND_OUTPUT_TYPES, data)[0]
+                if fulfilled:
+                    rounds[game_id] = {
+                        'fulfilled': True,
+                        'user': user,
+                        'total_bet': total_bet,
+                        'total_winnings': total_winnings,
+                        'bet_amounts': bet_amounts,
+                        'dice_results': dice_results
+                    }
+        return rounds
+
+    def _store_rounds(self, rounds: Dict[int, Dict]):
+        if not rounds:
+            return
+        with self._lock:
+            for game_id, result in rounds.items():
+                bets = [amount / TOKEN for amount in result['bet_amounts']]
+                dice = _three(result['dice_results'])
+                cursor = self._db.execute(
+                    "INSERT OR IGNORE INTO rounds (game_id, total_winnings, bet1, bet2, bet3, die1, die2, die3) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (game_id, result['total_winnings'] / TOKEN, *_three(bets), *dice)
+                )
+                if cursor.rowcount:
+                    totals = (
+                        result['total_winnings'] / TOKEN,
+                        result['total_bet'] / TOKEN,
+                        int(result['total_winnings'] > result['total_bet']),
+                        int(dice[0] is not None and dice[0] == dice[1] == dice[2]),
+                        *(dice.count(face) for face in FACES)
+                    )
+                    for key in (result['user'].lower(), ALL_USERS):
+                        self._db.execute(
+                            "UPDATE users SET returned = returned + ?, games = games + 1, "
+                            "games_wagered = games_wagered + ?, wins = wins + ?, triples = triples + ?, "
+                            + ", ".join(f"face{face} = face{face} + ?" for face in FACES) + " WHERE user = ?",
+                            (*totals, key)
+                        )
+            self._db.commit()
+
+    # Queries
+
+    def history(self, user: Optional[str] = None, limit: int = 50, before: Optional[int] = None) -> List[Dict]:
+        """Most recent games, newest first
+
+        Args:
+            user: Only this wallet's games
+            limit: Maximum games to return
+            before: Only games with a lower ID, for paging
+        """
+        conditions, params = [], []
+        if user:
+            conditions.append("b.user = ?")
+            params.append(user.lower())
+        if before is not None:
+            conditions.append("b.game_id < ?")
+            params.append(before)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT b.game_id, b.user, b.block, b.total_bet, r.total_winnings, r.die1, r.die2, r.die3 "
+                f"FROM bets b LEFT JOIN rounds r USING (game_id) {where} ORDER BY b.game_id DESC LIMIT ?",
+                params + [limit]
+            ).fetchall()
+        games = []
+        for game_id, user, block, total_bet, winnings, die1, die2, die3 in rows:
+            fulfilled = winnings is not None
+            games.append({
+                'game_id': game_id,
+                'user': user,
+                'block': block,
+                'fulfilled': fulfilled,
+                'dice': [die for die in (die1, die2, die3) if die is not None],
+                'amount': total_bet,
+                'winnings': winnings,
+                'won': fulfilled and winnings > total_bet,
+                'balance_change': round(winnings - total_bet, 4) if fulfilled else None
+            })
+        return games
+
+    def stats(self, user: Optional[str] = None) -> Dict:
+        """Aggregate results over every indexed, fulfilled game, from the running totals"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT bets, returned, " + ", ".join(AGGREGATE_COLUMNS) + " FROM users WHERE user = ?",
+                (user.lower() if user else ALL_USERS,)
+            ).fetchone()
+        bets, returned, games, wagered, wins, triples, *faces = row or (0, 0.0, 0, 0.0, 0, 0) + (0,) * len(FACES)
+        return {
+            'games': games,
+            'pending': bets - games,
+            'wins': wins,
+            'win_rate': round(wins / games, 4) if games else 0.0,
+            'wagered': round(wagered, 4),
+            'returned': round(returned, 4),
+            'profit': round(returned - wagered, 4),
+            'triples': triples,
+            'faces': {face: count for face, count in zip(FACES, faces) if count},
+            'last_block': self.last_block
+        }
+
+    def top_users(self, limit: int = 10) -> List[Dict]:
+        """Wallets with the most wagered, including unfulfilled bets"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT user, bets, wagered, returned, first_block, last_block FROM users "
+                "WHERE user != ? ORDER BY wagered DESC LIMIT ?",
+                (ALL_USERS, limit)
+            ).fetchall()
+        return [
+            {'user': user, 'bets': bets, 'wagered': round(wagered, 4), 'returned': round(returned, 4),
+             'first_block': first_block, 'last_block': last_block}
+            for user, bets, wagered, returned, first_block, last_block in rows
+        ]
+
+
+_indexer: Optional[GameIndexer] = None
+_indexer_lock = threading.Lock()
+
+
+def get_indexer() -> Optional[GameIndexer]:
+    """Process-wide indexer, started on first use; None unless INDEXER_DB is set"""
+    global _indexer
+    if not ContractConfig.INDEXER_DB:
+        return None
+    with _indexer_lock:
+        if _indexer is None:
+            _indexer = GameIndexer(ContractConfig.get_web3())
+            _indexer.start()
+        return _indexer
@@ -0,0 +1,204 @@
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from eth_utils import function_abi_to_4byte_selector, function_signature_to_4byte_selector
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # seconds
+
+_selector_names: Optional[Dict[str, str]] = None
+_install_lock = threading.Lock()  # Web3 instances are shared across bot threads
+
+
+def _function_names() -> Dict[str, str]:
+    # Built on first use; config imports this module so it can't be imported at the top
+    global _selector_names
+    if _selector_names is None:
+        from config import ContractConfig
+        names = {'0x' + function_signature_to_4byte_selector("aggregate3((address,bool,bytes)[])").hex(): 'aggregate3'}
+        for item in ContractConfig.DICE_GAME_ABI:
+            if item['type'] == 'function':
+                names['0x' + function_abi_to_4byte_selector(item).hex()] = item['name']
+        _selector_names = names
+    return _selector_names
+
+
+def call_label(method: str, params) -> str:
+    """Contract function name for an eth_call/eth_estimateGas, empty for other methods"""
+    if method not in ('eth_call', 'eth_estimateGas') or not params or not isinstance(params[0], dict):
+        return ''
+    data = params[0].get('data') or params[0].get('input') or ''
+    if not isinstance(data, str):
+        data = '0x' + bytes(data).hex()
+    selector = data[:10].lower()
+    return _function_names().get(selector, selector)
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Histogram:
+    """Fixed-bucket latency histogram in Prometheus layout"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(le, cumulative count) pairs including +Inf"""
+        total = 0
+        pairs = []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            pairs.append((repr(bound), total))
+        pairs.append(('+Inf', self.count))
+        return pairs
+
+
+class RpcMetrics:
+    """Per-method JSON-RPC counters and latency histograms
+
+    Calls are keyed by (method, function), where function is the contract
+    function for eth_call and empty otherwise. Calls sent inside a batch are
+    counted individually and each is charged the batch's latency.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: Dict[Tuple[str, str], int] = {}
+        self.errors: Dict[Tuple[str, str], int] = {}
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.batches = 0
+
+    def observe(self, method: str, params, latency: float, error: bool = False):
+        key = (method, call_label(method, params))
+        with self._lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+            if error:
+                self.errors[key] = self.errors.get(key, 0) + 1
+            if key not in self.latency:
+                self.latency[key] = Histogram()
+            self.latency[key].observe(latency)
+
+    def observe_batch(self, calls: List[Tuple[str, list]], latency: float, results: Optional[list] = None):
+        """Record a JSON-RPC batch; results of None (or no results at all) count as errors"""
+        with self._lock:
+            self.batches += 1
+        for i, (method, params) in enumerate(calls):
+            self.observe(method, params, latency, error=results is None or results[i] is None)
+
+    def reset(self):
+        with self._lock:
+            self.requests.clear()
+            self.errors.clear()
+            self.latency.clear()
+            self.batches = 0
+
+    def as_dict(self) -> Dict:
+        """Counts, errors and mean latency per method, for JSON views"""
+        with self._lock:
+            return {
+                (f"{method}:{function}" if function else method): {
+                    'requests': count,
+                    'errors': self.errors.get((method, function), 0),
+                    'mean_latency_ms': round(self.latency[(method, function)].sum / count * 1000, 1)
+                }
+                for (method, function), count in sorted(self.requests.items())
+            }
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition of every metric"""
+        with self._lock:
+            keys = sorted(self.requests)
+            lines = [
+                "# HELP apeswin_rpc_requests_total JSON-RPC calls sent, by method and contract function",
+                "# TYPE apeswin_rpc_requests_total counter"
+            ]
+            lines += [f"apeswin_rpc_requests_total{_labels(key)} {self.requests[key]}" for key in keys]
+            lines += [
+                "# HELP apeswin_rpc_errors_total JSON-RPC calls that raised or returned an error",
+                "# TYPE apeswin_rpc_errors_total counter"
+            ]
+            lines += [f"apeswin_rpc_errors_total{_labels(key)} {self.errors.get(key, 0)}" for key in keys]
+            lines += [
+                "# HELP apeswin_rpc_latency_seconds JSON-RPC round trip time",
+                "# TYPE apeswin_rpc_latency_seconds histogram"
+            ]
+            for key in keys:
+                histogram = self.latency[key]
+                for le, count in histogram.cumulative():
+                    lines.append(f"apeswin_rpc_latency_seconds_bucket{_labels(key, le=le)} {count}")
+                lines.append(f"apeswin_rpc_latency_seconds_sum{_labels(key)} {histogram.sum:.6f}")
+                lines.append(f"apeswin_rpc_latency_seconds_count{_labels(key)} {histogram.count}")
+            lines += [
+                "# HELP apeswin_rpc_batches_total JSON-RPC batch requests sent",
+                "# TYPE apeswin_rpc_batches_total counter",
+                f"apeswin_rpc_batches_total {self.batches}"
+            ]
+        return "\n".join(lines) + "\n"
+
+
+def _labels(key: Tuple[str, str], **extra) -> str:
+    method, function = key
+    labels = [f'method="{method}"', f'function="{function}"']
+    labels += [f'{name}="{value}"' for name, value in extra.items()]
+    return "{" + ",".join(labels) + "}"
+
+
+# Shared by every Web3 instance in the process
+rpc_metrics = RpcMetrics()
+
+
+def metrics_middleware(make_request, web3):
+    """web3 middleware recording every request in rpc_metrics"""
+    def middleware(method, params):
+        start = time.perf_counter()
+        try:
+            response = make_request(method, params)
+        except Exception:
+            rpc_metrics.observe(method, params, time.perf_counter() - start, error=True)
+            raise
+        rpc_metrics.observe(method, params, time.perf_counter() - start,
+                            error=isinstance(response, dict) and 'error' in response)
+        return response
+    return middleware
+
+
+async def async_metrics_middleware(make_request, web3):
+    """AsyncWeb3 counterpart of metrics_middleware"""
+    async def middleware(method, params):
+        start = time.perf_counter()
+        try:
+            response = await make_request(method, params)
+        except Exception:
+            rpc_metrics.observe(method, params, time.perf_counter() - start, error=True)
+            raise
+        rpc_metrics.observe(method, params, time.perf_counter() - start,
+                            error=isinstance(response, dict) and 'error' in response)
+        return response
+    return middleware
+
+
+def install(web3, async_web3: bool = False):
+    """Add the metrics middleware to a Web3 instance once, as its innermost layer"""
+    middleware = async_metrics_middleware if async_web3 else metrics_middleware
+    with _install_lock:
+        if 'metrics' not in web3.middleware_onion:
+            web3.middleware_onion.inject(middleware, name='metrics', layer=0)
+    return web3
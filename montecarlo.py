@@ -0,0 +1,215 @@
+import argparse
+import json
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from config import ContractConfig
+from dice import OUTCOME_IS_69, OUTCOME_MULTIPLIERS, OUTCOMES
+from strategy import DEFAULT_SETTINGS, bonus_tables
+
+TOKEN = 10 ** 18
+DRAWDOWN_BUCKETS = np.linspace(0.0, 1.0, 11)  # 10% wide drawdown histogram buckets
+
+
+def _percentiles(values: np.ndarray, scale: float = 1.0) -> Dict[str, float]:
+    p5, p50, p95, p99 = np.percentile(values, [5, 50, 95, 99]) / scale
+    return {'mean': float(values.mean() / scale), 'p5': float(p5), 'p50': float(p50),
+            'p95': float(p95), 'p99': float(p99)}
+
+
+def _simulate_chunk(settings: Dict, sessions: int, games: int, start_balance: float,
+                    ruin_balance: float, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    """Play `games` rounds for `sessions` independent bots at once
+
+    strategy.decide and strategy.settle vectorized across sessions, with
+    balances as float64 wei and int() as floor.
+    """
+    min_pct = settings['min_bet_percentage']
+    max_pct = settings['max_bet_percentage']
+    win_sensitivity = settings['win_sensitivity']
+    loss_sensitivity = settings['loss_sensitivity']
+    track = max(1, int(settings['max_track_games']))
+    min_bet = float(ContractConfig.MIN_BET_AMOUNT)
+
+    balance = np.full(sessions, float(start_balance))
+    base_bet = np.maximum(min_bet, np.floor(balance * min_pct))
+    win_streak = np.zeros(sessions, dtype=np.int64)
+    loss_streak = np.zeros(sessions, dtype=np.int64)
+    games_since_69 = np.zeros(sessions, dtype=np.int64)
+    peak = balance.copy()
+    max_drawdown = np.zeros(sessions)
+    ruined = np.zeros(sessions, dtype=bool)
+    played = np.zeros(sessions, dtype=np.int64)
+    wagered = np.zeros(sessions)
+
+    # Last `track` win and loss ratios per session, as ring buffers with running sums
+    win_ratios = np.zeros((sessions, track))
+    loss_ratios = np.zeros((sessions, track))
+    win_count = np.zeros(sessions, dtype=np.int64)
+    loss_count = np.zeros(sessions, dtype=np.int64)
+    win_pos = np.zeros(sessions, dtype=np.int64)
+    loss_pos = np.zeros(sessions, dtype=np.int64)
+    win_sum = np.zeros(sessions)
+    loss_sum = np.zeros(sessions)
+    avg_win = np.zeros(sessions)
+    avg_loss = np.zeros(sessions)
+    profit_factor = np.zeros(sessions)
+    rows = np.arange(sessions)
+
+    # Streaks and droughts never exceed the number of games, so the bonuses are lookups
+    win_bonus_table, recovery_table, chase_table = bonus_tables(settings, games)
+    rolls = rng.integers(0, len(OUTCOMES), (games, sessions), dtype=np.uint8)
+
+    for game in range(games):
+        # calculate_bet: bots below the safety threshold stop betting
+        active = balance >= ContractConfig.SAFETY_THRESHOLD
+        if not active.any():
+            break
+        base_bet = np.where(balance < base_bet,
+                            np.maximum(min_bet, np.floor(balance * ContractConfig.MAX_BET_PERCENTAGE)),
+                            base_bet)
+        variable_bonus = np.where(
+            profit_factor > 1.0,
+            np.minimum(1.0 + (profit_factor - 1.0) * win_sensitivity, 1.5),
+            np.maximum(1.0 - (1.0 - profit_factor) * loss_sensitivity, 0.5)
+        )
+        variable_bonus = np.where((win_count > 2) & (loss_count > 2), variable_bonus, 1.0)
+        bet = np.floor(base_bet * win_bonus_table[win_streak] * recovery_table[loss_streak]
+                       * chase_table[games_since_69] * variable_bonus)
+        bet = np.minimum(bet, np.floor(balance * max_pct))
+
+        # The contract takes bet // 3 on each die and pays by roll
+        stake = np.floor(bet / 3) * 3
+        outcome = rolls[game]
+        balance_change = np.floor(stake * OUTCOME_MULTIPLIERS[outcome]) - stake
+
+        # record_result
+        won = balance_change > 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.abs(balance_change) / bet
+        add_win = active & won
+        add_loss = active & ~won
+        win_sum += np.where(add_win, ratio - np.where(win_count == track, win_ratios[rows, win_pos], 0.0), 0.0)
+        win_ratios[rows[add_win], win_pos[add_win]] = ratio[add_win]
+        win_pos = np.where(add_win, (win_pos + 1) % track, win_pos)
+        win_count = np.where(add_win, np.minimum(win_count + 1, track), win_count)
+        loss_sum += np.where(add_loss, ratio - np.where(loss_count == track, loss_ratios[rows, loss_pos], 0.0), 0.0)
+        loss_ratios[rows[add_loss], loss_pos[add_loss]] = ratio[add_loss]
+        loss_pos = np.where(add_loss, (loss_pos + 1) % track, loss_pos)
+        loss_count = np.where(add_loss, np.minimum(loss_count + 1, track), loss_count)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            avg_win = np.where(add_win, win_sum / win_count, avg_win)
+            avg_loss = np.where(add_loss, loss_sum / loss_count, avg_loss)
+            profit_factor = np.where(active,
+                                     np.where((avg_loss > 0) & (avg_win > 0), avg_win / avg_loss, 1.0),
+                                     profit_factor)
+
+        games_since_69 = np.where(active, np.where(OUTCOME_IS_69[outcome], 0, games_since_69 + 1), games_since_69)
+        win_streak = np.where(add_win, win_streak + 1, np.where(add_loss, 0, win_streak))
+        loss_streak = np.where(add_loss, loss_streak + 1, np.where(add_win, 0, loss_streak))
+
+        new_balance = balance + balance_change
+        bet_percentage = np.minimum(min_pct * chase_table[games_since_69], max_pct)
+        base_bet = np.where(active, np.maximum(min_bet, np.floor(new_balance * bet_percentage)), base_bet)
+        balance = np.where(active, new_balance, balance)
+
+        played += active
+        wagered += np.where(active, stake, 0.0)
+        peak = np.maximum(peak, balance)
+        max_drawdown = np.maximum(max_drawdown, (peak - balance) / peak)
+        ruined |= balance < ruin_balance
+
+    return {
+        'balance': balance,
+        'max_drawdown': max_drawdown,
+        'ruined': ruined,
+        'stopped': balance < ContractConfig.SAFETY_THRESHOLD,
+        'played': played,
+        'wagered': wagered
+    }
+
+
+def simulate(settings: Optional[Dict] = None, sessions: int = 100000, games: int = 500,
+             start_balance: float = 100.0, ruin_fraction: float = 0.1, seed: Optional[int] = None,
+             chunk_size: int = 100000) -> Dict:
+    """Monte Carlo estimate of how a bot with `settings` fares over a session
+
+    Args:
+        settings: ApesWinBot tunables; missing keys take the bot's defaults
+        sessions: Independent sessions to simulate
+        games: Maximum bets per session
+        start_balance: Starting balance in tokens
+        ruin_fraction: A session is ruined once its balance falls below this fraction of the start
+        seed: Seed for reproducible runs
+        chunk_size: Sessions simulated together, bounds memory use
+
+    Returns:
+        Dict: Risk of ruin, profit and drawdown distributions, in tokens
+    """
+    settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+    rng = np.random.default_rng(seed)
+    start_wei = start_balance * TOKEN
+    started = time.time()
+
+    chunks = []
+    remaining = sessions
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        chunks.append(_simulate_chunk(settings, size, games, start_wei, start_wei * ruin_fraction, rng))
+        remaining -= size
+    results = {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
+
+    profit = results['balance'] - start_wei
+    drawdown_counts, _ = np.histogram(results['max_drawdown'], bins=DRAWDOWN_BUCKETS)
+    return {
+        'settings': settings,
+        'sessions': sessions,
+        'games': games,
+        'start_balance': start_balance,
+        'risk_of_ruin': float(results['ruined'].mean()),
+        'stopped': float(results['stopped'].mean()),
+        'prob_profit': float((profit > 0).mean()),
+        'expected_profit': float(profit.mean() / TOKEN),
+        'profit': _percentiles(profit, TOKEN),
+        'max_drawdown': _percentiles(results['max_drawdown']),
+        'drawdown_histogram': {
+            f"{low:.0%}-{high:.0%}": int(count)
+            for low, high, count in zip(DRAWDOWN_BUCKETS[:-1], DRAWDOWN_BUCKETS[1:], drawdown_counts)
+        },
+        'mean_games': float(results['played'].mean()),
+        'mean_wagered': float(results['wagered'].mean() / TOKEN),
+        'elapsed': round(time.time() - started, 3)
+    }
+
+
+def parse_settings(pairs) -> Dict:
+    """name=value pairs from the command line into a settings dict"""
+    settings = {}
+    for pair in pairs or []:
+        name, value = pair.split('=', 1)
+        if name not in DEFAULT_SETTINGS:
+            raise ValueError(f"Unknown setting {name}, expected one of {', '.join(DEFAULT_SETTINGS)}")
+        settings[name] = type(DEFAULT_SETTINGS[name])(value)
+    return settings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo risk estimate for ApesWinBot settings")
+    parser.add_argument('--sessions', type=int, default=100000)
+    parser.add_argument('--games', type=int, default=500, help="bets per session")
+    parser.add_argument('--balance', type=float, default=100.0, help="starting balance in tokens")
+    parser.add_argument('--ruin', type=float, default=0.1, help="ruin level as a fraction of the start")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--set', dest='settings', action='append', metavar='NAME=VALUE',
+                        help="override a bot setting, may be repeated")
+    args = parser.parse_args()
+
+    report = simulate(parse_settings(args.settings), sessions=args.sessions, games=args.games,
+                      start_balance=args.balance, ruin_fraction=args.ruin, seed=args.seed)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from eth_abi import decode, encode
+from eth_utils import function_signature_to_4byte_selector
+
+from config import ContractConfig
+from rpc import decode_call_result
+
+AGGREGATE3_SELECTOR = function_signature_to_4byte_selector("aggregate3((address,bool,bytes)[])")
+ACTIVE_CALLER_SECONDS = 10  # a caller counts as active for this long after its last read
+
+
+def encode_aggregate3(calls: List[Tuple[str, bytes]]) -> bytes:
+    """Encode aggregate3 calldata for (target, calldata) pairs, allowing individual failures"""
+    return AGGREGATE3_SELECTOR + encode(
+        ['(address,bool,bytes)[]'],
+        [[(target, True, calldata) for target, calldata in calls]]
+    )
+
+
+def decode_aggregate3(raw: bytes) -> List[Tuple[bool, bytes]]:
+    """Decode aggregate3 return data into (success, returnData) pairs"""
+    return list(decode(['(bool,bytes)[]'], raw)[0])
+
+
+class MulticallAggregator:
+    """Collects eth_calls from many callers and sends them as one Multicall3 aggregate3
+
+    Callers block on call() while a background dispatcher waits `window`
+    seconds for other wallets to queue their reads, then fans the decoded
+    results back out through futures. The wait is skipped while only one
+    caller has been reading, so a single wallet never pays for it.
+    """
+
+    def __init__(self, web3, window: float = None, max_batch: int = None):
+        self.web3 = web3
+        self.window = ContractConfig.MULTICALL_WINDOW if window is None else window
+        self.max_batch = max_batch or ContractConfig.MULTICALL_MAX_BATCH
+        self.address = ContractConfig.MULTICALL3_ADDRESS
+        self._pending = []  # (contract_function, calldata, future)
+        self._callers: Dict[Hashable, float] = {}  # caller -> time of its last read
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self._thread.start()
+
+    def submit(self, contract_function, caller: Optional[Hashable] = None) -> Future:
+        """Queue a bound contract function call and return a future for its decoded result
+
+        Args:
+            contract_function: Bound view call
+            caller: Who is reading, usually the wallet address; defaults to the calling thread
+        """
+        future = Future()
+        calldata = bytes.fromhex(contract_function._encode_transaction_data()[2:])
+        with self._condition:
+            self._callers[threading.get_ident() if caller is None else caller] = time.time()
+            self._pending.append((contract_function, calldata, future))
+            self._condition.notify()
+        return future
+
+    def call(self, contract_function, timeout: float = 30, caller: Optional[Hashable] = None) -> Any:
+        """Queue a call and wait for its decoded result"""
+        return self.submit(contract_function, caller).result(timeout=timeout)
+
+    def should_share(self, caller: Hashable) -> bool:
+        """Mark `caller` as reading and tell whether other callers are reading too
+
+        Callers with their own batched path use this to join the shared
+        aggregate3 only when it actually saves requests.
+        """
+        with self._condition:
+            self._callers[caller] = time.time()
+            return self._others_active()
+
+    def _others_active(self) -> bool:
+        """Whether more than one caller has read recently; call with the condition held"""
+        cutoff = time.time() - ACTIVE_CALLER_SECONDS
+        for caller in [caller for caller, seen in self._callers.items() if seen < cutoff]:
+            del self._callers[caller]
+        return len(self._callers) > 1
+
+    def _dispatch_loop(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                shared = self._others_active()
+            # Give other wallets a chance to join this batch
+            if self.window > 0 and shared:
+                time.sleep(self.window)
+            with self._condition:
+                pending, self._pending = self._pending, []
+            for start in range(0, len(pending), self.max_batch):
+                self._flush(pending[start:start + self.max_batch])
+
+    def _flush(self, batch: list):
+        try:
+            raw = self.web3.eth.call({
+                'to': self.address,
+                'data': '0x' + encode_aggregate3(
+                    [(fn.address, calldata) for fn, calldata, _ in batch]
+                ).hex()
+            })
+            results = decode_aggregate3(bytes(raw))
+        except Exception as e:
+            logging.warning(f"Multicall aggregate3 of {len(batch)} calls failed: {e}")
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (fn, _, future), (success, return_data) in zip(batch, results):
+            if not success:
+                future.set_exception(ValueError(f"{fn.fn_name} reverted inside multicall"))
+                continue
+            try:
+                future.set_result(decode_call_result(fn, return_data))
+            except Exception as e:
+                future.set_exception(e)
+        # A short answer must not leave callers waiting for their timeout
+        for fn, _, future in batch[len(results):]:
+            future.set_exception(ValueError(f"aggregate3 returned {len(results)} results for {len(batch)} calls"))
+
+
+# One aggregator per RPC endpoint so every wallet in the process shares it
+_aggregators: Dict[str, MulticallAggregator] = {}
+_aggregators_lock = threading.Lock()
+
+
+def get_aggregator(web3) -> MulticallAggregator:
+    """Get the process-wide aggregator for web3's endpoint"""
+    key = web3.provider.endpoint_uri
+    with _aggregators_lock:
+        if key not in _aggregators:
+            _aggregators[key] = MulticallAggregator(web3)
+        return _aggregators[key]
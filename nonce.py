@@ -0,0 +1,71 @@
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+
+class NonceManager:
+    """Hands out transaction nonces for one account without asking the node each time
+
+    The first call syncs from the pending transaction count. After that
+    nonces are allocated locally, so several transactions can be in flight
+    at once. Call resync() whenever a send fails or a transaction is
+    dropped so the next allocation starts from the chain's view again.
+    """
+
+    def __init__(self, web3, address: str):
+        self.web3 = web3
+        self.address = address
+        self._next_nonce: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _fetch(self) -> int:
+        return self.web3.eth.get_transaction_count(self.address, 'pending')
+
+    def next_nonce(self) -> int:
+        """Allocate the next nonce"""
+        with self._lock:
+            if self._next_nonce is None:
+                self._next_nonce = self._fetch()
+            nonce = self._next_nonce
+            self._next_nonce += 1
+            return nonce
+
+    async def next_nonce_async(self, async_web3) -> int:
+        """next_nonce() for AsyncWeb3 callers; syncs without blocking the event loop"""
+        while True:
+            with self._lock:
+                if self._next_nonce is not None:
+                    nonce = self._next_nonce
+                    self._next_nonce += 1
+                    return nonce
+            self.observe(await async_web3.eth.get_transaction_count(self.address, 'pending'))
+
+    def observe(self, chain_nonce: int):
+        """Catch up with a nonce seen on chain, e.g. from a batched snapshot
+
+        Transactions sent from elsewhere push the chain ahead of us; we never
+        move backwards here because our own transactions may still be pending.
+        """
+        with self._lock:
+            if self._next_nonce is None or chain_nonce > self._next_nonce:
+                self._next_nonce = chain_nonce
+
+    def resync(self, chain_nonce: Optional[int] = None):
+        """Forget the local counter after a failed or dropped transaction"""
+        with self._lock:
+            logging.info(f"Resyncing nonce for {self.address}")
+            self._next_nonce = chain_nonce
+
+
+# One manager per (endpoint, account) so every ContractManager for a wallet agrees
+_managers: Dict[Tuple[str, str], NonceManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_nonce_manager(web3, address: str) -> NonceManager:
+    """Get the shared nonce manager for an account"""
+    key = (web3.provider.endpoint_uri, address.lower())
+    with _managers_lock:
+        if key not in _managers:
+            _managers[key] = NonceManager(web3, address)
+        return _managers[key]
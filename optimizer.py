@@ -0,0 +1,228 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from montecarlo import parse_settings, simulate
+from strategy import DEFAULT_SETTINGS
+
+# Range searched for each tunable; the percentage bounds match /api/save_settings validation
+SEARCH_SPACE = {
+    'min_bet_percentage': (0.01, 0.20),
+    'max_bet_percentage': (0.02, 0.50),
+    'win_streak_rate': (0.0, 0.5),
+    'loss_recovery_rate': (0.0, 0.5),
+    'chase_69_threshold': (5, 40),
+    'chase_69_multiplier': (1.0, 1.5),
+    'win_sensitivity': (0.0, 1.0),
+    'loss_sensitivity': (0.0, 1.0),
+    'max_track_games': (5, 50)
+}
+
+OBJECTIVES = {
+    'median_profit': lambda report: report['profit']['p50'],
+    'expected_profit': lambda report: report['expected_profit'],
+    'prob_profit': lambda report: report['prob_profit']
+}
+
+
+def _evaluate(settings: Dict, options: Dict) -> Dict:
+    # Runs in a worker process; every candidate gets the same seed so they face the same dice
+    report = simulate(settings, **options)
+    return {
+        'settings': settings,
+        'risk_of_ruin': report['risk_of_ruin'],
+        'expected_profit': round(report['expected_profit'], 4),
+        'median_profit': round(report['profit']['p50'], 4),
+        'prob_profit': report['prob_profit'],
+        'drawdown_p50': round(report['max_drawdown']['p50'], 4),
+        'drawdown_p95': round(report['max_drawdown']['p95'], 4),
+        'report': report
+    }
+
+
+class Optimizer:
+    """Searches bot settings with Monte Carlo evaluations in a process pool
+
+    Args:
+        params: Settings to vary; the rest stay at `base_settings`
+        objective: Key of OBJECTIVES to maximise
+        max_ruin: Candidates with a higher risk of ruin rank below every one that meets it
+        base_settings: Values for settings that are not searched
+        workers: Worker processes, default one per core
+        on_progress: Called with (evaluated, total) as results come in
+        **simulation: Passed to montecarlo.simulate (sessions, games, start_balance, ...)
+    """
+
+    def __init__(self, params: Optional[List[str]] = None, objective: str = 'median_profit',
+                 max_ruin: float = 0.05, base_settings: Optional[Dict] = None, workers: Optional[int] = None,
+                 on_progress: Optional[Callable[[int, int], None]] = None, **simulation):
+        self.params = list(params or SEARCH_SPACE)
+        unknown = [name for name in self.params if name not in SEARCH_SPACE]
+        if unknown:
+            raise ValueError(f"Unknown settings: {', '.join(unknown)}")
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unknown objective {objective}, expected one of {', '.join(OBJECTIVES)}")
+        self.objective = objective
+        self.max_ruin = max_ruin
+        self.base_settings = dict(DEFAULT_SETTINGS, **(base_settings or {}))
+        self.workers = workers or os.cpu_count()
+        self.on_progress = on_progress
+        self.simulation = dict({'sessions': 20000, 'games': 500, 'seed': 0}, **simulation)
+
+    def candidate(self, values: Dict) -> Optional[Dict]:
+        """Full settings for searched values, or None if the dashboard would reject them"""
+        settings = dict(self.base_settings)
+        for name, value in values.items():
+            low, high = SEARCH_SPACE[name]
+            value = min(max(value, low), high)
+            settings[name] = int(round(value)) if isinstance(DEFAULT_SETTINGS[name], int) else round(float(value), 4)
+        if settings['min_bet_percentage'] >= settings['max_bet_percentage']:
+            return None
+        return settings
+
+    def grid(self, points: int = 3) -> List[Dict]:
+        """Evaluate every combination of `points` evenly spaced values per searched setting"""
+        axes = [np.linspace(*SEARCH_SPACE[name], points) for name in self.params]
+        candidates = [self.candidate(dict(zip(self.params, values))) for values in itertools.product(*axes)]
+        return self.evaluate(candidates)
+
+    def random(self, samples: int = 200, seed: Optional[int] = None) -> List[Dict]:
+        """Evaluate settings drawn uniformly from the search space"""
+        rng = np.random.default_rng(seed)
+        candidates = [
+            self.candidate({name: rng.uniform(*SEARCH_SPACE[name]) for name in self.params})
+            for _ in range(samples)
+        ]
+        return self.evaluate(candidates)
+
+    def cross_entropy(self, iterations: int = 5, population: int = 100, elite: float = 0.2,
+                      seed: Optional[int] = None) -> List[Dict]:
+        """Sample, keep the best `elite` fraction and refit a normal per setting around them
+
+        Returns every evaluated candidate across all iterations, ranked.
+        """
+        rng = np.random.default_rng(seed)
+        mean = {name: sum(SEARCH_SPACE[name]) / 2 for name in self.params}
+        std = {name: (SEARCH_SPACE[name][1] - SEARCH_SPACE[name][0]) / 2 for name in self.params}
+        results = []
+        with self._pool() as pool:
+            for _ in range(iterations):
+                candidates = [
+                    self.candidate({name: rng.normal(mean[name], std[name]) for name in self.params})
+                    for _ in range(population)
+                ]
+                results = self.rank(results + self.evaluate(candidates, pool))
+                best = results[:max(2, int(len(results) * elite))]
+                for name in self.params:
+                    values = np.array([row['settings'][name] for row in best], dtype=float)
+                    low, high = SEARCH_SPACE[name]
+                    mean[name] = float(values.mean())
+                    std[name] = max(float(values.std()), (high - low) * 0.01)
+        return results
+
+    def _pool(self) -> ProcessPoolExecutor:
+        # spawn: the dashboard calls this from a thread, and forking a threaded process is unsafe
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def evaluate(self, candidates: List[Optional[Dict]], pool: Optional[ProcessPoolExecutor] = None) -> List[Dict]:
+        """Simulate each distinct valid candidate in the pool and rank the results"""
+        if pool is None:
+            with self._pool() as pool:
+                return self.evaluate(candidates, pool)
+        unique = {}
+        for settings in candidates:
+            if settings is not None:
+                unique[json.dumps(settings, sort_keys=True)] = settings
+        total = len(unique)
+        rows = []
+        futures = [pool.submit(_evaluate, settings, self.simulation) for settings in unique.values()]
+        for future in as_completed(futures):
+            rows.append(future.result())
+            if self.on_progress:
+                self.on_progress(len(rows), total)
+        return self.rank(rows)
+
+    def rank(self, rows: List[Dict]) -> List[Dict]:
+        """Best first: candidates within max_ruin by objective, then the rest by objective"""
+        for row in rows:
+            row['score'] = round(OBJECTIVES[self.objective](row['report']), 4)
+        return sorted(rows, key=lambda row: (row['risk_of_ruin'] <= self.max_ruin, row['score']), reverse=True)
+
+
+def format_table(rows: List[Dict], params: List[str], limit: int = 20) -> str:
+    """Ranked results as an aligned text table"""
+    columns = ['#', 'score', 'ruin', 'E[profit]', 'median', 'P(profit)', 'dd p95'] + params
+    lines = []
+    for rank, row in enumerate(rows[:limit], 1):
+        lines.append([str(rank), f"{row['score']:.4f}", f"{row['risk_of_ruin']:.2%}", f"{row['expected_profit']:.2f}",
+                      f"{row['median_profit']:.2f}", f"{row['prob_profit']:.2%}", f"{row['drawdown_p95']:.1%}"]
+                     + [str(row['settings'][name]) for name in params])
+    widths = [max(len(column), *(len(line[i]) for line in lines)) for i, column in enumerate(columns)]
+    header = "  ".join(column.rjust(width) for column, width in zip(columns, widths))
+    body = ["  ".join(cell.rjust(width) for cell, width in zip(line, widths)) for line in lines]
+    return "\n".join([header, "-" * len(header)] + body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search ApesWinBot settings with Monte Carlo simulation")
+    parser.add_argument('--method', choices=['grid', 'random', 'cem'], default='random')
+    parser.add_argument('--params', default=None, help="comma separated settings to search (default: all)")
+    parser.add_argument('--points', type=int, default=3, help="grid points per setting")
+    parser.add_argument('--samples', type=int, default=200, help="random samples, or population per CEM iteration")
+    parser.add_argument('--iterations', type=int, default=5, help="CEM iterations")
+    parser.add_argument('--objective', choices=list(OBJECTIVES), default='median_profit')
+    parser.add_argument('--max-ruin', type=float, default=0.05)
+    parser.add_argument('--sessions', type=int, default=20000, help="Monte Carlo sessions per candidate")
+    parser.add_argument('--games', type=int, default=500)
+    parser.add_argument('--balance', type=float, default=100.0, help="starting balance in tokens")
+    parser.add_argument('--ruin', type=float, default=0.1, help="ruin level as a fraction of the start")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--set', dest='settings', action='append', metavar='NAME=VALUE',
+                        help="fix a setting that is not searched, may be repeated")
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--output', default=None, help="write every result as JSON")
+    args = parser.parse_args()
+
+    def progress(done, total):
+        print(f"\r   {done}/{total} candidates", end="", flush=True)
+
+    optimizer = Optimizer(
+        params=args.params.split(',') if args.params else None,
+        objective=args.objective,
+        max_ruin=args.max_ruin,
+        base_settings=parse_settings(args.settings),
+        workers=args.workers,
+        on_progress=progress,
+        sessions=args.sessions,
+        games=args.games,
+        start_balance=args.balance,
+        ruin_fraction=args.ruin,
+        seed=args.seed
+    )
+    started = time.time()
+    print(f"🔍 {args.method} search over {', '.join(optimizer.params)} with {optimizer.workers} workers")
+    if args.method == 'grid':
+        results = optimizer.grid(args.points)
+    elif args.method == 'random':
+        results = optimizer.random(args.samples, seed=args.seed)
+    else:
+        results = optimizer.cross_entropy(args.iterations, args.samples, seed=args.seed)
+    print(f"\n✅ {len(results)} candidates in {time.time() - started:.1f}s\n")
+    print(format_table(results, optimizer.params, args.top))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump([{key: value for key, value in row.items() if key != 'report'} for row in results], f, indent=2)
+        print(f"📄 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+import argparse
+import json
+import logging
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from config import ContractConfig
+from metrics import percentile
+from montecarlo import parse_settings
+from strategy import DEFAULT_SETTINGS
+
+logger = logging.getLogger('orchestrator')
+
+
+def load_wallets(path: str) -> List[Dict]:
+    """Wallets to run, from a JSON list or a text file
+
+    JSON entries are {"private_key": ..., "label": ..., "settings": {...},
+    "pipeline_depth": ...}; only private_key is required. Text files hold
+    one private key per line, optionally followed by NAME=VALUE settings;
+    blank lines and lines starting with # are skipped.
+    """
+    with open(path) as f:
+        if path.endswith('.json'):
+            wallets = json.load(f)
+        else:
+            wallets = []
+            for line in f:
+                fields = line.split()
+                if fields and not fields[0].startswith('#'):
+                    wallets.append({'private_key': fields[0], 'settings': parse_settings(fields[1:])})
+    for wallet in wallets:
+        if not wallet.get('private_key'):
+            raise ValueError(f"Wallet entry without a private_key in {path}")
+    return wallets
+
+
+class WalletRunner:
+    """One wallet's bot and its place in the schedule"""
+
+    def __init__(self, bot, label: str):
+        self.bot = bot
+        self.label = label
+        self.next_run = 0.0
+        self.busy = False
+        self.bets = 0
+        self.failed = 0
+        self.consecutive_failures = 0
+        self.last_result: Optional[Dict] = None
+
+    def summary(self) -> Dict:
+        return {
+            'wallet': self.label,
+            'bets': self.bets,
+            'failed_cycles': self.failed,
+            'session': self.bot.session_stats.snapshot()
+        }
+
+
+class Orchestrator:
+    """Runs many wallets' bet cycles on one shared thread pool
+
+    Each wallet keeps its own ApesWinBot, so strategy state, nonces and
+    stats never mix; the RPC connection pool, fee oracle and signing pool
+    are process-wide and shared. A scheduler thread hands due wallets to
+    the pool, never more than `max_concurrent` cycles at once, and a
+    wallet is never in two cycles at the same time.
+
+    Args:
+        max_concurrent: Bet cycles in flight across all wallets
+        stagger: Seconds between wallet start times, spreads the first wave of RPC calls
+        delay: Seconds a wallet waits between bets
+        report_interval: Seconds between throughput log lines, 0 to disable
+    """
+
+    def __init__(self, max_concurrent: int = None, stagger: float = None, delay: float = None,
+                 report_interval: float = 60):
+        self.max_concurrent = max_concurrent or ContractConfig.ORCHESTRATOR_MAX_CONCURRENT
+        self.stagger = ContractConfig.ORCHESTRATOR_STAGGER if stagger is None else stagger
+        self.delay = ContractConfig.ORCHESTRATOR_DELAY if delay is None else delay
+        self.report_interval = report_interval
+        self.runners: List[WalletRunner] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._scheduler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._in_flight = 0
+        self._started: Optional[float] = None
+        self._bet_times: deque = deque()  # Completion times of bets in the last minute
+        self._latencies: deque = deque(maxlen=1000)
+
+    def add_wallet(self, private_key: str, label: Optional[str] = None, settings: Optional[Dict] = None,
+                   pipeline_depth: int = 1) -> WalletRunner:
+        """Create an isolated bot for a wallet and schedule it after the ones already added"""
+        from bot import ApesWinBot
+        unknown = [name for name in settings or {} if name not in DEFAULT_SETTINGS]
+        if unknown:
+            raise ValueError(f"Unknown settings: {', '.join(unknown)}")
+        if not 1 <= pipeline_depth <= ContractConfig.PIPELINE_MAX_DEPTH:
+            raise ValueError(f"pipeline_depth must be between 1 and {ContractConfig.PIPELINE_MAX_DEPTH}")
+        bot = ApesWinBot(private_key)
+        for name, value in (settings or {}).items():
+            setattr(bot, name, type(DEFAULT_SETTINGS[name])(value))
+        bot.pipeline_depth = pipeline_depth
+        bot._should_stop = False
+        runner = WalletRunner(bot, label or bot.contract_manager.account.address)
+        with self._lock:
+            self.runners.append(runner)
+        return runner
+
+    def start(self):
+        """Start scheduling; returns immediately"""
+        self._started = time.time()
+        for index, runner in enumerate(self.runners):
+            runner.next_run = self._started + index * self.stagger
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix='wallet')
+        self._scheduler = threading.Thread(target=self._schedule, daemon=True)
+        self._scheduler.start()
+        logger.info(f"🚀 Orchestrating {len(self.runners)} wallets, up to {self.max_concurrent} cycles at once")
+
+    def stop(self, timeout: float = 90):
+        """Stop scheduling, signal every bot and wait for cycles in flight"""
+        self._stop.set()
+        for runner in self.runners:
+            runner.bot._should_stop = True
+        with self._wake:
+            self._wake.notify_all()
+        if self._scheduler is not None:
+            self._scheduler.join(timeout=timeout)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        for runner in self.runners:
+            runner.bot.shutdown()
+        logger.info(f"⛔️ Orchestrator stopped: {json.dumps(self.stats(per_wallet=False))}")
+
+    def run(self, duration: Optional[float] = None):
+        """Start, block until `duration` seconds pass or stop() is called, then stop"""
+        self.start()
+        try:
+            self._stop.wait(duration)
+        finally:
+            self.stop()
+
+    def _schedule(self):
+        last_report = time.time()
+        while not self._stop.is_set():
+            now = time.time()
+            with self._wake:
+                due = sorted((runner for runner in self.runners if not runner.busy and runner.next_run <= now),
+                             key=lambda runner: runner.next_run)
+                for runner in due[:self.max_concurrent - self._in_flight]:
+                    runner.busy = True
+                    self._in_flight += 1
+                    self._executor.submit(self._cycle, runner)
+                # Sleep until the next wallet is due or a cycle frees a slot
+                idle = [runner.next_run for runner in self.runners if not runner.busy]
+                wait = min(idle) - now if idle and self._in_flight < self.max_concurrent else 1.0
+                self._wake.wait(min(max(wait, 0.01), 1.0))
+            if self.report_interval and time.time() - last_report >= self.report_interval:
+                last_report = time.time()
+                stats = self.stats(per_wallet=False)
+                logger.info(f"📊 {stats['bets_per_minute']:.1f} bets/min over the last minute, "
+                            f"{stats['bets']} bets total, {stats['in_flight']} cycles in flight, "
+                            f"{stats['failed_cycles']} failed, p50 cycle {stats['cycle_p50'] or 0:.2f}s")
+
+    def _cycle(self, runner: WalletRunner):
+        started = time.time()
+        result = None
+        try:
+            result = runner.bot.play_dice_game()
+        except Exception as e:
+            logger.error(f"❌ {runner.label}: {e}")
+        finished = time.time()
+        with self._wake:
+            runner.busy = False
+            self._in_flight -= 1
+            if result:
+                runner.bets += 1
+                runner.consecutive_failures = 0
+                runner.last_result = result
+                runner.next_run = finished + self.delay
+                self._bet_times.append(finished)
+                self._latencies.append(finished - started)
+            else:
+                # Failed cycles, low balances and RPC trouble back off per wallet
+                runner.failed += 1
+                runner.consecutive_failures += 1
+                backoff = self.delay * 2 ** min(runner.consecutive_failures, 10)
+                runner.next_run = finished + min(backoff, ContractConfig.ORCHESTRATOR_MAX_BACKOFF)
+            self._wake.notify_all()
+
+    def stats(self, per_wallet: bool = True) -> Dict:
+        """Aggregate throughput, plus each wallet's counts and session stats"""
+        now = time.time()
+        with self._lock:
+            while self._bet_times and self._bet_times[0] < now - 60:
+                self._bet_times.popleft()
+            recent = len(self._bet_times)
+            latencies = sorted(self._latencies)
+            bets = sum(runner.bets for runner in self.runners)
+            elapsed = now - self._started if self._started else 0
+            stats = {
+                'wallets': len(self.runners),
+                'in_flight': self._in_flight,
+                'bets': bets,
+                'failed_cycles': sum(runner.failed for runner in self.runners),
+                'bets_per_minute': recent * 60 / min(max(elapsed, 1e-9), 60),
+                'bets_per_minute_overall': bets * 60 / elapsed if elapsed else 0.0,
+                'cycle_p50': percentile(latencies, 50),
+                'cycle_p95': percentile(latencies, 95),
+                'uptime': round(elapsed, 1)
+            }
+            if per_wallet:
+                stats['per_wallet'] = [runner.summary() for runner in self.runners]
+            return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many ApesWinBot wallets in one process")
+    parser.add_argument('wallets', help="JSON list or text file with one private key per line")
+    parser.add_argument('--max-concurrent', type=int, default=None, help="bet cycles in flight across wallets")
+    parser.add_argument('--stagger', type=float, default=None, help="seconds between wallet start times")
+    parser.add_argument('--delay', type=float, default=None, help="seconds each wallet waits between bets")
+    parser.add_argument('--duration', type=float, default=None, help="stop after this many seconds")
+    parser.add_argument('--report-interval', type=float, default=60)
+    parser.add_argument('--pipeline-depth', type=int, default=1, help="bets in flight per wallet")
+    parser.add_argument('--set', dest='settings', action='append', metavar='NAME=VALUE',
+                        help="strategy setting for every wallet, may be repeated")
+    parser.add_argument('--output', default=None, help="write final stats as JSON")
+    parser.add_argument('--verbose', action='store_true', help="keep every bot's INFO logging")
+    args = parser.parse_args()
+
+    import bot  # noqa: F401, installs the bot's log formatting
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    orchestrator = Orchestrator(args.max_concurrent, args.stagger, args.delay, args.report_interval)
+    shared_settings = parse_settings(args.settings)
+    for wallet in load_wallets(args.wallets):
+        orchestrator.add_wallet(
+            wallet['private_key'],
+            label=wallet.get('label'),
+            settings=dict(shared_settings, **wallet.get('settings', {})),
+            pipeline_depth=wallet.get('pipeline_depth', args.pipeline_depth)
+        )
+
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda sig, frame: stop.set())
+    signal.signal(signal.SIGTERM, lambda sig, frame: stop.set())
+    orchestrator.start()
+    try:
+        stop.wait(args.duration)
+    finally:
+        orchestrator.stop()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(orchestrator.stats(), f, indent=2)
+        print(f"📄 Stats written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
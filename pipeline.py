@@ -0,0 +1,93 @@
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+from tracing import BetTrace
+
+RESULT_TIMEOUT = 60  # seconds to wait for a round to be fulfilled
+
+
+class BetPipeline:
+    """Keeps up to `depth` bet transactions from one wallet in flight
+
+    Bets are broadcast immediately with locally allocated nonces; receipt
+    and fulfillment waits run in the background. The contract fulfills a
+    user's games in order, so results are handed back oldest first.
+    """
+
+    def __init__(self, contract_manager, depth: int,
+                 on_trace: Optional[Callable[[BetTrace], None]] = None):
+        self.contract_manager = contract_manager
+        self.depth = max(1, depth)
+        self.on_trace = on_trace  # called with each bet's trace once it settles
+        self._in_flight = deque()  # (future, initial_balance, bet_amount)
+        self._executor = ThreadPoolExecutor(max_workers=self.depth)
+
+    def __len__(self):
+        return len(self._in_flight)
+
+    def has_capacity(self) -> bool:
+        """Whether another bet can be submitted without exceeding depth"""
+        return len(self._in_flight) < self.depth
+
+    def submit(self, bet_amount: int, initial_balance: int, snapshot: Dict,
+               trace: Optional[BetTrace] = None) -> bool:
+        """Broadcast a bet and start waiting for its result in the background
+
+        Args:
+            bet_amount: Total amount to bet
+            initial_balance: Balance the bet was sized from
+            snapshot: Fresh result of ContractManager.snapshot()
+            trace: Trace to record phase timings in
+
+        Returns:
+            bool: True if the bet transaction was broadcast
+        """
+        trace = trace or BetTrace()
+        with trace.phase('preflight'):
+            if snapshot['banana_balance'] < bet_amount:
+                logging.error("Insufficient balance to add another bet to the pipeline")
+                return False
+            self.contract_manager.nonces.observe(snapshot['nonce'])
+
+        tx_hash = self.contract_manager.send_dice_bet(bet_amount, trace)
+        if tx_hash is None:
+            return False
+
+        future = self._executor.submit(self._settle, tx_hash, trace)
+        self._in_flight.append((future, initial_balance, bet_amount))
+        logging.info(f"📤 Bet submitted ({len(self._in_flight)}/{self.depth} in flight)")
+        return True
+
+    def _settle(self, tx_hash, trace: BetTrace) -> Tuple[Optional[int], Optional[Dict]]:
+        game_id = self.contract_manager.confirm_dice_bet(tx_hash, trace)
+        if game_id is None:
+            return None, None
+
+        with trace.phase('fulfillment'):
+            result = self.contract_manager.wait_for_game_round(game_id, timeout=RESULT_TIMEOUT)
+        if self.on_trace is not None:
+            self.on_trace(trace)
+        if result is not None:
+            return game_id, result
+
+        logging.warning(f"⚠️ Timed out waiting for game {game_id} after {RESULT_TIMEOUT} seconds")
+        return game_id, None
+
+    def next_result(self) -> Optional[Tuple[Optional[int], int, int, Optional[Dict]]]:
+        """Block until the oldest in-flight bet settles
+
+        Returns:
+            Optional[Tuple]: (game_id, initial_balance, bet_amount, result), or
+            None if nothing is in flight
+        """
+        if not self._in_flight:
+            return None
+        future, initial_balance, bet_amount = self._in_flight.popleft()
+        game_id, result = future.result()
+        return game_id, initial_balance, bet_amount, result
+
+    def shutdown(self):
+        """Stop accepting work; in-flight waits finish in the background"""
+        self._executor.shutdown(wait=False)
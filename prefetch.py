@@ -0,0 +1,112 @@
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+import strategy
+from config import ContractConfig
+from dice import is_69
+from strategy import BetDecision, StrategyState
+
+
+class NextBetPrefetch:
+    """Prepares the next bet while the current one waits for fulfillment
+
+    Once a bet is mined, start() reads the next preflight snapshot (balances,
+    nonce) and refreshes the fee sample in a background thread. When the
+    round settles, settle() adds the winnings to that snapshot and sizes the
+    next bet from the round's actual stake and payout, so the next bet needs
+    no RPC before it is sent. The winnings come from the round the
+    fulfillment watcher already cached.
+    """
+
+    def __init__(self, contract_manager):
+        self.contract_manager = contract_manager
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='prefetch')
+        self._future: Optional[Future] = None
+        self._state: Optional[StrategyState] = None
+        self._settings: Optional[Dict] = None
+        self._initial_balance: Optional[int] = None
+        self._bet: Optional[int] = None
+        self._ready: Optional[Dict] = None
+        self._plan: Optional[BetDecision] = None
+
+    def _fetch(self) -> Tuple[Dict, float]:
+        snapshot = self.contract_manager.snapshot()
+        self.contract_manager.fees.refresh()
+        return snapshot, time.time()
+
+    def start(self, settings: Dict, state: StrategyState, initial_balance: int, bet: int):
+        """Start preparing the next cycle for a mined bet
+
+        Args:
+            settings: Strategy settings the next bet will use
+            state: Strategy state before this bet settles
+            initial_balance: Balance the bet was sized from
+            bet: Bet amount as sized
+        """
+        self.clear()
+        self._settings = dict(settings)
+        self._state = state.fork()
+        self._initial_balance = initial_balance
+        self._bet = bet
+        self._future = self._executor.submit(self._fetch)
+
+    def settle(self, game_id: int):
+        """Apply a fulfilled round to the prefetched snapshot"""
+        future, self._future = self._future, None
+        if future is None:
+            return
+        round_info = self.contract_manager.get_game_round(game_id)
+        try:
+            snapshot, fetched_at = future.result(timeout=ContractConfig.RPC_TIMEOUT)
+        except Exception as e:
+            logging.warning(f"Next bet prefetch failed, falling back to a fresh snapshot: {e}")
+            return
+        if round_info is None or not round_info.get('fulfilled'):
+            return
+        if time.time() - fetched_at > ContractConfig.PREFETCH_MAX_AGE:
+            return
+        if snapshot['last_game_id'] != game_id:
+            # The snapshot doesn't reflect this bet, so its balance can't be trusted
+            return
+        # Winnings are paid at fulfillment; the snapshot already has them if the round beat it
+        winnings = 0 if snapshot['last_game_fulfilled'] else round_info['total_winnings']
+        self._ready = dict(
+            snapshot,
+            banana_balance=snapshot['banana_balance'] + winnings,
+            last_game_fulfilled=True,
+            last_round=None
+        )
+
+        # Plan only when the snapshot agrees with the round, as record_result will see it
+        balance_change = round_info['total_winnings'] - round_info['total_bet']
+        if self._ready['banana_balance'] != self._initial_balance + balance_change:
+            return
+        hit_69 = is_69(list(round_info['dice_results']))
+        next_state = strategy.settle(self._settings, self._state, self._initial_balance, self._bet,
+                                     balance_change, hit_69)
+        _, self._plan = strategy.decide(self._settings, next_state, self._ready['banana_balance'])
+
+    def take(self, settings: Dict) -> Tuple[Optional[Dict], Optional[BetDecision]]:
+        """Prefetched snapshot and planned bet for the next cycle, if still valid
+
+        The plan is dropped if the settings changed since it was made.
+        """
+        snapshot, plan = self._ready, self._plan
+        if plan is not None and settings != self._settings:
+            plan = None
+        self.clear()
+        return snapshot, plan
+
+    def clear(self):
+        if self._future is not None:
+            self._future.cancel()
+        self._future = None
+        self._state = None
+        self._ready = None
+        self._plan = None
+
+    def shutdown(self):
+        self.clear()
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,186 @@
+import json
+import logging
+import threading
+from typing import Dict, List, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from aiohttp import ClientTimeout
+from web3 import AsyncWeb3, Web3
+from web3.providers.async_rpc import AsyncHTTPProvider
+from web3.providers.rpc import HTTPProvider
+
+from router import RpcRouter
+
+DEFAULT_POOL_SIZE = 32
+DEFAULT_TIMEOUT = 10  # seconds
+
+
+class PooledHTTPProvider(HTTPProvider):
+    """HTTPProvider that sends every request through one shared keep-alive session
+
+    The stock provider caches a requests.Session per thread, so each bot
+    thread ends up with its own connection pool and its own TCP/TLS
+    handshakes. This provider posts through the session it was given
+    regardless of the calling thread.
+    """
+
+    def __init__(self, endpoint_uri: str, session: requests.Session, timeout: float = DEFAULT_TIMEOUT):
+        super().__init__(endpoint_uri, request_kwargs={'timeout': timeout})
+        self.session = session
+
+    def make_request(self, method, params):
+        request_data = self.encode_rpc_request(method, params)
+        response = self.session.post(
+            self.endpoint_uri,
+            data=request_data,
+            **self.get_request_kwargs()
+        )
+        response.raise_for_status()
+        return self.decode_rpc_response(response.content)
+
+    def send_batch(self, payload: list) -> list:
+        """Post a JSON-RPC batch through the shared session"""
+        response = self.session.post(self.endpoint_uri, json=payload, **self.get_request_kwargs())
+        response.raise_for_status()
+        return response.json()
+
+
+class RoutedHTTPProvider(HTTPProvider):
+    """HTTPProvider that spreads requests over several endpoints through an RpcRouter
+
+    endpoint_uri stays the primary (first) URL so per-endpoint registries
+    keyed on it keep working.
+    """
+
+    def __init__(self, router: RpcRouter, primary_uri: str):
+        super().__init__(primary_uri)
+        self.router = router
+
+    def make_request(self, method, params):
+        return self.decode_rpc_response(self.router.post(self.encode_rpc_request(method, params)))
+
+    def make_hedged_request(self, method, params):
+        """Race the request across the two best endpoints"""
+        return self.decode_rpc_response(self.router.post_hedged(self.encode_rpc_request(method, params)))
+
+    def send_batch(self, payload: list) -> list:
+        """Post a JSON-RPC batch to the best endpoint"""
+        return json.loads(self.router.post(json.dumps(payload).encode()))
+
+
+class ProviderRegistry:
+    """Process-wide cache of HTTP sessions, Web3 instances and contract objects
+
+    Every bot asking for the same endpoint gets the same Web3 instance and
+    therefore the same connection pool. requests/urllib3 do not implement
+    HTTP/1.1 pipelining, so concurrency comes from the keep-alive pool
+    instead: up to `pool_size` connections are reused across all wallets.
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, timeout: float = DEFAULT_TIMEOUT):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._sessions: Dict[str, requests.Session] = {}
+        self._web3: Dict[str, Web3] = {}
+        self._async_web3: Dict[str, AsyncWeb3] = {}
+        self._routers: Dict[Tuple[str, ...], RpcRouter] = {}
+        self._contracts: Dict[Tuple[str, str, str, str], object] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, pool_size: int = None, timeout: float = None):
+        """Change pool settings for sessions created from now on"""
+        with self._lock:
+            if pool_size is not None:
+                self.pool_size = pool_size
+            if timeout is not None:
+                self.timeout = timeout
+
+    def get_session(self, endpoint_uri: str) -> requests.Session:
+        """Get the shared keep-alive session for an endpoint"""
+        with self._lock:
+            session = self._sessions.get(endpoint_uri)
+            if session is None:
+                session = requests.Session()
+                # pool_block keeps the number of open sockets bounded under load
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=self.pool_size,
+                    pool_block=True
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers.update({'Connection': 'keep-alive'})
+                self._sessions[endpoint_uri] = session
+                logging.debug(f"Created pooled session for {endpoint_uri} (pool size {self.pool_size})")
+            return session
+
+    def get_web3(self, endpoint_uri: str) -> Web3:
+        """Get the shared Web3 instance for an endpoint"""
+        session = self.get_session(endpoint_uri)
+        with self._lock:
+            web3 = self._web3.get(endpoint_uri)
+            if web3 is None:
+                web3 = Web3(PooledHTTPProvider(endpoint_uri, session, timeout=self.timeout))
+                self._web3[endpoint_uri] = web3
+            return web3
+
+    def get_routed_web3(self, endpoint_uris: List[str]) -> Web3:
+        """Get the shared Web3 instance routing over several endpoints"""
+        key = tuple(endpoint_uris)
+        for uri in endpoint_uris:
+            self.get_session(uri)
+        with self._lock:
+            web3 = self._web3.get(key)
+            if web3 is None:
+                router = RpcRouter(list(endpoint_uris), self.get_session, timeout=self.timeout)
+                self._routers[key] = router
+                web3 = Web3(RoutedHTTPProvider(router, endpoint_uris[0]))
+                self._web3[key] = web3
+            return web3
+
+    def routers(self) -> List[RpcRouter]:
+        """Every router created so far"""
+        with self._lock:
+            return list(self._routers.values())
+
+    def get_async_web3(self, endpoint_uri: str) -> AsyncWeb3:
+        """Get the shared AsyncWeb3 instance for an endpoint
+
+        AsyncHTTPProvider keeps one aiohttp session per event loop thread,
+        so every coroutine on a loop shares its connection pool.
+        """
+        with self._lock:
+            web3 = self._async_web3.get(endpoint_uri)
+            if web3 is None:
+                web3 = AsyncWeb3(AsyncHTTPProvider(
+                    endpoint_uri,
+                    request_kwargs={'timeout': ClientTimeout(self.timeout)}
+                ))
+                self._async_web3[endpoint_uri] = web3
+            return web3
+
+    def get_contract(self, web3, address: str, abi: list):
+        """Get a single cached contract object per endpoint, address and ABI"""
+        key = (type(web3).__name__, web3.provider.endpoint_uri, address.lower(), json.dumps(abi, sort_keys=True))
+        with self._lock:
+            contract = self._contracts.get(key)
+            if contract is None:
+                contract = web3.eth.contract(address=address, abi=abi)
+                self._contracts[key] = contract
+            return contract
+
+    def close(self):
+        """Close every pooled session and forget cached instances"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._web3.clear()
+            self._async_web3.clear()
+            self._routers.clear()
+            self._contracts.clear()
+
+
+# Shared by every ContractManager in the process
+registry = ProviderRegistry()
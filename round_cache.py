@@ -0,0 +1,100 @@
+import json
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from config import ContractConfig
+
+
+class RoundCache:
+    """Cache of fulfilled game rounds keyed by game ID
+
+    A fulfilled round never changes, so entries never expire. The in-memory
+    layer is an LRU bounded to `max_size` entries; when `db_path` is set,
+    rounds are also written to SQLite so restarts and history views don't
+    go back to the RPC.
+    """
+
+    def __init__(self, max_size: int = None, db_path: Optional[str] = None):
+        self.max_size = max_size or ContractConfig.ROUND_CACHE_SIZE
+        self._rounds: "OrderedDict[int, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS rounds ("
+                "game_id INTEGER PRIMARY KEY, user TEXT, payload TEXT)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS rounds_user ON rounds (user, game_id)")
+            self._db.commit()
+
+    def __len__(self):
+        return len(self._rounds)
+
+    def get(self, game_id: int) -> Optional[Dict]:
+        """Cached fulfilled round, or None"""
+        with self._lock:
+            result = self._rounds.get(game_id)
+            if result is not None:
+                self._rounds.move_to_end(game_id)
+                return result
+            if self._db is None:
+                return None
+            row = self._db.execute("SELECT payload FROM rounds WHERE game_id = ?", (game_id,)).fetchone()
+        if row is None:
+            return None
+        result = json.loads(row[0])
+        self._remember(game_id, result)
+        return result
+
+    def put(self, game_id: int, result: Dict):
+        """Store a round; unfulfilled rounds are ignored since they still change"""
+        if not result or not result.get('fulfilled', False):
+            return
+        result = {
+            'fulfilled': True,
+            'user': result['user'],
+            'total_bet': result['total_bet'],
+            'total_winnings': result['total_winnings'],
+            'bet_amounts': list(result['bet_amounts']),
+            'dice_results': list(result['dice_results'])
+        }
+        self._remember(game_id, result)
+        if self._db is not None:
+            try:
+                with self._lock:
+                    self._db.execute(
+                        "INSERT OR IGNORE INTO rounds (game_id, user, payload) VALUES (?, ?, ?)",
+                        (game_id, result['user'].lower(), json.dumps(result))
+                    )
+                    self._db.commit()
+            except sqlite3.Error as e:
+                logging.error(f"Error persisting round {game_id}: {e}")
+
+    def for_user(self, user: str, limit: int = 50) -> List[Dict]:
+        """Most recent persisted rounds for a user, newest first"""
+        if self._db is None:
+            with self._lock:
+                rounds = [(game_id, r) for game_id, r in self._rounds.items()
+                          if r['user'].lower() == user.lower()]
+            return [dict(r, game_id=game_id) for game_id, r in sorted(rounds, reverse=True)[:limit]]
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT game_id, payload FROM rounds WHERE user = ? ORDER BY game_id DESC LIMIT ?",
+                (user.lower(), limit)
+            ).fetchall()
+        return [dict(json.loads(payload), game_id=game_id) for game_id, payload in rows]
+
+    def _remember(self, game_id: int, result: Dict):
+        with self._lock:
+            self._rounds[game_id] = result
+            self._rounds.move_to_end(game_id)
+            while len(self._rounds) > self.max_size:
+                self._rounds.popitem(last=False)
+
+
+# Shared by every ContractManager in the process
+round_cache = RoundCache(db_path=ContractConfig.ROUND_CACHE_DB)
@@ -0,0 +1,145 @@
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List
+
+import requests
+
+ALPHA = 0.2  # EWMA weight of the newest sample
+UNHEALTHY_AFTER = 3  # consecutive errors before an endpoint is benched
+COOLDOWN = 30  # seconds an unhealthy endpoint sits out
+PROBE_EVERY = 20  # every Nth request goes to a non-best endpoint to refresh its stats
+
+
+class EndpointStats:
+    """Latency and error tracking for one RPC endpoint"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.latency = 0.0  # EWMA seconds, 0 until the first sample
+        self.error_rate = 0.0  # EWMA of failures, 0..1
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.benched_until = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return time.time() >= self.benched_until
+
+    @property
+    def score(self) -> float:
+        """Lower is better; errors inflate the effective latency"""
+        return self.latency * (1 + 4 * self.error_rate)
+
+    def record(self, latency: float, ok: bool):
+        self.requests += 1
+        if self.latency == 0.0:
+            self.latency = latency
+        else:
+            self.latency = ALPHA * latency + (1 - ALPHA) * self.latency
+        self.error_rate = ALPHA * (0.0 if ok else 1.0) + (1 - ALPHA) * self.error_rate
+        if ok:
+            self.consecutive_errors = 0
+        else:
+            self.errors += 1
+            self.consecutive_errors += 1
+            if self.consecutive_errors >= UNHEALTHY_AFTER:
+                self.benched_until = time.time() + COOLDOWN
+                logging.warning(f"RPC endpoint {self.url} benched for {COOLDOWN}s after {self.consecutive_errors} errors")
+
+    def as_dict(self) -> Dict:
+        return {
+            'url': self.url,
+            'latency_ms': round(self.latency * 1000, 1),
+            'error_rate': round(self.error_rate, 3),
+            'requests': self.requests,
+            'errors': self.errors,
+            'healthy': self.healthy
+        }
+
+
+class RpcRouter:
+    """Sends JSON-RPC payloads to the fastest healthy endpoint
+
+    Every request updates the chosen endpoint's latency/error EWMA. A
+    failed request is retried on the next endpoint in rank order, and
+    hedged requests race the two best endpoints and take the first answer.
+    """
+
+    def __init__(self, urls: List[str], session_for: Callable[[str], requests.Session], timeout: float = 10):
+        if not urls:
+            raise ValueError("RpcRouter needs at least one endpoint")
+        self.stats = {url: EndpointStats(url) for url in urls}
+        self.session_for = session_for
+        self.timeout = timeout
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._hedge_pool = ThreadPoolExecutor(max_workers=max(2, 2 * len(urls)))
+
+    def ranked(self) -> List[str]:
+        """Endpoints ordered best first, benched ones last"""
+        with self._lock:
+            stats = list(self.stats.values())
+        return [s.url for s in sorted(stats, key=lambda s: (not s.healthy, s.score))]
+
+    def _order(self) -> List[str]:
+        order = self.ranked()
+        # Periodically lead with another healthy endpoint so its stats don't go stale
+        if len(order) > 1 and next(self._counter) % PROBE_EVERY == PROBE_EVERY - 1:
+            healthy = [url for url in order[1:] if self.stats[url].healthy]
+            if healthy:
+                probe = healthy[0]
+                order.remove(probe)
+                order.insert(0, probe)
+        return order
+
+    def _post(self, url: str, payload) -> bytes:
+        start = time.time()
+        try:
+            response = self.session_for(url).post(url, data=payload, timeout=self.timeout,
+                                                  headers={'Content-Type': 'application/json'})
+            response.raise_for_status()
+        except Exception:
+            with self._lock:
+                self.stats[url].record(time.time() - start, ok=False)
+            raise
+        with self._lock:
+            self.stats[url].record(time.time() - start, ok=True)
+        return response.content
+
+    def post(self, payload: bytes) -> bytes:
+        """Send an encoded JSON-RPC payload, failing over down the ranking"""
+        last_error = None
+        for url in self._order():
+            try:
+                return self._post(url, payload)
+            except Exception as e:
+                last_error = e
+                logging.debug(f"RPC request to {url} failed, trying next endpoint: {e}")
+        raise last_error
+
+    def post_hedged(self, payload: bytes) -> bytes:
+        """Race the two best endpoints and return whichever answers first"""
+        order = self.ranked()
+        if len(order) < 2:
+            return self.post(payload)
+
+        pending = {self._hedge_pool.submit(self._post, url, payload) for url in order[:2]}
+        last_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    last_error = e
+        # Both hedges failed; let the normal failover path try the rest
+        logging.debug(f"Hedged RPC request failed on both endpoints: {last_error}")
+        return self.post(payload)
+
+    def report(self) -> List[Dict]:
+        """Per-endpoint stats, best first"""
+        return [self.stats[url].as_dict() for url in self.ranked()]
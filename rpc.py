@@ -0,0 +1,157 @@
+import itertools
+import json
+import logging
+import time
+from typing import Any, List, Optional, Tuple
+
+from aiohttp import ClientTimeout
+from eth_abi import decode
+from web3._utils.abi import get_abi_output_types, map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+from web3._utils.request import async_make_post_request
+
+from metrics import rpc_metrics
+from providers import registry
+
+# Monotonic JSON-RPC ids shared by every batch in the process
+_request_ids = itertools.count(1)
+
+BATCH_TIMEOUT = 10  # seconds
+
+
+def eth_call(contract_function, block: str = 'latest') -> Tuple[str, list]:
+    """Build an eth_call request for a bound contract function
+
+    Args:
+        contract_function: Contract function with arguments applied
+        block: Block identifier to call against
+
+    Returns:
+        Tuple[str, list]: (method, params) ready for batch_request
+    """
+    return 'eth_call', [{
+        'to': contract_function.address,
+        'data': contract_function._encode_transaction_data()
+    }, block]
+
+
+def decode_call_result(contract_function, raw) -> Any:
+    """Decode raw eth_call output (hex string or bytes) for a contract function
+
+    Values are normalized like contract_function.call() (checksummed
+    addresses), returning the single value for one-output functions,
+    otherwise a tuple.
+    """
+    if isinstance(raw, str):
+        raw = bytes.fromhex(raw[2:] if raw.startswith('0x') else raw)
+    output_types = get_abi_output_types(contract_function.abi)
+    values = map_abi_data(BASE_RETURN_NORMALIZERS, output_types, decode(output_types, raw))
+    return values[0] if len(values) == 1 else tuple(values)
+
+
+def _build_batch_payload(ids: List[int], calls: List[Tuple[str, list]]) -> List[dict]:
+    return [
+        {'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params}
+        for request_id, (method, params) in zip(ids, calls)
+    ]
+
+
+def _parse_batch_response(body, ids: List[int], calls: List[Tuple[str, list]]) -> List[Optional[Any]]:
+    # Some nodes reject batches outright with a single error object
+    if not isinstance(body, list):
+        raise ValueError(f"RPC batch rejected: {body.get('error', body)}")
+
+    by_id = {entry.get('id'): entry for entry in body}
+    results = []
+    for request_id, (method, _) in zip(ids, calls):
+        entry = by_id.get(request_id)
+        if entry is None or 'error' in entry:
+            logging.debug(f"Batched {method} failed: {entry.get('error') if entry else 'no response'}")
+            results.append(None)
+        else:
+            results.append(entry.get('result'))
+    return results
+
+
+def batch_request(web3, calls: List[Tuple[str, list]]) -> List[Optional[Any]]:
+    """Send several JSON-RPC calls to the node in a single HTTP request
+
+    Args:
+        web3: Web3 instance whose HTTP endpoint should receive the batch
+        calls: List of (method, params) tuples
+
+    Returns:
+        List[Optional[Any]]: Raw results in the same order as calls. Calls
+        the node answered with an error come back as None.
+    """
+    if not calls:
+        return []
+
+    ids = [next(_request_ids) for _ in calls]
+    payload = _build_batch_payload(ids, calls)
+
+    # Batches bypass web3's middleware, so record them here
+    start = time.perf_counter()
+    try:
+        if hasattr(web3.provider, 'send_batch'):
+            body = web3.provider.send_batch(payload)
+        else:
+            endpoint_uri = web3.provider.endpoint_uri
+            response = registry.get_session(endpoint_uri).post(endpoint_uri, json=payload, timeout=BATCH_TIMEOUT)
+            response.raise_for_status()
+            body = response.json()
+        results = _parse_batch_response(body, ids, calls)
+    except Exception:
+        rpc_metrics.observe_batch(calls, time.perf_counter() - start)
+        raise
+    rpc_metrics.observe_batch(calls, time.perf_counter() - start, results)
+    return results
+
+
+def hedged_request(web3, method: str, params: list) -> Any:
+    """Send a latency-critical request, racing endpoints when the provider routes
+
+    Returns:
+        Any: The raw result field of the response
+    """
+    provider = web3.provider
+    start = time.perf_counter()
+    try:
+        if hasattr(provider, 'make_hedged_request'):
+            response = provider.make_hedged_request(method, params)
+        else:
+            response = provider.make_request(method, params)
+    except Exception:
+        rpc_metrics.observe(method, params, time.perf_counter() - start, error=True)
+        raise
+    rpc_metrics.observe(method, params, time.perf_counter() - start, error='error' in response)
+    if 'error' in response:
+        raise ValueError(response['error'])
+    return response['result']
+
+
+async def async_batch_request(web3, calls: List[Tuple[str, list]]) -> List[Optional[Any]]:
+    """Async counterpart of batch_request for AsyncWeb3 instances
+
+    Posts through the same aiohttp session AsyncHTTPProvider uses for the endpoint.
+    """
+    if not calls:
+        return []
+
+    ids = [next(_request_ids) for _ in calls]
+    payload = _build_batch_payload(ids, calls)
+
+    start = time.perf_counter()
+    try:
+        raw = await async_make_post_request(
+            web3.provider.endpoint_uri,
+            json.dumps(payload).encode(),
+            headers={'Content-Type': 'application/json'},
+            timeout=ClientTimeout(BATCH_TIMEOUT)
+        )
+        results = _parse_batch_response(json.loads(raw), ids, calls)
+    except Exception:
+        rpc_metrics.observe_batch(calls, time.perf_counter() - start)
+        raise
+    rpc_metrics.observe_batch(calls, time.perf_counter() - start, results)
+    return results
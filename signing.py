@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Optional
+
+from eth_account import Account
+from eth_account.signers.local import LocalAccount
+from eth_account.datastructures import SignedTransaction
+
+from config import ContractConfig
+
+# Set in each worker by the pool initializer: the service's shared address -> key registry
+_worker_keys = None
+# Accounts this worker has loaded, by address
+_worker_accounts: Dict[str, LocalAccount] = {}
+
+
+def _init_worker(keys):
+    global _worker_keys
+    _worker_keys = keys
+
+
+def _sign(address: str, tx: Dict) -> SignedTransaction:
+    account = _worker_accounts.get(address)
+    if account is None:
+        # First transaction for this wallet in this worker: load its key once
+        account = _worker_accounts[address] = Account.from_key(_worker_keys[address])
+    return account.sign_transaction(tx)
+
+
+class SigningService:
+    """Signs transactions in a process pool so secp256k1 work stays off the GIL
+
+    Registered keys go into a registry shared with the workers through a
+    multiprocessing manager. A worker loads a wallet's key from it the
+    first time it signs for that wallet and keeps the account, so each key
+    crosses to each worker once; requests only carry the sender address
+    and the unsigned transaction. The pool is started once, on the first
+    registration, and wallets can be added at any time.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._keys = None  # manager dict, address -> private key
+        self._addresses = set()  # registered addresses, checked without a trip to the manager
+        self._manager = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # spawn rather than fork: bot, Flask and RPC threads may hold locks at fork time
+        self._context = multiprocessing.get_context('spawn')
+
+    def register(self, private_key: str) -> str:
+        """Make a key available to the workers
+
+        Returns:
+            str: Address transactions for this key are signed under
+        """
+        address = Account.from_key(private_key).address
+        with self._lock:
+            if self._pool is None:
+                self._manager = self._context.Manager()
+                self._keys = self._manager.dict()
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=self._context,
+                                                 initializer=_init_worker, initargs=(self._keys,))
+                logging.info(f"✍️ Signing pool ready: {self.workers} workers")
+            if address not in self._addresses:
+                self._keys[address] = private_key
+                self._addresses.add(address)
+        return address
+
+    def submit(self, address: str, tx: Dict) -> Future:
+        """Queue a transaction for signing; the future resolves to a SignedTransaction"""
+        with self._lock:
+            if address not in self._addresses:
+                raise KeyError(f"No signing key registered for {address}")
+            return self._pool.submit(_sign, address, tx)
+
+    def sign(self, address: str, tx: Dict) -> SignedTransaction:
+        return self.submit(address, tx).result()
+
+    async def sign_async(self, address: str, tx: Dict) -> SignedTransaction:
+        return await asyncio.wrap_future(self.submit(address, tx))
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._manager.shutdown()
+                self._pool = self._manager = self._keys = None
+                self._addresses = set()
+
+
+_service: Optional[SigningService] = None
+_service_lock = threading.Lock()
+
+
+def get_signing_service() -> Optional[SigningService]:
+    """Process-wide signing service, or None when SIGNING_WORKERS is 0"""
+    global _service
+    if ContractConfig.SIGNING_WORKERS <= 0:
+        return None
+    with _service_lock:
+        if _service is None:
+            _service = SigningService(ContractConfig.SIGNING_WORKERS)
+        return _service
@@ -0,0 +1,593 @@
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+import rlp
+from eth_abi import decode, encode
+from eth_account import Account
+from eth_account._utils.typed_transactions import TypedTransaction
+from eth_utils import event_abi_to_log_topic, function_abi_to_4byte_selector, keccak, to_checksum_address
+from eth_utils.abi import collapse_if_tuple
+from hexbytes import HexBytes
+
+from config import ContractConfig
+from dice import roll_multiplier
+from multicall import AGGREGATE3_SELECTOR
+
+BET_GAS_USED = 196000  # gas used by a bet(uint256[]) call
+TRANSFER_GAS_USED = 21000
+
+# The VRF callback emits an event that is not in our ABI; this stands in for it
+FULFILLED_TOPIC = '0x' + keccak(text="RoundFulfilled(uint256,address,uint256)").hex()
+
+ZERO_ADDRESS = '0x' + '00' * 20
+
+
+def _abi_types(params: list) -> List[str]:
+    return [collapse_if_tuple(param) for param in params]
+
+
+class RpcError(Exception):
+    def __init__(self, message: str, code: int = -32000):
+        super().__init__(message)
+        self.code = code
+
+
+class DiceSimulator:
+    """In-memory chain running the dice contract from ContractConfig.DICE_GAME_ABI
+
+    Transactions wait in a mempool until the next block, which is produced
+    every `block_time` seconds by a background thread. Bets are fulfilled
+    `fulfillment_delay` seconds after they are mined, emitting the same
+    events as the live contract. Unknown accounts are funded on first use.
+    """
+
+    def __init__(self, fulfillment_delay: float = 2.0, block_time: float = 1.0,
+                 starting_bananas: int = 10000 * 10**18, starting_native: int = 100 * 10**18,
+                 base_fee: int = 50 * 10**9, seed: Optional[int] = None,
+                 max_log_range: Optional[int] = None):
+        self.fulfillment_delay = fulfillment_delay
+        self.block_time = block_time
+        self.starting_bananas = starting_bananas
+        self.starting_native = starting_native
+        self.base_fee = base_fee
+        self.max_log_range = max_log_range  # eth_getLogs refuses wider block ranges, like public RPCs
+        self.chain_id = ContractConfig.CHAIN_ID
+        self.address = ContractConfig.DICE_GAME_ADDRESS.lower()
+        self.multicall_address = ContractConfig.MULTICALL3_ADDRESS.lower()
+        self._random = random.Random(seed)
+
+        self.block_number = 1
+        self.block_timestamps = {1: int(time.time())}
+        self.bananas: Dict[str, int] = {}
+        self.native: Dict[str, int] = {}
+        self.nonces: Dict[str, int] = {}
+        self.games: Dict[int, Dict] = {}
+        self.last_game: Dict[str, int] = {}
+        self.pending_games: List[Tuple[float, int]] = []  # (due time, game ID)
+        self.mempool: Dict[str, Dict[int, Dict]] = {}  # sender -> nonce -> tx
+        self.receipts: Dict[str, Dict] = {}
+        self.transactions: Dict[str, Dict] = {}
+        self.logs: List[Dict] = []
+        self.requests = 0  # HTTP requests, a batch counts once
+        self.method_counts: Dict[str, int] = {}
+
+        self._functions = {}
+        for item in ContractConfig.DICE_GAME_ABI:
+            if item['type'] == 'function':
+                self._functions[function_abi_to_4byte_selector(item)] = item
+        self._topics = {
+            item['name']: '0x' + event_abi_to_log_topic(item).hex()
+            for item in ContractConfig.DICE_GAME_ABI if item['type'] == 'event'
+        }
+
+        self._lock = threading.RLock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._mine_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _account(self, address: str) -> str:
+        address = address.lower()
+        if address not in self.bananas:
+            self.bananas[address] = self.starting_bananas
+            self.native[address] = self.starting_native
+            self.nonces[address] = 0
+        return address
+
+    def handle(self, request: Dict) -> Dict:
+        """Answer a single JSON-RPC request object"""
+        method = request.get('method')
+        params = request.get('params') or []
+        response = {'jsonrpc': '2.0', 'id': request.get('id')}
+        handler = getattr(self, 'rpc_' + str(method), None)
+        if handler is None:
+            response['error'] = {'code': -32601, 'message': f"Method {method} not supported"}
+            return response
+        try:
+            with self._lock:
+                self.method_counts[method] = self.method_counts.get(method, 0) + 1
+                response['result'] = handler(*params)
+        except RpcError as e:
+            response['error'] = {'code': e.code, 'message': str(e)}
+        except Exception as e:
+            response['error'] = {'code': -32602, 'message': f"Invalid params: {e}"}
+        return response
+
+    # Block production
+
+    def _mine_loop(self):
+        while not self._stopped.wait(self.block_time):
+            with self._lock:
+                self._mine_block()
+
+    def _mine_block(self):
+        self.block_number += 1
+        self.block_timestamps[self.block_number] = int(time.time())
+        index = 0
+        for sender in list(self.mempool):
+            queued = self.mempool[sender]
+            while self.nonces[sender] in queued:
+                tx = queued.pop(self.nonces[sender])
+                self.nonces[sender] += 1
+                self._execute(tx, index)
+                index += 1
+            if not queued:
+                del self.mempool[sender]
+
+        now = time.time()
+        due = [game_id for due_at, game_id in self.pending_games if due_at <= now]
+        self.pending_games = [(due_at, game_id) for due_at, game_id in self.pending_games if due_at > now]
+        for game_id in due:
+            self._fulfill(game_id)
+
+    def _log(self, event: Optional[str], types: List[str], values: list, tx: Optional[Dict] = None,
+             topic: Optional[str] = None) -> Dict:
+        log = {
+            'address': to_checksum_address(self.address),
+            'topics': [topic or self._topics[event]],
+            'data': '0x' + encode(types, values).hex(),
+            'blockNumber': hex(self.block_number),
+            'blockHash': self._block_hash(self.block_number),
+            'transactionHash': tx['hash'] if tx else '0x' + keccak(text=f"fulfill-{len(self.logs)}").hex(),
+            'transactionIndex': hex(tx['index']) if tx else '0x0',
+            'logIndex': hex(len(self.logs)),
+            'removed': False
+        }
+        self.logs.append(log)
+        return log
+
+    def _execute(self, tx: Dict, index: int):
+        """Apply a transaction and store its receipt"""
+        sender = tx['from']
+        tx['index'] = index
+        gas_price = tx['effective_gas_price']
+        function = self._functions.get(tx['data'][:4]) if tx['to'] == self.address else None
+        if function is not None:
+            gas_used = BET_GAS_USED if function['name'] == 'bet' else 50000
+        else:
+            gas_used = TRANSFER_GAS_USED
+
+        cost = gas_used * gas_price
+        logs = []
+        if self.native[sender] < cost + tx['value']:
+            status = 0
+            self.native[sender] = max(0, self.native[sender] - cost)
+        else:
+            self.native[sender] -= cost + tx['value']
+            status = self._apply_call(tx, function, logs)
+            if status == 0:
+                self.native[sender] += tx['value']  # reverted calls keep their value
+
+        self.receipts[tx['hash']] = {
+            'transactionHash': tx['hash'],
+            'transactionIndex': hex(index),
+            'blockHash': self._block_hash(self.block_number),
+            'blockNumber': hex(self.block_number),
+            'from': to_checksum_address(sender),
+            'to': to_checksum_address(tx['to']) if tx['to'] else None,
+            'cumulativeGasUsed': hex(gas_used),
+            'gasUsed': hex(gas_used),
+            'effectiveGasPrice': hex(gas_price),
+            'contractAddress': None,
+            'logs': logs,
+            'logsBloom': '0x' + '00' * 256,
+            'status': hex(status),
+            'type': hex(tx['type'])
+        }
+
+    def _apply_call(self, tx: Dict, function: Optional[Dict], logs: List[Dict]) -> int:
+        """Run the contract side of a transaction, returning the receipt status"""
+        if function is None:
+            return 0 if tx['data'] else 1
+        if function['name'] == 'approve':
+            return 1
+        if function['name'] != 'bet' or _abi_types(function['inputs']) != ['uint256[]']:
+            return 0
+
+        sender = tx['from']
+        bet_amounts = list(decode(['uint256[]'], tx['data'][4:])[0])
+        total_bet = sum(bet_amounts)
+        if len(bet_amounts) != 3 or total_bet == 0 or self.bananas[sender] < total_bet:
+            return 0
+
+        self.bananas[sender] -= total_bet
+        game_id = len(self.games) + 1
+        self.games[game_id] = {
+            'fulfilled': False,
+            'user': sender,
+            'total_bet': total_bet,
+            'total_winnings': 0,
+            'bet_amounts': bet_amounts,
+            'dice_results': []
+        }
+        self.last_game[sender] = game_id
+        self.pending_games.append((time.time() + self.fulfillment_delay, game_id))
+        logs.append(self._log('BurnPoints', ['address', 'uint256'], [sender, total_bet], tx))
+        logs.append(self._log('Bet', ['uint256', 'address', 'uint256'], [game_id, sender, total_bet], tx))
+        return 1
+
+    def _fulfill(self, game_id: int):
+        game = self.games[game_id]
+        dice = [self._random.randint(1, 6) for _ in range(3)]
+        winnings = int(game['total_bet'] * roll_multiplier(dice))
+        game['dice_results'] = dice
+        game['total_winnings'] = winnings
+        game['fulfilled'] = True
+        if winnings:
+            self.bananas[game['user']] += winnings
+            self._log('MintPoints', ['address', 'uint256'], [game['user'], winnings])
+        self._log(None, ['uint256', 'address', 'uint256'], [game_id, game['user'], winnings],
+                  topic=FULFILLED_TOPIC)
+
+    def _block_hash(self, number: int) -> str:
+        return '0x' + keccak(text=f"block-{number}").hex()
+
+    def _block_param(self, block) -> int:
+        if block in (None, 'latest', 'pending', 'safe', 'finalized'):
+            return self.block_number
+        if block == 'earliest':
+            return 1
+        return int(block, 16)
+
+    # Contract calls
+
+    def _call_contract(self, to: str, data: bytes) -> bytes:
+        if to == self.multicall_address and data[:4] == AGGREGATE3_SELECTOR:
+            results = []
+            for target, allow_failure, calldata in decode(['(address,bool,bytes)[]'], data[4:])[0]:
+                try:
+                    results.append((True, self._call_contract(target.lower(), calldata)))
+                except RpcError:
+                    if not allow_failure:
+                        raise
+                    results.append((False, b''))
+            return encode(['(bool,bytes)[]'], [results])
+
+        function = self._functions.get(data[:4])
+        if to != self.address or function is None or function['stateMutability'] != 'view':
+            raise RpcError("execution reverted", 3)
+        args = decode(_abi_types(function['inputs']), data[4:])
+        outputs = _abi_types(function['outputs'])
+        name = function['name']
+
+        if name == 'balanceOf':
+            return encode(outputs, [self.bananas.get(args[0].lower(), self.starting_bananas)])
+        if name == 'allowance':
+            return encode(outputs, [2**256 - 1])
+        if name == 'gameNotOver':
+            return encode(outputs, [bool(self.pending_games)])
+        if name == 'getGameState':
+            return encode(outputs, [[(game_id, i) for i, (_, game_id) in enumerate(self.pending_games)]])
+        if name == 'getUserLastGameInfo':
+            game_id = self.last_game.get(args[0].lower(), 0)
+            return encode(outputs, [game_id, self._round_tuple(game_id)])
+        if name == 'getGameRoundInfo':
+            return encode(outputs, [self._round_tuple(args[0])])
+        raise RpcError("execution reverted", 3)
+
+    def _round_tuple(self, game_id: int) -> tuple:
+        game = self.games.get(game_id)
+        if game is None:
+            return (False, ZERO_ADDRESS, 0, 0, [], [])
+        return (game['fulfilled'], game['user'], game['total_bet'], game['total_winnings'],
+                game['bet_amounts'], game['dice_results'])
+
+    # JSON-RPC methods
+
+    def rpc_simulator_stats(self):
+        """Request counters, for benchmarks running the simulator in another process"""
+        return {
+            'requests': self.requests,
+            'calls': sum(self.method_counts.values()),
+            'methods': dict(self.method_counts),
+            'games': len(self.games),
+            'block': self.block_number
+        }
+
+    def rpc_eth_chainId(self):
+        return hex(self.chain_id)
+
+    def rpc_net_version(self):
+        return str(self.chain_id)
+
+    def rpc_web3_clientVersion(self):
+        return "ApesWinSimulator/1.0"
+
+    def rpc_eth_blockNumber(self):
+        return hex(self.block_number)
+
+    def rpc_eth_gasPrice(self):
+        return hex(self.base_fee + 10**9)
+
+    def rpc_eth_maxPriorityFeePerGas(self):
+        return hex(10**9)
+
+    def rpc_eth_feeHistory(self, block_count, newest_block='latest', percentiles=None):
+        newest = self._block_param(newest_block)
+        count = min(int(block_count, 16) if isinstance(block_count, str) else block_count, newest)
+        return {
+            'oldestBlock': hex(newest - count + 1),
+            'baseFeePerGas': [hex(self.base_fee)] * (count + 1),
+            'gasUsedRatio': [0.5] * count,
+            'reward': [[hex(10**9)] * len(percentiles or [])] * count
+        }
+
+    def rpc_eth_getBlockByNumber(self, block='latest', full_transactions=False):
+        number = self._block_param(block)
+        if number > self.block_number:
+            return None
+        return {
+            'number': hex(number),
+            'hash': self._block_hash(number),
+            'parentHash': self._block_hash(number - 1),
+            'timestamp': hex(self.block_timestamps.get(number, int(time.time()))),
+            'baseFeePerGas': hex(self.base_fee),
+            'gasLimit': hex(30000000),
+            'gasUsed': hex(0),
+            'miner': ZERO_ADDRESS,
+            'transactions': []
+        }
+
+    def rpc_eth_getBalance(self, address, block='latest'):
+        return hex(self.native.get(address.lower(), self.starting_native))
+
+    def rpc_eth_getCode(self, address, block='latest'):
+        return '0x60' if address.lower() in (self.address, self.multicall_address) else '0x'
+
+    def rpc_eth_getTransactionCount(self, address, block='latest'):
+        sender = self._account(address)
+        nonce = self.nonces[sender]
+        if block == 'pending':
+            queued = self.mempool.get(sender, {})
+            while nonce in queued:
+                nonce += 1
+        return hex(nonce)
+
+    def rpc_eth_call(self, call, block='latest'):
+        data = bytes.fromhex((call.get('data') or call.get('input') or '0x')[2:])
+        return '0x' + self._call_contract((call.get('to') or '').lower(), data).hex()
+
+    def rpc_eth_estimateGas(self, call, block='latest'):
+        data = bytes.fromhex((call.get('data') or call.get('input') or '0x')[2:])
+        function = self._functions.get(data[:4])
+        if function is not None and function['name'] == 'bet':
+            return hex(BET_GAS_USED)
+        return hex(TRANSFER_GAS_USED if not data else 50000)
+
+    def rpc_eth_sendRawTransaction(self, raw_hex):
+        raw = bytes.fromhex(raw_hex[2:])
+        tx = self._decode_transaction(raw)
+        sender = self._account(tx['from'])
+        expected = int(self.rpc_eth_getTransactionCount(sender, 'pending'), 16)
+        if tx['nonce'] < self.nonces[sender]:
+            raise RpcError("nonce too low")
+        if tx['nonce'] in self.mempool.get(sender, {}):
+            raise RpcError("replacement transaction underpriced")
+        if tx['nonce'] > expected + 64:
+            raise RpcError("nonce too high")
+        if tx['chain_id'] is not None and tx['chain_id'] != self.chain_id:
+            raise RpcError("invalid chain id")
+        self.mempool.setdefault(sender, {})[tx['nonce']] = tx
+        self.transactions[tx['hash']] = tx
+        return tx['hash']
+
+    def _decode_transaction(self, raw: bytes) -> Dict:
+        sender = Account.recover_transaction(raw).lower()
+        if raw[0] <= 0x7f:
+            fields = TypedTransaction.from_bytes(HexBytes(raw)).as_dict()
+            max_fee = fields.get('maxFeePerGas', fields.get('gasPrice', 0))
+            tip = fields.get('maxPriorityFeePerGas', max_fee)
+            gas_price = min(max_fee, self.base_fee + tip)
+            to = fields['to'].hex() if fields['to'] else None
+            nonce, value, data, gas = fields['nonce'], fields['value'], bytes(fields['data']), fields['gas']
+            chain_id, tx_type = fields['chainId'], fields['type']
+        else:
+            nonce, gas_price, gas, to, value, data, v, _, _ = rlp.decode(raw)
+            nonce, gas_price, gas, value, v = (int.from_bytes(x, 'big') for x in (nonce, gas_price, gas, value, v))
+            to = '0x' + to.hex() if to else None
+            chain_id = (v - 35) // 2 if v >= 35 else None
+            tx_type = 0
+        if gas_price < self.base_fee:
+            raise RpcError("transaction underpriced")
+        return {
+            'hash': '0x' + keccak(raw).hex(),
+            'from': sender,
+            'to': to.lower() if to else None,
+            'nonce': nonce,
+            'value': value,
+            'data': data,
+            'gas': gas,
+            'effective_gas_price': gas_price,
+            'chain_id': chain_id,
+            'type': tx_type
+        }
+
+    def rpc_eth_getTransactionReceipt(self, tx_hash):
+        return self.receipts.get(tx_hash.lower())
+
+    def rpc_eth_getTransactionByHash(self, tx_hash):
+        tx = self.transactions.get(tx_hash.lower())
+        if tx is None:
+            return None
+        receipt = self.receipts.get(tx['hash'])
+        return {
+            'hash': tx['hash'],
+            'from': to_checksum_address(tx['from']),
+            'to': to_checksum_address(tx['to']) if tx['to'] else None,
+            'nonce': hex(tx['nonce']),
+            'value': hex(tx['value']),
+            'input': '0x' + tx['data'].hex(),
+            'gas': hex(tx['gas']),
+            'gasPrice': hex(tx['effective_gas_price']),
+            'blockNumber': receipt['blockNumber'] if receipt else None,
+            'blockHash': receipt['blockHash'] if receipt else None,
+            'transactionIndex': receipt['transactionIndex'] if receipt else None,
+            'type': hex(tx['type'])
+        }
+
+    def rpc_eth_getLogs(self, log_filter):
+        from_block = self._block_param(log_filter.get('fromBlock'))
+        to_block = self._block_param(log_filter.get('toBlock'))
+        if self.max_log_range is not None and to_block - from_block + 1 > self.max_log_range:
+            raise RpcError(f"block range exceeds {self.max_log_range}", -32005)
+        addresses = log_filter.get('address')
+        if isinstance(addresses, str):
+            addresses = [addresses]
+        addresses = {a.lower() for a in addresses} if addresses else None
+        topic0 = (log_filter.get('topics') or [None])[0]
+        if isinstance(topic0, str):
+            topic0 = [topic0]
+        return [
+            log for log in self.logs
+            if from_block <= int(log['blockNumber'], 16) <= to_block
+            and (addresses is None or log['address'].lower() in addresses)
+            and (not topic0 or log['topics'][0] in topic0)
+        ]
+
+
+class SimulatorServer(ThreadingHTTPServer):
+    """HTTP JSON-RPC front end for a DiceSimulator
+
+    Args:
+        simulator: Chain state to serve
+        latency: Mean seconds added to every HTTP request
+        jitter: Fraction of `latency` added or removed at random
+        error_rate: Probability that a request fails with HTTP 503
+    """
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, simulator: DiceSimulator, host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, jitter: float = 0.5, error_rate: float = 0.0):
+        super().__init__((host, port), _SimulatorHandler)
+        self.simulator = simulator
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """Serve from a daemon thread and return the endpoint URL"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self.url
+
+    def shutdown(self):
+        super().shutdown()
+        self.server_close()
+        self.simulator.stop()
+
+
+class _SimulatorHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like a real RPC provider
+
+    def do_POST(self):
+        server: SimulatorServer = self.server
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+        if server.latency:
+            spread = server.latency * server.jitter
+            time.sleep(max(0.0, server.latency + random.uniform(-spread, spread)))
+
+        if server.error_rate and random.random() < server.error_rate:
+            self._reply(503, b'{"error": "injected failure"}')
+            return
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            self._reply(400, b'{"error": "invalid JSON"}')
+            return
+
+        with server.simulator._lock:
+            server.simulator.requests += 1
+        if isinstance(payload, list):
+            result = [server.simulator.handle(item) for item in payload]
+        else:
+            result = server.simulator.handle(payload)
+        self._reply(200, json.dumps(result).encode())
+
+    def _reply(self, status: int, data: bytes):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_simulator(port: int = 0, latency: float = 0.0, error_rate: float = 0.0,
+                    **simulator_options) -> SimulatorServer:
+    """Start a simulator in the background and point ContractConfig at it
+
+    Returns:
+        SimulatorServer: Running server, call shutdown() when done
+    """
+    server = SimulatorServer(DiceSimulator(**simulator_options), port=port,
+                             latency=latency, error_rate=error_rate)
+    ContractConfig.SONIC_RPC_URL = server.start()
+    ContractConfig.SONIC_RPC_URLS = []
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local JSON-RPC simulator of the Apes.win dice contract")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8545)
+    parser.add_argument('--fulfillment-delay', type=float, default=2.0, help="seconds from mining to dice roll")
+    parser.add_argument('--block-time', type=float, default=1.0, help="seconds between blocks")
+    parser.add_argument('--latency', type=float, default=0.0, help="mean seconds added to each RPC request")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of RPC requests failing with HTTP 503")
+    parser.add_argument('--seed', type=int, default=None, help="seed for reproducible dice rolls")
+    parser.add_argument('--max-log-range', type=int, default=None, help="widest block range eth_getLogs accepts")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    simulator = DiceSimulator(fulfillment_delay=args.fulfillment_delay, block_time=args.block_time, seed=args.seed,
+                              max_log_range=args.max_log_range)
+    server = SimulatorServer(simulator, args.host, args.port, latency=args.latency, error_rate=args.error_rate)
+    logging.info(f"🎲 Dice simulator listening on {server.url}")
+    logging.info(f"   Point the bot at it with SONIC_RPC_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logging.info("\n⛔️ Shutting down simulator...")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
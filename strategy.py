@@ -0,0 +1,218 @@
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from config import ContractConfig
+from streaming import RollingWindow
+
+# ApesWinBot's tunables and their defaults, as exposed by /api/settings
+DEFAULT_SETTINGS = {
+    'min_bet_percentage': 0.10,
+    'max_bet_percentage': 0.25,
+    'win_streak_rate': 0.20,
+    'loss_recovery_rate': 0.15,
+    'chase_69_threshold': 15,
+    'chase_69_multiplier': 1.1,
+    'win_sensitivity': 0.5,
+    'loss_sensitivity': 0.5,
+    'max_track_games': 20
+}
+
+
+class StrategyState(NamedTuple):
+    """Everything the bet sizing remembers between games
+
+    The win and loss windows are updated in place by settle(), so a state
+    that must survive the next settle (to branch on several outcomes) has
+    to be fork()ed first.
+    """
+    base_bet: Optional[int] = None  # None until the first bet of a session
+    win_streak: int = 0
+    loss_streak: int = 0
+    games_since_69: int = 0
+    win_ratios: Optional[RollingWindow] = None  # Last max_track_games wins as a multiple of the bet
+    loss_ratios: Optional[RollingWindow] = None
+    avg_win: float = 0.0
+    avg_loss: float = 0.0
+    profit_factor: float = 0.0
+
+    def fork(self) -> 'StrategyState':
+        """Copy whose windows are independent of this state's"""
+        return self._replace(
+            win_ratios=self.win_ratios.copy() if self.win_ratios is not None else None,
+            loss_ratios=self.loss_ratios.copy() if self.loss_ratios is not None else None
+        )
+
+
+class BetDecision(NamedTuple):
+    """A sized bet and the multipliers behind it"""
+    bet: Optional[int]  # None when the balance is below the safety threshold
+    base_bet: Optional[int]
+    win_bonus: float = 1.0
+    recovery: float = 1.0
+    chase_bonus: float = 1.0
+    variable_bonus: float = 1.0
+    capped: bool = False  # Cut down to max_bet_percentage of the balance
+    reset: bool = False  # Base bet was larger than the balance and got reset
+
+
+def win_bonus(settings: Dict, win_streak: int) -> float:
+    if win_streak <= 0:
+        return 1.0
+    return min(1.0 + (win_streak * settings['win_streak_rate']), 2.0)  # Cap at 2x
+
+
+def recovery_bonus(settings: Dict, loss_streak: int) -> float:
+    if loss_streak <= 0:
+        return 1.0
+    return min(1.0 + (loss_streak * settings['loss_recovery_rate']), 2.0)  # Cap at 2x
+
+
+def chase_bonus(settings: Dict, games_since_69: int) -> float:
+    if games_since_69 < settings['chase_69_threshold']:
+        return 1.0
+    games_over = games_since_69 - settings['chase_69_threshold'] + 1
+    return min(settings['chase_69_multiplier'] ** games_over, 3.0)  # Cap at 3x
+
+
+def variable_bonus(settings: Dict, state: StrategyState) -> float:
+    """Profit-factor adjustment, once there are more than two wins and two losses to average"""
+    if len(state.win_ratios or ()) <= 2 or len(state.loss_ratios or ()) <= 2:
+        return 1.0
+    if state.profit_factor > 1.0:
+        return min(1.0 + ((state.profit_factor - 1.0) * settings['win_sensitivity']), 1.5)  # Cap at 1.5x
+    return max(1.0 - ((1.0 - state.profit_factor) * settings['loss_sensitivity']), 0.5)  # Floor at 0.5x
+
+
+def bonus_tables(settings: Dict, length: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Win, recovery and chase bonuses for streaks and droughts 0..length, for vectorized lookups"""
+    steps = range(length + 1)
+    return (np.array([win_bonus(settings, n) for n in steps]),
+            np.array([recovery_bonus(settings, n) for n in steps]),
+            np.array([chase_bonus(settings, n) for n in steps]))
+
+
+def bet_fraction(settings: Dict, win_streak: int, loss_streak: int, games_since_69: int) -> float:
+    """Share of the balance bet in a streak/drought state, without the profit-factor adjustment"""
+    chase = chase_bonus(settings, games_since_69)
+    base = min(settings['min_bet_percentage'] * chase, settings['max_bet_percentage'])
+    return min(base * win_bonus(settings, win_streak) * recovery_bonus(settings, loss_streak) * chase,
+               settings['max_bet_percentage'])
+
+
+def decide(settings: Dict, state: StrategyState, balance: int) -> Tuple[StrategyState, BetDecision]:
+    """Size the next bet, as ApesWinBot.calculate_bet does
+
+    Returns:
+        Tuple[StrategyState, BetDecision]: State with the base bet initialised or reset, and the bet
+    """
+    if balance < ContractConfig.SAFETY_THRESHOLD:
+        return state, BetDecision(None, state.base_bet)
+
+    base_bet = state.base_bet
+    if base_bet is None:
+        base_bet = max(ContractConfig.MIN_BET_AMOUNT, int(balance * settings['min_bet_percentage']))
+    reset = balance < base_bet
+    if reset:
+        base_bet = max(ContractConfig.MIN_BET_AMOUNT, int(balance * ContractConfig.MAX_BET_PERCENTAGE))
+
+    win = win_bonus(settings, state.win_streak)
+    recovery = recovery_bonus(settings, state.loss_streak)
+    chase = chase_bonus(settings, state.games_since_69)
+    variable = variable_bonus(settings, state)
+    bet = int(base_bet * win * recovery * chase * variable)
+
+    max_allowed_bet = int(balance * settings['max_bet_percentage'])
+    capped = bet > max_allowed_bet
+    if capped:
+        bet = max_allowed_bet
+    return state._replace(base_bet=base_bet), BetDecision(bet, base_bet, win, recovery, chase, variable, capped, reset)
+
+
+def _track(window: Optional[RollingWindow], ratio: float, limit: int) -> Tuple[RollingWindow, float]:
+    if window is None:
+        window = RollingWindow(limit)
+    window.resize(limit)
+    window.push(ratio)
+    return window, window.mean(1.0)
+
+
+def settle(settings: Dict, state: StrategyState, balance: int, bet: int, balance_change: int,
+           hit_69: Optional[bool]) -> StrategyState:
+    """Fold a settled game into the state, as ApesWinBot.record_result does
+
+    The state's win or loss window is updated in place and carried into
+    the returned state.
+
+    Args:
+        balance: Balance before the bet
+        bet: Bet as sized, before rounding to the dice
+        balance_change: Winnings minus stake
+        hit_69: Whether the roll was a 69, or None if the dice are unknown
+    """
+    win_ratios, loss_ratios = state.win_ratios, state.loss_ratios
+    avg_win, avg_loss = state.avg_win, state.avg_loss
+    won = balance_change > 0
+    if won:
+        win_ratios, avg_win = _track(win_ratios, balance_change / bet, settings['max_track_games'])
+    else:
+        loss_ratios, avg_loss = _track(loss_ratios, abs(balance_change) / bet, settings['max_track_games'])
+    profit_factor = avg_win / avg_loss if avg_loss > 0 and avg_win > 0 else 1.0
+
+    games_since_69 = state.games_since_69
+    if hit_69 is not None:
+        games_since_69 = 0 if hit_69 else games_since_69 + 1
+
+    bet_percentage = min(settings['min_bet_percentage'] * chase_bonus(settings, games_since_69),
+                         settings['max_bet_percentage'])
+    return StrategyState(
+        base_bet=max(ContractConfig.MIN_BET_AMOUNT, int((balance + balance_change) * bet_percentage)),
+        win_streak=state.win_streak + 1 if won else 0,
+        loss_streak=0 if won else state.loss_streak + 1,
+        games_since_69=games_since_69,
+        win_ratios=win_ratios,
+        loss_ratios=loss_ratios,
+        avg_win=avg_win,
+        avg_loss=avg_loss,
+        profit_factor=profit_factor
+    )
+
+
+def balance_change(bet: int, multiplier: float) -> int:
+    """Net result of a bet: the contract takes bet // 3 on each die and pays the stake times the roll's multiplier"""
+    stake = (bet // 3) * 3
+    multiplier = float(multiplier)
+    if multiplier.is_integer():
+        # Whole multipliers stay in integer arithmetic, as the contract pays them
+        return stake * int(multiplier) - stake
+    return int(stake * multiplier) - stake
+
+
+def replay(settings: Dict, state: StrategyState, balance: int, multipliers: Iterable[float],
+           hits_69: Iterable[bool]) -> Dict:
+    """Play a sequence of outcomes through decide and settle
+
+    Stops early once the balance falls below the safety threshold.
+
+    Returns:
+        Dict: Final state and balance, and the bet and balance after each game played
+    """
+    state = state.fork()
+    bets = []
+    balances = []
+    for multiplier, hit_69 in zip(multipliers, hits_69):
+        state, decision = decide(settings, state, balance)
+        if decision.bet is None:
+            break
+        change = balance_change(decision.bet, multiplier)
+        state = settle(settings, state, balance, decision.bet, change, bool(hit_69))
+        balance += change
+        bets.append(decision.bet)
+        balances.append(balance)
+    return {
+        'state': state,
+        'balance': balance,
+        'games': len(bets),
+        'bets': np.array(bets, dtype=float),
+        'balances': np.array(balances, dtype=float)
+    }
@@ -0,0 +1,203 @@
+import threading
+from typing import Dict, Iterable, List, Optional
+
+
+class RollingWindow:
+    """Last `size` values in a ring buffer with a running sum
+
+    push, len and mean are O(1) whatever the window size. The sum is
+    rebuilt from the buffer once per lap, so rounding errors from adding
+    and removing values cannot build up.
+    """
+
+    __slots__ = ('size', '_values', '_start', 'count', 'total')
+
+    def __init__(self, size: int, values: Iterable[float] = ()):
+        self.size = max(int(size), 0)
+        self._values = [0.0] * self.size
+        self._start = 0  # Slot of the oldest value
+        self.count = 0
+        self.total = 0.0
+        for value in values:
+            self.push(value)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def push(self, value: float) -> Optional[float]:
+        """Add a value
+
+        Returns:
+            Optional[float]: The value that fell out of the window, if it was full
+        """
+        if self.size == 0:
+            return value
+        if self.count < self.size:
+            self._values[(self._start + self.count) % self.size] = value
+            self.count += 1
+            self.total += value
+            return None
+        evicted = self._values[self._start]
+        self._values[self._start] = value
+        self._start = (self._start + 1) % self.size
+        if self._start == 0:
+            self.total = sum(self._values)
+        else:
+            self.total += value - evicted
+        return evicted
+
+    def mean(self, default: Optional[float] = None) -> Optional[float]:
+        return self.total / self.count if self.count else default
+
+    def values(self) -> List[float]:
+        """Values oldest first"""
+        return [self._values[(self._start + i) % self.size] for i in range(self.count)]
+
+    def resize(self, size: int):
+        """Change the window length, keeping the newest values that still fit"""
+        size = max(int(size), 0)
+        if size != self.size:
+            values = self.values()[-size:] if size else []
+            self.__init__(size, values)
+
+    def copy(self) -> 'RollingWindow':
+        window = RollingWindow.__new__(RollingWindow)
+        window.size = self.size
+        window._values = list(self._values)
+        window._start = self._start
+        window.count = self.count
+        window.total = self.total
+        return window
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, RollingWindow) and self.size == other.size and self.values() == other.values()
+
+    def __repr__(self) -> str:
+        return f"RollingWindow({self.size}, {self.values()})"
+
+
+class Ewma:
+    """Exponentially weighted moving average; the first value seeds it"""
+
+    __slots__ = ('alpha', 'value')
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.value: Optional[float] = None
+
+    def update(self, value: float) -> float:
+        self.value = value if self.value is None else self.value + self.alpha * (value - self.value)
+        return self.value
+
+
+class SessionStats:
+    """Win/loss statistics of a betting session, updated in O(1) per game
+
+    Tracks sliding-window and EWMA win rate, win and loss size (as a
+    multiple of the bet) and profit factor, plus streaks and drawdown.
+
+    Args:
+        window: Games in the sliding windows
+        alpha: EWMA smoothing factor; higher follows recent games faster
+    """
+
+    def __init__(self, window: int = 100, alpha: float = 0.1):
+        self.window = window
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.games = 0
+            self.wins = 0
+            self.losses = 0
+            self.wagered = 0
+            self.net = 0
+            self.results = RollingWindow(self.window)  # 1.0 per win, 0.0 per loss
+            self.win_ratios = RollingWindow(self.window)
+            self.loss_ratios = RollingWindow(self.window)
+            self.ewma_win_rate = Ewma(self.alpha)
+            self.ewma_win_ratio = Ewma(self.alpha)
+            self.ewma_loss_ratio = Ewma(self.alpha)
+            self.win_streak = 0
+            self.loss_streak = 0
+            self.longest_win_streak = 0
+            self.longest_loss_streak = 0
+            self.peak: Optional[int] = None
+            self.drawdown = 0.0
+            self.max_drawdown = 0.0
+
+    def record(self, balance_change: int, bet: int, balance: Optional[int] = None):
+        """Add a settled game
+
+        Args:
+            balance_change: Winnings minus stake
+            bet: Bet amount the change is measured against
+            balance: Balance after the game, for drawdown
+        """
+        won = balance_change > 0
+        ratio = abs(balance_change) / bet if bet else 0.0
+        with self._lock:
+            self.games += 1
+            self.wagered += bet
+            self.net += balance_change
+            self.results.push(1.0 if won else 0.0)
+            self.ewma_win_rate.update(1.0 if won else 0.0)
+            if won:
+                self.wins += 1
+                self.win_ratios.push(ratio)
+                self.ewma_win_ratio.update(ratio)
+                self.win_streak += 1
+                self.loss_streak = 0
+                self.longest_win_streak = max(self.longest_win_streak, self.win_streak)
+            else:
+                self.losses += 1
+                self.loss_ratios.push(ratio)
+                self.ewma_loss_ratio.update(ratio)
+                self.loss_streak += 1
+                self.win_streak = 0
+                self.longest_loss_streak = max(self.longest_loss_streak, self.loss_streak)
+            if balance is not None:
+                self.peak = balance if self.peak is None else max(self.peak, balance)
+                self.drawdown = (self.peak - balance) / self.peak if self.peak > 0 else 0.0
+                self.max_drawdown = max(self.max_drawdown, self.drawdown)
+
+    @staticmethod
+    def _profit_factor(avg_win: Optional[float], avg_loss: Optional[float]) -> Optional[float]:
+        if not avg_win or not avg_loss:
+            return None
+        return avg_win / avg_loss
+
+    def snapshot(self) -> Dict:
+        """Current statistics for the dashboard"""
+        with self._lock:
+            avg_win = self.win_ratios.mean()
+            avg_loss = self.loss_ratios.mean()
+            return {
+                'games': self.games,
+                'wins': self.wins,
+                'losses': self.losses,
+                'win_rate': self.wins / self.games if self.games else None,
+                'window': {
+                    'games': len(self.results),
+                    'win_rate': self.results.mean(),
+                    'avg_win': avg_win,
+                    'avg_loss': avg_loss,
+                    'profit_factor': self._profit_factor(avg_win, avg_loss)
+                },
+                'ewma': {
+                    'win_rate': self.ewma_win_rate.value,
+                    'avg_win': self.ewma_win_ratio.value,
+                    'avg_loss': self.ewma_loss_ratio.value,
+                    'profit_factor': self._profit_factor(self.ewma_win_ratio.value, self.ewma_loss_ratio.value)
+                },
+                'win_streak': self.win_streak,
+                'loss_streak': self.loss_streak,
+                'longest_win_streak': self.longest_win_streak,
+                'longest_loss_streak': self.longest_loss_streak,
+                'drawdown': self.drawdown,
+                'max_drawdown': self.max_drawdown,
+                'wagered': self.wagered,
+                'net': self.net
+            }
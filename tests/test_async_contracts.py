@@ -0,0 +1,58 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from eth_account import Account
+
+import fulfillment
+from async_contracts import AsyncContractManager
+from config import ContractConfig
+from round_cache import round_cache
+from simulator import start_simulator
+
+
+class AsyncContractManagerTest(unittest.TestCase):
+    """Async bets against the simulator never fall back to blocking RPC"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.saved = ContractConfig.SONIC_RPC_URL, ContractConfig.SONIC_RPC_URLS
+        # Game IDs restart with every simulator, so drop rounds cached from earlier ones
+        round_cache._rounds.clear()
+        cls.server = start_simulator(fulfillment_delay=0.2, block_time=0.1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        ContractConfig.SONIC_RPC_URL, ContractConfig.SONIC_RPC_URLS = cls.saved
+
+    async def bet(self, manager: AsyncContractManager):
+        tx_hash = await manager.send_dice_bet(3 * 10**18)
+        self.assertIsNotNone(tx_hash)
+        game_id = await manager.confirm_dice_bet(tx_hash)
+        self.assertIsNotNone(game_id)
+        self.assertIsNotNone(await manager.wait_for_game_round(game_id, timeout=10))
+
+    def test_nonce_resync_stays_async(self):
+        manager = AsyncContractManager(Account.create().key.hex())
+        blocking = mock.Mock(side_effect=AssertionError("blocking nonce fetch"))
+        with mock.patch.object(manager.nonces, '_fetch', blocking):
+            asyncio.run(self.bet(manager))
+            # A failed send forgets the counter; the next bet asks the node again
+            manager.nonces.resync()
+            asyncio.run(self.bet(manager))
+        address = manager.account.address.lower()
+        self.assertEqual(self.server.simulator.nonces[address], 2)
+
+    def test_watchers_of_closed_loops_are_dropped(self):
+        async def watcher():
+            return fulfillment.get_async_watcher(ContractConfig.get_async_web3())
+
+        first = asyncio.run(watcher())
+        second = asyncio.run(watcher())
+        self.assertIsNot(first, second)
+        self.assertEqual([w for _, w in fulfillment._async_watchers.values()], [second])
+
+
+if __name__ == '__main__':
+    unittest.main()
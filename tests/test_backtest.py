@@ -0,0 +1,82 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+import strategy
+from backtest import backtest, load_rounds
+from dice import OUTCOMES, lookup
+from montecarlo import TOKEN
+from strategy import DEFAULT_SETTINGS, StrategyState
+
+SETTINGS = [
+    {},
+    {'min_bet_percentage': 0.02, 'max_bet_percentage': 0.08, 'chase_69_threshold': 3, 'chase_69_multiplier': 1.3},
+    {'win_streak_rate': 0.5, 'loss_recovery_rate': 0.0, 'win_sensitivity': 0.0, 'loss_sensitivity': 0.0}
+]
+
+
+def make_rounds(count: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    outcomes = [lookup(OUTCOMES[rng.randrange(len(OUTCOMES))]) for _ in range(count)]
+    return {
+        'multiplier': np.array([outcome['multiplier'] for outcome in outcomes], dtype=float),
+        'is_69': np.array([outcome['is_69'] for outcome in outcomes], dtype=np.int8)
+    }
+
+
+class BacktestTest(unittest.TestCase):
+    """The backtester's batched pass against strategy.replay on the same rounds"""
+
+    def assert_matches_replay(self, rounds, results, start_balance):
+        start_wei = int(start_balance * TOKEN)
+        for settings, result in zip(SETTINGS, results):
+            expected = strategy.replay(dict(DEFAULT_SETTINGS, **settings), StrategyState(), start_wei,
+                                       rounds['multiplier'].tolist(), rounds['is_69'].tolist())
+            self.assertEqual(result['games'], expected['games'])
+            self.assertEqual(result['final_balance'], expected['balance'] / TOKEN)
+            self.assertEqual(result['wagered'], sum(int(bet) // 3 * 3 for bet in expected['bets']) / TOKEN)
+            self.assertEqual(result['stopped'], expected['games'] < len(rounds['multiplier']))
+            balances = [start_wei] + expected['balances'].tolist()
+            self.assertEqual(result['peak_balance'], max(balances) / TOKEN)
+
+    def test_matches_replay(self):
+        rounds = make_rounds(2000, seed=3)
+        results = backtest(rounds, SETTINGS, start_balance=100.0)
+        self.assertEqual(len(results), len(SETTINGS))
+        self.assert_matches_replay(rounds, results, 100.0)
+        for result in results:
+            self.assertEqual(result['curve'][0], (0, 100.0))
+            self.assertEqual(result['curve'][-1], (result['games'], result['final_balance']))
+
+    def test_stops_below_safety_threshold(self):
+        rounds = {'multiplier': np.zeros(50), 'is_69': np.zeros(50, dtype=np.int8)}
+        start_balance = 2000 / TOKEN
+        results = backtest(rounds, SETTINGS, start_balance=start_balance)
+        self.assertTrue(all(result['stopped'] for result in results))
+        self.assert_matches_replay(rounds, results, start_balance)
+
+    def test_workers_match_single_pass(self):
+        rounds = make_rounds(300, seed=4)
+        self.assertEqual(backtest(rounds, SETTINGS, workers=2), backtest(rounds, SETTINGS))
+
+    def test_jsonl_rounds_use_recorded_winnings(self):
+        rounds = make_rounds(40, seed=5)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'rounds.jsonl')
+            rng = random.Random(5)
+            with open(path, 'w') as f:
+                for multiplier in rounds['multiplier'].tolist():
+                    # Dice only decide the 69 flag here, so any roll matching it will do
+                    bet = rng.randrange(1, 100) * 3 * 10**18
+                    f.write(json.dumps({'dice': [1, 2, 3], 'amount': bet, 'winnings': bet * multiplier}) + '\n')
+            loaded = load_rounds(path)
+        np.testing.assert_allclose(loaded['multiplier'], rounds['multiplier'])
+        self.assertEqual(loaded['is_69'].tolist(), [0] * 40)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+import montecarlo
+from dice import analyze_policy
+from strategy import DEFAULT_SETTINGS
+
+# Sensitivities 0 leave nothing out of the chain but rounding
+SETTINGS = dict(DEFAULT_SETTINGS, min_bet_percentage=0.02, max_bet_percentage=0.06,
+                win_sensitivity=0.0, loss_sensitivity=0.0)
+
+
+class AnalyzePolicyTest(unittest.TestCase):
+    """The Markov chain analysis against Monte Carlo sampling of the same policy"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.report = analyze_policy(SETTINGS, games=100, ruin_fraction=0.5)
+        cls.sampled = montecarlo.simulate(SETTINGS, sessions=20000, games=100, ruin_fraction=0.5, seed=7)
+
+    def test_agrees_with_monte_carlo(self):
+        report, sampled = self.report, self.sampled
+        self.assertFalse(report['approximate'])
+        # 20000 sessions put the sampling error of a probability near 0.3 at about 0.003
+        self.assertAlmostEqual(report['risk_of_ruin'], sampled['risk_of_ruin'], delta=0.015)
+        self.assertAlmostEqual(report['prob_profit'], sampled['prob_profit'], delta=0.015)
+        self.assertAlmostEqual(report['expected_balance'], 1 + sampled['expected_profit'] / 100, delta=0.03)
+        # Quantiles are read off the log-balance grid, about 1.5% per bin
+        self.assertAlmostEqual(report['median_balance'], 1 + sampled['profit']['p50'] / 100, delta=0.04)
+        self.assertAlmostEqual(report['balance_p95'], 1 + sampled['profit']['p95'] / 100, delta=0.08)
+
+    def test_quantiles_below_ruin_are_zero(self):
+        self.assertGreater(self.report['risk_of_ruin'], 0.05)
+        self.assertEqual(self.report['balance_p5'], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
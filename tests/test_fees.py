@@ -0,0 +1,61 @@
+import threading
+import unittest
+
+from config import ContractConfig
+from fees import BET_GAS_KIND, FeeOracle
+from providers import registry
+from simulator import DiceSimulator, SimulatorServer
+
+
+class FeeOracleTest(unittest.TestCase):
+    """Shared fee sampling and gas limit learning against the simulator"""
+
+    def setUp(self):
+        self.server = SimulatorServer(DiceSimulator(block_time=60, base_fee=40 * 10**9), latency=0.1, jitter=0.0)
+        self.server.start()
+        self.web3 = registry.get_web3(self.server.url)
+
+    def tearDown(self):
+        self.server.shutdown()
+
+    def test_fee_params_from_one_sample(self):
+        oracle = FeeOracle(self.web3, refresh_interval=60)
+        before = self.server.simulator.requests
+        params = oracle.fee_params()
+        self.assertEqual(oracle.fee_params(), params)
+        self.assertEqual(self.server.simulator.requests - before, 1)
+        self.assertEqual(params, {
+            'maxFeePerGas': 40 * 10**9 * ContractConfig.BASE_FEE_HEADROOM + 10**9,
+            'maxPriorityFeePerGas': 10**9
+        })
+
+    def test_concurrent_refresh_samples_once(self):
+        oracle = FeeOracle(self.web3, refresh_interval=60)
+        before = self.server.simulator.requests
+        threads = [threading.Thread(target=oracle.fee_params) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.server.simulator.requests - before, 1)
+        self.assertEqual(oracle.base_fee, 40 * 10**9)
+
+    def test_fees_capped(self):
+        oracle = FeeOracle(self.web3, refresh_interval=60)
+        oracle.refresh()
+        oracle.base_fee = ContractConfig.MAX_GAS_PRICE
+        params = oracle.fee_params(refresh=False)
+        self.assertEqual(params['maxFeePerGas'], ContractConfig.MAX_GAS_PRICE)
+        self.assertLessEqual(params['maxPriorityFeePerGas'], params['maxFeePerGas'])
+
+    def test_gas_limit_learned_from_receipts(self):
+        oracle = FeeOracle(self.web3)
+        self.assertEqual(oracle.gas_limit(BET_GAS_KIND, ContractConfig.BET_GAS_LIMIT), ContractConfig.BET_GAS_LIMIT)
+        oracle.observe_receipt(BET_GAS_KIND, {'status': 1, 'gasUsed': 100000})
+        oracle.observe_receipt(BET_GAS_KIND, {'status': 1, 'gasUsed': 120000})
+        oracle.observe_receipt(BET_GAS_KIND, {'status': 0, 'gasUsed': 500000})  # may have run out of gas
+        self.assertEqual(oracle.gas_limit(BET_GAS_KIND), int(120000 * ContractConfig.GAS_LIMIT_BUFFER))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import time
+import unittest
+
+from eth_abi import encode
+from eth_account import Account
+from web3 import Web3
+
+from config import ContractConfig
+from contracts import ContractManager
+from fulfillment import FulfillmentWatcher, users_in_log
+from round_cache import round_cache
+from simulator import start_simulator
+
+USER = '0x' + 'ab' * 20
+
+
+class UsersInLogTest(unittest.TestCase):
+    """Attributing raw contract logs to users"""
+
+    def test_known_event_is_decoded(self):
+        log = {
+            'topics': [Web3.keccak(text='Bet(uint256,address,uint256)').hex()],
+            'data': '0x' + encode(['uint256', 'address', 'uint256'], [7, USER, 10**18]).hex()
+        }
+        self.assertEqual(users_in_log(log), {USER})
+
+    def test_unknown_event_falls_back_to_address_words(self):
+        log = {
+            'topics': ['0x' + 'ff' * 32, '0x' + '00' * 12 + 'ab' * 20],
+            'data': '0x' + encode(['uint256'], [2**255]).hex()
+        }
+        self.assertEqual(users_in_log(log), {USER})
+
+
+class FulfillmentWatcherTest(unittest.TestCase):
+    """Waiting on the simulator is woken by logs, not by the fallback check"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.saved = ContractConfig.SONIC_RPC_URL, ContractConfig.SONIC_RPC_URLS
+        # Game IDs restart with every simulator, so drop rounds cached from earlier ones
+        round_cache._rounds.clear()
+        cls.server = start_simulator(fulfillment_delay=0.3, block_time=0.1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        ContractConfig.SONIC_RPC_URL, ContractConfig.SONIC_RPC_URLS = cls.saved
+
+    def test_log_wakes_waiter(self):
+        manager = ContractManager(Account.create().key.hex())
+        watcher = FulfillmentWatcher(manager.web3, poll_interval=0.05, fallback_interval=30)
+        game_id = manager.confirm_dice_bet(manager.send_dice_bet(3 * 10**18))
+        self.assertIsNotNone(game_id)
+
+        started = time.time()
+        result = watcher.wait(manager, game_id, timeout=10)
+        self.assertIsNotNone(result)
+        self.assertTrue(result['fulfilled'])
+        self.assertEqual(list(result['dice_results']), self.server.simulator.games[game_id]['dice_results'])
+        # Only the log poll can answer before the 30 second fallback check
+        self.assertLess(time.time() - started, 3)
+
+    def test_timeout(self):
+        manager = ContractManager(Account.create().key.hex())
+        watcher = FulfillmentWatcher(manager.web3, poll_interval=0.05, fallback_interval=30)
+        self.assertIsNone(watcher.wait(manager, 10**6, timeout=0.3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from eth_account import Account
+
+from config import ContractConfig
+from contracts import ContractManager
+from indexer import TOKEN, GameIndexer
+from providers import registry
+from round_cache import round_cache
+from simulator import start_simulator
+
+MAX_LOG_RANGE = 20
+BETS = [3 * 10**18, 6 * 10**18, 9 * 10**18, 12 * 10**18, 15 * 10**18]
+
+
+class GameIndexerTest(unittest.TestCase):
+    """Backfilling the simulator's logs through a node that caps eth_getLogs ranges"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.saved = ContractConfig.SONIC_RPC_URL, ContractConfig.SONIC_RPC_URLS
+        round_cache._rounds.clear()
+        # Blocks are mined by hand so bet i lands in block 2 + 30 * i
+        cls.server = start_simulator(fulfillment_delay=0, block_time=3600, max_log_range=MAX_LOG_RANGE)
+        simulator = cls.server.simulator
+        manager = ContractManager(Account.create().key.hex())
+        cls.user = manager.account.address.lower()
+        for bet in BETS:
+            manager.send_dice_bet(bet)
+            with simulator._lock:
+                for _ in range(30):
+                    simulator._mine_block()
+        cls.head = simulator.block_number
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        ContractConfig.SONIC_RPC_URL, ContractConfig.SONIC_RPC_URLS = cls.saved
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, 'index.db')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_indexer(self, **options) -> GameIndexer:
+        return GameIndexer(registry.get_web3(self.server.url), self.db_path, start_block=0, **options)
+
+    def test_sync_halves_refused_spans(self):
+        indexer = self.make_indexer(parallel=4, span=100)
+        spans = []
+        fetch_logs = indexer._fetch_logs
+        with mock.patch.object(indexer, '_fetch_logs', lambda *args: spans.append(indexer.span) or fetch_logs(*args)):
+            self.assertEqual(indexer.sync(), len(BETS))
+        self.assertEqual(indexer.last_block, self.head)
+        # Each refused first range is retried at half the span until one fits
+        self.assertEqual(spans[:4], [100, 50, 25, 12])
+
+        games = self.server.simulator.games
+        history = indexer.history(self.user)
+        self.assertEqual([entry['game_id'] for entry in history], sorted(games, reverse=True))
+        for entry in history:
+            game = games[entry['game_id']]
+            self.assertEqual(entry['dice'], game['dice_results'])
+            self.assertAlmostEqual(entry['amount'], game['total_bet'] / TOKEN)
+            self.assertAlmostEqual(entry['winnings'], game['total_winnings'] / TOKEN)
+
+        stats = indexer.stats(self.user)
+        self.assertEqual(stats['games'], len(BETS))
+        self.assertEqual(stats['pending'], 0)
+        self.assertAlmostEqual(stats['wagered'], sum(bet // 3 * 3 for bet in BETS) / TOKEN)
+        self.assertAlmostEqual(stats['returned'], sum(game['total_winnings'] for game in games.values()) / TOKEN)
+        self.assertEqual(indexer.stats(), stats)
+
+    def test_resumes_from_last_block(self):
+        self.assertEqual(self.make_indexer(span=10).sync(to_block=61), 2)
+        indexer = self.make_indexer(span=10)
+        self.assertEqual(indexer.last_block, 61)
+        self.assertEqual(indexer.sync(), len(BETS) - 2)
+        self.assertEqual(indexer.sync(), 0)
+        self.assertEqual(indexer.stats()['games'], len(BETS))
+
+
+if __name__ == '__main__':
+    unittest.main()
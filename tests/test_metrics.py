@@ -0,0 +1,49 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from web3 import HTTPProvider, Web3
+
+import metrics
+
+
+class InstallTest(unittest.TestCase):
+    """metrics.install from many threads adds the middleware exactly once"""
+
+    def test_concurrent_install_injects_once(self):
+        web3 = Web3(HTTPProvider('http://127.0.0.1:1'))
+        onion = web3.middleware_onion
+        inject = onion.inject
+        calls = []
+
+        def slow_inject(*args, **kwargs):
+            # Widens the gap between the membership check and the inject
+            calls.append(args)
+            time.sleep(0.05)
+            return inject(*args, **kwargs)
+
+        barrier = threading.Barrier(8)
+        errors = []
+
+        def install():
+            barrier.wait()
+            try:
+                metrics.install(web3)
+            except Exception as e:
+                errors.append(e)
+
+        with mock.patch.object(onion, 'inject', slow_inject):
+            threads = [threading.Thread(target=install) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(calls), 1)
+        self.assertIn('metrics', onion)
+        self.assertIs(metrics.install(web3), web3)
+
+
+if __name__ == '__main__':
+    unittest.main()
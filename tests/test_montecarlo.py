@@ -0,0 +1,48 @@
+import unittest
+
+import numpy as np
+
+import montecarlo
+import strategy
+from dice import OUTCOME_IS_69, OUTCOME_MULTIPLIERS, OUTCOMES
+from strategy import DEFAULT_SETTINGS, StrategyState
+
+GAMES = 200
+SESSIONS = 64
+SEED = 5
+# Small enough in wei that flooring, MIN_BET_AMOUNT and SAFETY_THRESHOLD all come into play
+START_WEI = 10 ** 7
+
+
+class SimulateTest(unittest.TestCase):
+    """The vectorized engine against strategy.replay on the same rolls"""
+
+    def setUp(self):
+        # simulate() draws every roll up front from the seeded generator
+        self.rolls = np.random.default_rng(SEED).integers(0, len(OUTCOMES), (GAMES, SESSIONS), dtype=np.uint8)
+        self.replays = [
+            strategy.replay(DEFAULT_SETTINGS, StrategyState(), START_WEI,
+                            OUTCOME_MULTIPLIERS[self.rolls[:, session]], OUTCOME_IS_69[self.rolls[:, session]])
+            for session in range(SESSIONS)
+        ]
+
+    def test_sessions_match_replay(self):
+        results = montecarlo._simulate_chunk(DEFAULT_SETTINGS, SESSIONS, GAMES, float(START_WEI),
+                                             START_WEI * 0.1, np.random.default_rng(SEED))
+        self.assertEqual(results['balance'].tolist(), [float(r['balance']) for r in self.replays])
+        self.assertEqual(results['played'].tolist(), [r['games'] for r in self.replays])
+        self.assertEqual(results['wagered'].tolist(),
+                         [float(sum(bet // 3 * 3 for bet in r['bets'].astype(int))) for r in self.replays])
+        # Some sessions hit the safety threshold, so stopping is covered too
+        self.assertLess(min(r['games'] for r in self.replays), GAMES)
+
+    def test_simulate_summary(self):
+        report = montecarlo.simulate(sessions=SESSIONS, games=GAMES, start_balance=START_WEI / montecarlo.TOKEN,
+                                     seed=SEED)
+        profits = [(r['balance'] - START_WEI) / montecarlo.TOKEN for r in self.replays]
+        self.assertAlmostEqual(report['expected_profit'], float(np.mean(profits)), delta=1e-20)
+        self.assertEqual(report['mean_games'], float(np.mean([r['games'] for r in self.replays])))
+
+
+if __name__ == '__main__':
+    unittest.main()
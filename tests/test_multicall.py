@@ -0,0 +1,91 @@
+import time
+import unittest
+from unittest import mock
+
+from eth_account import Account
+
+import multicall
+from balance_cache import balance_cache
+from config import ContractConfig
+from contracts import ContractManager
+from multicall import MulticallAggregator, get_aggregator
+from simulator import start_simulator
+
+
+def as_tuples(value):
+    """web3 returns lists where decode_call_result returns tuples"""
+    if isinstance(value, (list, tuple)):
+        return tuple(as_tuples(item) for item in value)
+    return value
+
+
+class MulticallTest(unittest.TestCase):
+    """Shared aggregate3 reads against the simulator's Multicall3"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.saved = ContractConfig.SONIC_RPC_URL, ContractConfig.SONIC_RPC_URLS
+        cls.server = start_simulator(block_time=60)
+        cls.web3 = ContractConfig.get_web3()
+        cls.contract = ContractConfig.get_contract(cls.web3)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        ContractConfig.SONIC_RPC_URL, ContractConfig.SONIC_RPC_URLS = cls.saved
+
+    def setUp(self):
+        self.alice, self.bob = Account.create().address, Account.create().address
+        simulator = self.server.simulator
+        simulator.bananas[self.alice.lower()] = 1234 * 10**18
+        # A settled game so getUserLastGameInfo returns a real round
+        simulator.games[7] = {'fulfilled': True, 'user': self.bob, 'total_bet': 10**18,
+                              'total_winnings': 2 * 10**18, 'bet_amounts': [10**18], 'dice_results': [42]}
+        simulator.last_game[self.bob.lower()] = 7
+
+    def test_results_match_direct_calls(self):
+        aggregator = MulticallAggregator(self.web3, window=0.05)
+        reads = [fn(address) for address in (self.alice, self.bob)
+                 for fn in (self.contract.functions.balanceOf, self.contract.functions.getUserLastGameInfo)]
+        # Both wallets have read recently, so the dispatcher waits for the window
+        aggregator.should_share(self.alice)
+        aggregator.should_share(self.bob)
+        before = self.server.simulator.method_counts.get('eth_call', 0)
+        futures = [aggregator.submit(read, caller=read.args[0]) for read in reads]
+        results = [future.result(timeout=5) for future in futures]
+        # Two callers inside the window share one aggregate3
+        self.assertEqual(self.server.simulator.method_counts['eth_call'] - before, 1)
+        self.assertEqual(as_tuples(results), as_tuples([read.call() for read in reads]))
+
+    def test_short_answer_fails_leftover_futures(self):
+        aggregator = MulticallAggregator(self.web3, window=0)
+        decode = multicall.decode_aggregate3
+        with mock.patch.object(multicall, 'decode_aggregate3', lambda raw: decode(raw)[:1]):
+            # Queue both before the dispatcher wakes so they go in one aggregate3
+            with aggregator._condition:
+                first = aggregator.submit(self.contract.functions.balanceOf(self.alice), caller=self.alice)
+                second = aggregator.submit(self.contract.functions.balanceOf(self.bob), caller=self.alice)
+            started = time.time()
+            self.assertEqual(first.result(timeout=5), 1234 * 10**18)
+            with self.assertRaises(ValueError):
+                second.result(timeout=5)
+            self.assertLess(time.time() - started, 1)
+
+    def test_shared_snapshot_matches_direct_snapshot(self):
+        manager = ContractManager(Account.create().key.hex())
+        self.server.simulator.last_game[manager.account.address.lower()] = 7
+
+        direct = manager.snapshot()
+        self.assertEqual(direct['last_game_id'], 7)
+
+        # Another wallet reading makes snapshot join the shared aggregate3
+        aggregator = get_aggregator(manager.web3)
+        self.assertTrue(aggregator.should_share(self.bob))
+        balance_cache.invalidate(manager.account.address)
+        before = self.server.simulator.method_counts.get('eth_call', 0)
+        self.assertEqual(manager.snapshot(), direct)
+        self.assertEqual(self.server.simulator.method_counts.get('eth_call', 0) - before, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
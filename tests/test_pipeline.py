@@ -0,0 +1,65 @@
+import unittest
+
+from eth_account import Account
+
+from config import ContractConfig
+from contracts import ContractManager
+from pipeline import BetPipeline
+from round_cache import round_cache
+from simulator import start_simulator
+
+BETS = [3 * 10**18, 6 * 10**18, 9 * 10**18]
+
+
+class BetPipelineTest(unittest.TestCase):
+    """Several bets from one wallet in flight against the simulator"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.saved = ContractConfig.SONIC_RPC_URL, ContractConfig.SONIC_RPC_URLS
+        # Game IDs restart with every simulator, so drop rounds cached from earlier ones
+        round_cache._rounds.clear()
+        cls.server = start_simulator(fulfillment_delay=0.2, block_time=0.1, seed=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        ContractConfig.SONIC_RPC_URL, ContractConfig.SONIC_RPC_URLS = cls.saved
+
+    def setUp(self):
+        self.manager = ContractManager(Account.create().key.hex())
+        self.traces = []
+        self.pipeline = BetPipeline(self.manager, len(BETS), on_trace=self.traces.append)
+
+    def tearDown(self):
+        self.pipeline.shutdown()
+
+    def test_nonces_follow_submission_order(self):
+        for bet in BETS:
+            self.assertTrue(self.pipeline.submit(bet, 10**22, self.manager.snapshot()))
+        self.assertFalse(self.pipeline.has_capacity())
+
+        address = self.manager.account.address.lower()
+        sent = [tx for tx in self.server.simulator.transactions.values() if tx['from'] == address]
+        self.assertEqual([tx['nonce'] for tx in sent], [0, 1, 2])
+        for _ in BETS:
+            self.pipeline.next_result()
+        self.assertEqual(self.server.simulator.nonces[address], len(BETS))
+
+    def test_results_settle_in_order(self):
+        for bet in BETS:
+            self.assertTrue(self.pipeline.submit(bet, 10**22, self.manager.snapshot()))
+
+        results = [self.pipeline.next_result() for _ in BETS]
+        self.assertIsNone(self.pipeline.next_result())
+        game_ids = [game_id for game_id, _, _, _ in results]
+        self.assertEqual(game_ids, sorted(game_ids))
+        self.assertEqual([bet for _, _, bet, _ in results], BETS)
+        for game_id, _, bet, result in results:
+            self.assertIsNotNone(result)
+            self.assertEqual(self.server.simulator.games[game_id]['total_bet'], bet // 3 * 3)
+        self.assertEqual(len(self.traces), len(BETS))
+
+
+if __name__ == '__main__':
+    unittest.main()
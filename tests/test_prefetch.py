@@ -0,0 +1,71 @@
+import unittest
+
+from eth_account import Account
+
+import strategy
+from config import ContractConfig
+from contracts import ContractManager
+from dice import is_69
+from prefetch import NextBetPrefetch
+from round_cache import round_cache
+from simulator import start_simulator
+from strategy import DEFAULT_SETTINGS, StrategyState
+
+
+class NextBetPrefetchTest(unittest.TestCase):
+    """Prefetched snapshot and plan against the simulator's actual rounds"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.saved = ContractConfig.SONIC_RPC_URL, ContractConfig.SONIC_RPC_URLS
+        # Game IDs restart with every simulator, so drop rounds cached from earlier ones
+        round_cache._rounds.clear()
+        cls.server = start_simulator(fulfillment_delay=0.2, block_time=0.1, seed=3)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        ContractConfig.SONIC_RPC_URL, ContractConfig.SONIC_RPC_URLS = cls.saved
+
+    def setUp(self):
+        self.manager = ContractManager(Account.create().key.hex())
+        self.prefetch = NextBetPrefetch(self.manager)
+
+    def tearDown(self):
+        self.prefetch.shutdown()
+
+    def play(self, state: StrategyState):
+        balance = self.manager.snapshot()['banana_balance']
+        state, decision = strategy.decide(DEFAULT_SETTINGS, state, balance)
+        game_id = self.manager.place_dice_bet(decision.bet)
+        self.assertIsNotNone(game_id)
+        self.prefetch.start(DEFAULT_SETTINGS, state, balance, decision.bet)
+        self.assertIsNotNone(self.manager.wait_for_game_round(game_id, timeout=10))
+        self.prefetch.settle(game_id)
+        return state, balance, decision.bet, self.server.simulator.games[game_id]
+
+    def test_plan_matches_the_settled_round(self):
+        state = StrategyState()
+        for _ in range(3):
+            state, balance, bet, game = self.play(state)
+            snapshot, plan = self.prefetch.take(DEFAULT_SETTINGS)
+
+            fresh = self.manager.snapshot()
+            self.assertEqual(snapshot['banana_balance'], fresh['banana_balance'])
+            self.assertEqual(snapshot['nonce'], fresh['nonce'])
+
+            change = game['total_winnings'] - game['total_bet']
+            state = strategy.settle(DEFAULT_SETTINGS, state, balance, bet, change, is_69(game['dice_results']))
+            _, expected = strategy.decide(DEFAULT_SETTINGS, state, fresh['banana_balance'])
+            self.assertIsNotNone(plan)
+            self.assertEqual(plan, expected)
+
+    def test_plan_dropped_when_settings_change(self):
+        self.play(StrategyState())
+        snapshot, plan = self.prefetch.take(dict(DEFAULT_SETTINGS, max_bet_percentage=0.3))
+        self.assertIsNotNone(snapshot)
+        self.assertIsNone(plan)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+
+from round_cache import RoundCache
+
+USER = '0x' + 'AB' * 20
+
+
+def make_round(game_id: int, fulfilled: bool = True, user: str = USER) -> dict:
+    return {
+        'fulfilled': fulfilled,
+        'user': user,
+        'total_bet': 3 * game_id,
+        'total_winnings': game_id,
+        'bet_amounts': (game_id, game_id, game_id),
+        'dice_results': (1, 2, game_id % 6 + 1)
+    }
+
+
+class RoundCacheTest(unittest.TestCase):
+    """Memory LRU and SQLite layers of the fulfilled-round cache"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, 'rounds.db')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_ignores_unfulfilled_rounds(self):
+        cache = RoundCache(max_size=4)
+        cache.put(1, make_round(1, fulfilled=False))
+        cache.put(2, None)
+        self.assertIsNone(cache.get(1))
+        self.assertEqual(len(cache), 0)
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = RoundCache(max_size=2)
+        cache.put(1, make_round(1))
+        cache.put(2, make_round(2))
+        self.assertIsNotNone(cache.get(1))  # 2 is now the oldest
+        cache.put(3, make_round(3))
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(cache.get(1)['dice_results'], [1, 2, 2])
+        self.assertEqual(cache.get(3)['total_bet'], 9)
+
+    def test_sqlite_survives_restart(self):
+        cache = RoundCache(max_size=1, db_path=self.db_path)
+        for game_id in (1, 2, 3):
+            cache.put(game_id, make_round(game_id))
+        cache.put(4, make_round(4, user='0x' + 'cd' * 20))
+        self.assertEqual(len(cache), 1)
+        # Evicted from memory, still served from disk and remembered again
+        self.assertEqual(cache.get(1), dict(make_round(1), bet_amounts=[1, 1, 1], dice_results=[1, 2, 2]))
+        self.assertEqual(len(cache), 1)
+
+        restarted = RoundCache(max_size=10, db_path=self.db_path)
+        self.assertEqual(len(restarted), 0)
+        self.assertEqual(restarted.get(3)['total_winnings'], 3)
+        self.assertEqual([r['game_id'] for r in restarted.for_user(USER.lower())], [3, 2, 1])
+        self.assertEqual([r['game_id'] for r in restarted.for_user(USER, limit=2)], [3, 2])
+
+    def test_for_user_without_db(self):
+        cache = RoundCache(max_size=10)
+        for game_id in (5, 6):
+            cache.put(game_id, make_round(game_id))
+        cache.put(7, make_round(7, user='0x' + 'cd' * 20))
+        self.assertEqual([r['game_id'] for r in cache.for_user(USER.lower())], [6, 5])
+
+
+if __name__ == '__main__':
+    unittest.main()
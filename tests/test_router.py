@@ -0,0 +1,108 @@
+import json
+import time
+import unittest
+
+import requests
+
+import router
+from router import RpcRouter
+from simulator import DiceSimulator, SimulatorServer
+
+BLOCK_NUMBER = json.dumps({'jsonrpc': '2.0', 'id': 1, 'method': 'eth_blockNumber', 'params': []}).encode()
+
+
+class RouterTest(unittest.TestCase):
+    """RpcRouter against two local simulators with different latency and error rates"""
+
+    def setUp(self):
+        self.servers = []
+        self.sessions = {}
+
+    def tearDown(self):
+        for server in self.servers:
+            server.shutdown()
+        for session in self.sessions.values():
+            session.close()
+
+    def start(self, latency: float = 0.0, error_rate: float = 0.0) -> SimulatorServer:
+        server = SimulatorServer(DiceSimulator(block_time=60), latency=latency, jitter=0.0, error_rate=error_rate)
+        server.start()
+        self.servers.append(server)
+        return server
+
+    def make_router(self, *servers: SimulatorServer) -> RpcRouter:
+        def session_for(url):
+            if url not in self.sessions:
+                self.sessions[url] = requests.Session()
+            return self.sessions[url]
+        return RpcRouter([server.url for server in servers], session_for, timeout=5)
+
+    def test_failover_benches_failing_endpoint(self):
+        failing, healthy = self.start(error_rate=1.0), self.start()
+        rpc = self.make_router(failing, healthy)
+        # Stale stats keep the failing endpoint ranked first until it is benched
+        rpc.stats[failing.url].latency = 0.001
+        rpc.stats[healthy.url].latency = 1.0
+
+        for _ in range(router.UNHEALTHY_AFTER):
+            self.assertIn('result', json.loads(rpc.post(BLOCK_NUMBER)))
+
+        self.assertFalse(rpc.stats[failing.url].healthy)
+        self.assertEqual(rpc.stats[failing.url].errors, router.UNHEALTHY_AFTER)
+        self.assertEqual(rpc.ranked(), [healthy.url, failing.url])
+        self.assertEqual(healthy.simulator.requests, router.UNHEALTHY_AFTER)
+
+    def test_failover_raises_when_every_endpoint_fails(self):
+        rpc = self.make_router(self.start(error_rate=1.0), self.start(error_rate=1.0))
+        with self.assertRaises(requests.HTTPError):
+            rpc.post(BLOCK_NUMBER)
+
+    def test_ranks_by_latency_ewma(self):
+        slow, fast = self.start(latency=0.05), self.start()
+        rpc = self.make_router(slow, fast)
+        for _ in range(3):
+            for server in (slow, fast):
+                rpc._post(server.url, BLOCK_NUMBER)
+        self.assertEqual(rpc.ranked(), [fast.url, slow.url])
+        self.assertGreater(rpc.stats[slow.url].latency, rpc.stats[fast.url].latency)
+
+        # Traffic follows the ranking, apart from the periodic probe of the other endpoint
+        before = slow.simulator.requests
+        for _ in range(router.PROBE_EVERY):
+            rpc.post(BLOCK_NUMBER)
+        self.assertEqual(slow.simulator.requests - before, 1)
+
+    def test_errors_outweigh_latency(self):
+        flaky, steady = self.start(), self.start(latency=0.01)
+        rpc = self.make_router(flaky, steady)
+        for _ in range(3):
+            rpc._post(steady.url, BLOCK_NUMBER)
+        stats = rpc.stats[flaky.url]
+        stats.latency = rpc.stats[steady.url].latency / 2
+        stats.record(stats.latency, ok=False)
+        stats.record(stats.latency, ok=False)
+        self.assertTrue(stats.healthy)
+        self.assertEqual(rpc.ranked()[0], steady.url)
+
+    def test_hedged_request_takes_the_faster_answer(self):
+        slow, fast = self.start(latency=1.0), self.start()
+        rpc = self.make_router(slow, fast)
+        # Stale stats rank the slow endpoint first
+        rpc.stats[slow.url].latency = 0.001
+        rpc.stats[fast.url].latency = 0.01
+
+        started = time.time()
+        self.assertIn('result', json.loads(rpc.post_hedged(BLOCK_NUMBER)))
+        self.assertLess(time.time() - started, 0.5)
+
+    def test_hedged_request_survives_a_failing_endpoint(self):
+        failing, healthy = self.start(error_rate=1.0), self.start(latency=0.05)
+        rpc = self.make_router(failing, healthy)
+        rpc.stats[failing.url].latency = 0.001
+        rpc.stats[healthy.url].latency = 0.01
+        self.assertIn('result', json.loads(rpc.post_hedged(BLOCK_NUMBER)))
+        self.assertEqual(rpc.stats[failing.url].errors, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
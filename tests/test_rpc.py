@@ -0,0 +1,66 @@
+import unittest
+
+from eth_account import Account
+
+from balance_cache import balance_cache
+from config import ContractConfig
+from contracts import ContractManager
+from rpc import batch_request, decode_call_result, eth_call
+from simulator import start_simulator
+
+
+class BatchRequestTest(unittest.TestCase):
+    """JSON-RPC batches against the simulator"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.saved = ContractConfig.SONIC_RPC_URL, ContractConfig.SONIC_RPC_URLS
+        cls.server = start_simulator(block_time=60)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        ContractConfig.SONIC_RPC_URL, ContractConfig.SONIC_RPC_URLS = cls.saved
+
+    def setUp(self):
+        self.manager = ContractManager(Account.create().key.hex())
+        self.address = self.manager.account.address
+        self.server.simulator.bananas[self.address.lower()] = 4321 * 10**18
+        self.server.simulator.nonces[self.address.lower()] = 5
+
+    def test_one_request_in_call_order(self):
+        web3, contract = self.manager.web3, self.manager.contract
+        balance_fn = contract.functions.balanceOf(self.address)
+        before = self.server.simulator.requests
+        results = batch_request(web3, [
+            ('eth_getTransactionCount', [self.address, 'pending']),
+            eth_call(balance_fn),
+            ('eth_getBalance', [self.address, 'latest'])
+        ])
+        self.assertEqual(self.server.simulator.requests - before, 1)
+        self.assertEqual(int(results[0], 16), web3.eth.get_transaction_count(self.address, 'pending'))
+        self.assertEqual(decode_call_result(balance_fn, results[1]), balance_fn.call())
+        self.assertEqual(int(results[2], 16), web3.eth.get_balance(self.address))
+
+    def test_failed_call_is_none(self):
+        # bet() isn't a view, so the simulator reverts the eth_call
+        bet_fn = self.manager.contract.functions.bet([1, 1, 1])
+        results = batch_request(self.manager.web3, [eth_call(bet_fn), ('eth_chainId', [])])
+        self.assertIsNone(results[0])
+        self.assertEqual(int(results[1], 16), ContractConfig.CHAIN_ID)
+
+    def test_snapshot_matches_individual_reads(self):
+        before = self.server.simulator.requests
+        snapshot = self.manager.snapshot()
+        self.assertEqual(self.server.simulator.requests - before, 1)
+
+        balance_cache.invalidate(self.address)
+        self.assertEqual(snapshot['banana_balance'], self.manager.get_banana_balance())
+        self.assertEqual(snapshot['native_balance'], self.manager.get_native_balance())
+        self.assertEqual(snapshot['nonce'], self.manager.web3.eth.get_transaction_count(self.address, 'pending'))
+        self.assertEqual((snapshot['last_game_id'], snapshot['last_game_fulfilled']),
+                         self.manager.get_last_game_info())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+import app
+from config import ContractConfig
+
+SETTINGS = {
+    'min_bet_percentage': 0.02,
+    'max_bet_percentage': 0.1,
+    'win_streak_rate': 1.5,
+    'loss_recovery_rate': 1.2,
+    'chase_69_threshold': 5,
+    'chase_69_multiplier': 2.0
+}
+
+
+class SaveSettingsTest(unittest.TestCase):
+    """/api/save_settings rejects values the bot can't run with"""
+
+    def setUp(self):
+        self.client = app.app.test_client()
+
+    def save(self, **settings):
+        return self.client.post('/api/save_settings', json=dict(SETTINGS, **settings))
+
+    def test_pipeline_depth_bounds(self):
+        for depth in (0, ContractConfig.PIPELINE_MAX_DEPTH + 1, '3', 2.5, True):
+            response = self.save(pipeline_depth=depth)
+            self.assertEqual(response.status_code, 400, depth)
+            self.assertEqual(response.get_json()['status'], 'error')
+
+        response = self.save(pipeline_depth=ContractConfig.PIPELINE_MAX_DEPTH)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/api/current_settings').get_json()['pipeline_depth'],
+                         ContractConfig.PIPELINE_MAX_DEPTH)
+
+    def test_prefetch_needs_a_bool(self):
+        for value in ('false', 0, 1, None):
+            self.assertEqual(self.save(prefetch_next_bet=value).status_code, 400, value)
+
+        self.assertEqual(self.save(prefetch_next_bet=False).status_code, 200)
+        self.assertIs(self.client.get('/api/current_settings').get_json()['prefetch_next_bet'], False)
+
+    def test_invalid_percentages(self):
+        response = self.save(min_bet_percentage=0.2, max_bet_percentage=0.1)
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+from eth_account import Account
+
+from signing import SigningService
+
+TX = {
+    'to': '0x' + '11' * 20,
+    'value': 10 ** 15,
+    'gas': 300000,
+    'maxFeePerGas': 100 * 10 ** 9,
+    'maxPriorityFeePerGas': 10 ** 9,
+    'nonce': 7,
+    'chainId': 146,
+    'data': '0x1234'
+}
+
+
+class SigningServiceTest(unittest.TestCase):
+    """Pool signatures are the same bytes as signing in-process"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.service = SigningService(2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.service.shutdown()
+
+    def test_matches_local_signing(self):
+        account = Account.create()
+        address = self.service.register(account.key.hex())
+        self.assertEqual(address, account.address)
+        for nonce in range(4):
+            tx = dict(TX, nonce=nonce)
+            self.assertEqual(self.service.sign(address, tx).rawTransaction,
+                             account.sign_transaction(tx).rawTransaction)
+
+    def test_wallets_added_after_start(self):
+        accounts = [Account.create() for _ in range(3)]
+        for account in accounts:
+            self.service.register(account.key.hex())
+        futures = [(account, self.service.submit(account.address, TX)) for account in accounts * 2]
+        for account, future in futures:
+            self.assertEqual(future.result(timeout=60).rawTransaction, account.sign_transaction(TX).rawTransaction)
+
+    def test_unknown_address(self):
+        with self.assertRaises(KeyError):
+            self.service.submit(Account.create().address, TX)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import random
+import unittest
+
+import strategy
+from config import ContractConfig
+from dice import OUTCOMES, lookup
+from strategy import DEFAULT_SETTINGS, StrategyState
+
+
+class BaselineBot:
+    """Bet sizing and result tracking as play_dice_game did them before strategy.py, without the logging"""
+
+    def __init__(self, settings):
+        self.__dict__.update(settings)
+        self.base_bet_amount = None
+        self.win_streak = 0
+        self.loss_streak = 0
+        self.games_since_69 = 0
+        self.win_amounts = []
+        self.loss_amounts = []
+        self.avg_win_amount = 0
+        self.avg_loss_amount = 0
+        self.profit_factor = 0
+
+    def calculate_bet(self, initial_balance):
+        if initial_balance < ContractConfig.SAFETY_THRESHOLD:
+            return None
+        if self.base_bet_amount is None:
+            self.base_bet_amount = max(ContractConfig.MIN_BET_AMOUNT, int(initial_balance * self.min_bet_percentage))
+        if initial_balance < self.base_bet_amount:
+            self.base_bet_amount = max(ContractConfig.MIN_BET_AMOUNT,
+                                       int(initial_balance * ContractConfig.MAX_BET_PERCENTAGE))
+        win_bonus = recovery = chase_bonus = variable_bonus = 1.0
+        if self.win_streak > 0:
+            win_bonus = min(1.0 + (self.win_streak * self.win_streak_rate), 2.0)
+        if self.loss_streak > 0:
+            recovery = min(1.0 + (self.loss_streak * self.loss_recovery_rate), 2.0)
+        if self.games_since_69 >= self.chase_69_threshold:
+            games_over = self.games_since_69 - self.chase_69_threshold + 1
+            chase_bonus = min(self.chase_69_multiplier ** games_over, 3.0)
+        if len(self.win_amounts) > 2 and len(self.loss_amounts) > 2:
+            if self.profit_factor > 1.0:
+                variable_bonus = min(1.0 + ((self.profit_factor - 1.0) * self.win_sensitivity), 1.5)
+            else:
+                variable_bonus = max(1.0 - ((1.0 - self.profit_factor) * self.loss_sensitivity), 0.5)
+        actual_bet = int(self.base_bet_amount * win_bonus * recovery * chase_bonus * variable_bonus)
+        actual_bet = min(actual_bet, int(initial_balance * self.max_bet_percentage))
+        self.current_bet_amount = actual_bet
+        return actual_bet
+
+    def record_result(self, initial_balance, balance_change, dice_result):
+        if balance_change > 0:
+            self.win_amounts.append(balance_change / self.current_bet_amount)
+            if len(self.win_amounts) > self.max_track_games:
+                self.win_amounts.pop(0)
+            self.avg_win_amount = sum(self.win_amounts) / len(self.win_amounts)
+        else:
+            self.loss_amounts.append(abs(balance_change) / self.current_bet_amount)
+            if len(self.loss_amounts) > self.max_track_games:
+                self.loss_amounts.pop(0)
+            self.avg_loss_amount = sum(self.loss_amounts) / len(self.loss_amounts)
+        if self.avg_loss_amount > 0 and self.avg_win_amount > 0:
+            self.profit_factor = self.avg_win_amount / self.avg_loss_amount
+        else:
+            self.profit_factor = 1.0
+
+        bit_dice = 0
+        double3 = False
+        for num in dice_result:
+            if num == 3 and (bit_dice & (1 << num)) != 0:
+                double3 = True
+            bit_dice |= (1 << num)
+        has_nine = any(dice_result[i] + dice_result[j] == 9 for i in range(3) for j in range(i + 1, 3))
+        if 6 in dice_result and has_nine or (bit_dice == 72 and not double3) or bit_dice == 112:
+            self.games_since_69 = 0
+        else:
+            self.games_since_69 += 1
+
+        if balance_change > 0:
+            self.win_streak += 1
+            self.loss_streak = 0
+        else:
+            self.loss_streak += 1
+            self.win_streak = 0
+
+        chase_bonus = 1.0
+        if self.games_since_69 >= self.chase_69_threshold:
+            games_over = self.games_since_69 - self.chase_69_threshold + 1
+            chase_bonus = min(self.chase_69_multiplier ** games_over, 3.0)
+        bet_percentage = min(self.min_bet_percentage * chase_bonus, self.max_bet_percentage)
+        self.base_bet_amount = max(ContractConfig.MIN_BET_AMOUNT, int((initial_balance + balance_change) * bet_percentage))
+
+
+SETTINGS = [
+    DEFAULT_SETTINGS,
+    dict(DEFAULT_SETTINGS, min_bet_percentage=0.02, max_bet_percentage=0.08, chase_69_threshold=3,
+         chase_69_multiplier=1.3, win_sensitivity=1.0, loss_sensitivity=0.9, max_track_games=5),
+    dict(DEFAULT_SETTINGS, win_streak_rate=0.5, loss_recovery_rate=0.0, win_sensitivity=0.0, loss_sensitivity=0.0)
+]
+
+
+class StrategyTest(unittest.TestCase):
+    """decide/settle against the bot's original calculate_bet/record_result sequence"""
+
+    def test_matches_baseline_bot(self):
+        rng = random.Random(11)
+        for settings in SETTINGS:
+            for session in range(20):
+                baseline = BaselineBot(settings)
+                state = StrategyState()
+                balance = rng.choice([10**6, 10**21])
+                for game in range(300):
+                    expected = baseline.calculate_bet(balance)
+                    state, decision = strategy.decide(settings, state, balance)
+                    if expected is None or len(baseline.win_amounts) <= 2 or len(baseline.loss_amounts) <= 2:
+                        self.assertEqual(decision.bet, expected, (settings, session, game))
+                    else:
+                        # RollingWindow's running sums can differ from sum(list) in the last bit of the profit factor
+                        self.assertAlmostEqual(decision.bet, expected, delta=max(1, expected * 1e-12))
+                    self.assertEqual(state.base_bet, baseline.base_bet_amount)
+                    if expected is None:
+                        break
+
+                    dice = OUTCOMES[rng.randrange(len(OUTCOMES))]
+                    change = strategy.balance_change(expected, lookup(dice)['multiplier'])
+                    baseline.record_result(balance, change, list(dice))
+                    state = strategy.settle(settings, state, balance, expected, change, lookup(dice)['is_69'])
+                    balance += change
+                    self.assertEqual(state.base_bet, baseline.base_bet_amount)
+                    self.assertEqual((state.win_streak, state.loss_streak, state.games_since_69),
+                                     (baseline.win_streak, baseline.loss_streak, baseline.games_since_69))
+                    self.assertAlmostEqual(state.profit_factor, baseline.profit_factor, places=9)
+
+
+if __name__ == '__main__':
+    unittest.main()
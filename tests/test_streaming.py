@@ -0,0 +1,85 @@
+import random
+import unittest
+from collections import deque
+
+from streaming import RollingWindow, SessionStats
+
+
+class RollingWindowTest(unittest.TestCase):
+    """Running sums and ring buffer bookkeeping against a plain deque"""
+
+    def test_matches_deque(self):
+        rng = random.Random(1)
+        for size in (1, 2, 5, 16):
+            window = RollingWindow(size)
+            reference = deque(maxlen=size)
+            for step in range(size * 7 + 3):
+                value = rng.uniform(0, 10**6)
+                evicted = reference[0] if len(reference) == size else None
+                reference.append(value)
+                self.assertEqual(window.push(value), evicted)
+                self.assertEqual(window.values(), list(reference))
+                self.assertEqual(len(window), len(reference))
+                self.assertAlmostEqual(window.total, sum(reference), delta=1e-6)
+                self.assertAlmostEqual(window.mean(), sum(reference) / len(reference), delta=1e-6)
+
+    def test_total_rebuilt_each_lap(self):
+        rng = random.Random(2)
+        window = RollingWindow(8)
+        for lap in range(50):
+            for _ in range(8):
+                window.push(rng.choice([1e16, 1.0, 0.1, 3.3]))
+            # After a whole lap the oldest value sits in slot 0 and the sum is exact again
+            self.assertEqual(window._start, 0)
+            self.assertEqual(window.total, sum(window.values()))
+
+    def test_resize_keeps_newest(self):
+        window = RollingWindow(5, range(1, 8))
+        self.assertEqual(window.values(), [3, 4, 5, 6, 7])
+        window.resize(3)
+        self.assertEqual(window.values(), [5, 6, 7])
+        self.assertEqual(window.total, 18)
+        window.resize(6)
+        window.push(8)
+        self.assertEqual(window.values(), [5, 6, 7, 8])
+        window.resize(0)
+        self.assertEqual((len(window), window.total, window.mean()), (0, 0.0, None))
+
+    def test_size_zero_passes_values_through(self):
+        window = RollingWindow(0)
+        self.assertEqual(window.push(4.0), 4.0)
+        self.assertEqual(window.values(), [])
+        self.assertEqual(window.mean(default=1.0), 1.0)
+
+    def test_copy_is_independent(self):
+        window = RollingWindow(3, [1.0, 2.0, 3.0, 4.0])
+        copy = window.copy()
+        self.assertEqual(copy, window)
+        copy.push(5.0)
+        self.assertEqual(window.values(), [2.0, 3.0, 4.0])
+        self.assertEqual(copy.values(), [3.0, 4.0, 5.0])
+        self.assertEqual((window.total, copy.total), (9.0, 12.0))
+        self.assertNotEqual(copy, window)
+
+
+class SessionStatsTest(unittest.TestCase):
+    def test_snapshot(self):
+        stats = SessionStats(window=3, alpha=0.5)
+        balance = 1000
+        for change, bet in ((20, 10), (-10, 10), (-10, 10), (30, 10), (-5, 5)):
+            balance += change
+            stats.record(change, bet, balance)
+        snapshot = stats.snapshot()
+        self.assertEqual((snapshot['games'], snapshot['wins'], snapshot['losses']), (5, 2, 3))
+        self.assertEqual(snapshot['window']['games'], 3)
+        self.assertAlmostEqual(snapshot['window']['win_rate'], 1 / 3)
+        self.assertAlmostEqual(snapshot['window']['avg_win'], 2.5)
+        self.assertAlmostEqual(snapshot['window']['avg_loss'], 1.0)
+        self.assertAlmostEqual(snapshot['window']['profit_factor'], 2.5)
+        self.assertEqual((snapshot['longest_win_streak'], snapshot['longest_loss_streak']), (1, 2))
+        self.assertAlmostEqual(snapshot['max_drawdown'], 20 / 1020)
+        self.assertEqual((snapshot['wagered'], snapshot['net']), (45, 25))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from eth_account import Account
+
+from config import ContractConfig
+from providers import registry
+from simulator import DiceSimulator, SimulatorServer
+from tx_builder import BET_VALUE, bet_tx_builder
+
+FEES = [
+    {'maxFeePerGas': 101 * 10**9, 'maxPriorityFeePerGas': 10**9},
+    {'gasPrice': 55 * 10**9}
+]
+
+
+class BetTxBuilderTest(unittest.TestCase):
+    """The template path signs to the same bytes as build_transaction"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = SimulatorServer(DiceSimulator(block_time=60))
+        cls.server.start()
+        cls.contract = ContractConfig.get_contract(registry.get_web3(cls.server.url))
+        cls.account = Account.create()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+
+    def build_transaction(self, bet_amounts, nonce, gas, fee_params):
+        # The path send_dice_bet took before the template
+        return self.contract.functions.bet(bet_amounts).build_transaction({
+            'from': self.account.address,
+            'value': BET_VALUE,
+            'gas': gas,
+            'nonce': nonce,
+            'chainId': ContractConfig.CHAIN_ID,
+            **fee_params
+        })
+
+    def test_signed_bytes_match_build_transaction(self):
+        for fee_params in FEES:
+            for bet_amounts, nonce in (([1, 1, 1], 0), ([10**18] * 3, 7), ([2**255, 0, 3], 2**32)):
+                expected = self.account.sign_transaction(self.build_transaction(bet_amounts, nonce, 300000, fee_params))
+                actual = self.account.sign_transaction(bet_tx_builder.build(bet_amounts, nonce, 300000, fee_params))
+                self.assertEqual(actual.rawTransaction, expected.rawTransaction)
+
+    def test_calldata_matches_abi_encoding(self):
+        bet_amounts = [5, 6, 7]
+        expected = self.contract.functions.bet(bet_amounts)._encode_transaction_data()
+        self.assertEqual('0x' + bet_tx_builder.calldata(bet_amounts).hex(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
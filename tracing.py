@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from metrics import Histogram
+
+PHASES = ('preflight', 'build', 'sign', 'send', 'receipt', 'fulfillment', 'prefetch')
+
+# Cycle phases run from milliseconds (signing) to tens of seconds (fulfillment)
+PHASE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class BetTrace:
+    """Wall-clock timestamps and durations for each phase of one bet
+
+    A phase entered more than once (preflight runs in both the bot and
+    place_dice_bet) accumulates its durations and keeps its first start.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.game_id: Optional[int] = None
+        self.durations: Dict[str, float] = {}
+        self.timestamps: Dict[str, Tuple[float, float]] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.time()
+        try:
+            yield self
+        finally:
+            end = time.time()
+            self.durations[name] = self.durations.get(name, 0.0) + (end - start)
+            first_start = self.timestamps.get(name, (start, end))[0]
+            self.timestamps[name] = (first_start, end)
+
+    @property
+    def total(self) -> float:
+        return sum(self.durations.values())
+
+    def as_dict(self) -> Dict:
+        return {
+            'game_id': self.game_id,
+            'started_at': self.started_at,
+            'phases': {
+                name: {
+                    'start': self.timestamps[name][0],
+                    'end': self.timestamps[name][1],
+                    'duration_ms': round(self.durations[name] * 1000, 1)
+                }
+                for name in PHASES if name in self.durations
+            },
+            'total_ms': round(self.total * 1000, 1)
+        }
+
+    def summary(self) -> str:
+        """One log line with every phase's duration"""
+        parts = [f"{name} {_format_seconds(self.durations[name])}" for name in PHASES if name in self.durations]
+        return " | ".join(parts + [f"total {_format_seconds(self.total)}"])
+
+
+def _format_seconds(seconds: float) -> str:
+    return f"{seconds * 1000:.0f}ms" if seconds < 1 else f"{seconds:.2f}s"
+
+
+class TraceStats:
+    """Per-session phase histograms built from finished BetTraces
+
+    Histograms cover the whole session; percentiles are taken over the
+    last `window` bets so they follow recent behaviour.
+    """
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self.bets = 0
+        self._histograms: Dict[str, Histogram] = {}
+        self._recent: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, trace: BetTrace):
+        with self._lock:
+            self.bets += 1
+            for name, duration in list(trace.durations.items()) + [('total', trace.total)]:
+                if name not in self._histograms:
+                    self._histograms[name] = Histogram(PHASE_BUCKETS)
+                    self._recent[name] = deque(maxlen=self.window)
+                self._histograms[name].observe(duration)
+                self._recent[name].append(duration)
+
+    def reset(self):
+        with self._lock:
+            self.bets = 0
+            self._histograms.clear()
+            self._recent.clear()
+
+    def summary(self) -> Dict:
+        """Count, mean, p50/p95/max and bucket counts per phase, in milliseconds"""
+        with self._lock:
+            summary = {}
+            for name in PHASES + ('total',):
+                histogram = self._histograms.get(name)
+                if histogram is None:
+                    continue
+                recent = sorted(self._recent[name])
+                summary[name] = {
+                    'count': histogram.count,
+                    'mean_ms': round(histogram.sum / histogram.count * 1000, 1),
+                    'p50_ms': round(recent[int(0.50 * (len(recent) - 1))] * 1000, 1),
+                    'p95_ms': round(recent[int(0.95 * (len(recent) - 1))] * 1000, 1),
+                    'max_ms': round(recent[-1] * 1000, 1),
+                    'histogram': {le: count for le, count in histogram.cumulative()}
+                }
+            return summary
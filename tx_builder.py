@@ -0,0 +1,56 @@
+from typing import Dict, List, Optional
+
+from eth_abi import encode
+from eth_utils import function_signature_to_4byte_selector, to_checksum_address
+
+from config import ContractConfig
+
+BET_SIGNATURE = 'bet(uint256[])'
+BET_SELECTOR = function_signature_to_4byte_selector(BET_SIGNATURE)
+BET_VALUE = 19250000000000000  # 0.01925 S sent with every bet for the VRF callback
+
+
+class BetTxBuilder:
+    """Fast path for bet transactions that skips contract.functions.bet(...).build_transaction
+
+    The selector, target address, chain ID and value are fixed when the
+    builder is created. Each bet only encodes its amounts with eth_abi and
+    fills in the nonce, gas limit and fees, so there is no per-bet ABI
+    lookup, argument validation or node round trip.
+    """
+
+    def __init__(self, contract_address: Optional[str] = None, chain_id: Optional[int] = None,
+                 value: int = BET_VALUE):
+        self.static_fields = {
+            'to': to_checksum_address(contract_address or ContractConfig.DICE_GAME_ADDRESS),
+            'value': value,
+            'chainId': chain_id or ContractConfig.CHAIN_ID
+        }
+
+    @property
+    def value(self) -> int:
+        return self.static_fields['value']
+
+    def calldata(self, bet_amounts: List[int]) -> bytes:
+        """ABI-encoded bet(uint256[]) calldata"""
+        return BET_SELECTOR + encode(['uint256[]'], [bet_amounts])
+
+    def build(self, bet_amounts: List[int], nonce: int, gas: int, fee_params: Dict[str, int]) -> Dict:
+        """Unsigned transaction dict for a bet
+
+        Args:
+            bet_amounts: Amount per die
+            nonce: Nonce from the NonceManager
+            gas: Gas limit
+            fee_params: gasPrice or maxFeePerGas/maxPriorityFeePerGas from the FeeOracle
+        """
+        tx = dict(self.static_fields)
+        tx['data'] = self.calldata(bet_amounts)
+        tx['nonce'] = nonce
+        tx['gas'] = gas
+        tx.update(fee_params)
+        return tx
+
+
+# Every wallet bets on the same contract, so one builder serves them all
+bet_tx_builder = BetTxBuilder()